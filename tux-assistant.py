@@ -10,6 +10,7 @@ Usage:
     ./tux.py          # Launch GUI
     ./tux.py --help   # Show help
     ./tux.py --version # Show version
+    ./tux.py --profile-startup  # Launch GUI and profile startup
 """
 
 import sys
@@ -44,8 +45,38 @@ def check_dependencies():
         sys.exit(1)
 
 
+def enable_startup_profiling():
+    """Handle --profile-startup[=DIR] (may appear anywhere on the command line).
+    
+    The option is removed from sys.argv so GTK doesn't see it. The
+    profiler is loaded from its file rather than imported, which would
+    run tux/__init__.py and tux/core/__init__.py (and their imports)
+    before the import timer is installed.
+    """
+    for arg in sys.argv[1:]:
+        if arg == '--profile-startup' or arg.startswith('--profile-startup='):
+            sys.argv.remove(arg)
+            output_dir = arg.partition('=')[2]
+            os.environ['TUX_PROFILE_STARTUP'] = os.path.abspath(output_dir) if output_dir else '1'
+            break
+    else:
+        return
+    
+    import importlib.util
+    path = os.path.join(script_dir, 'tux', 'core', 'profiling.py')
+    spec = importlib.util.spec_from_file_location('tux.core.profiling', path)
+    profiling = importlib.util.module_from_spec(spec)
+    # Registered under its package name, so `from .core import profiling`
+    # later finds this instance (and its profiler) instead of a new one
+    sys.modules[spec.name] = profiling
+    spec.loader.exec_module(profiling)
+    profiling.enable_from_environment()
+
+
 def main():
     """Main entry point."""
+    enable_startup_profiling()
+    
     # Handle --help and --version before loading GTK
     if len(sys.argv) > 1:
         if sys.argv[1] in ('--help', '-h'):
@@ -55,6 +86,10 @@ def main():
             print("  --version, -v   Show version information")
             print("  --check         Check system and dependencies")
             print("  --browser [URL] Launch Tux Browser (Firefox)")
+            print("  --profile-startup[=DIR]")
+            print("                  Time startup phases and imports; writes a JSON")
+            print("                  report and a Chrome trace (default DIR:")
+            print("                  ~/.cache/tux-assistant/profiles)")
             sys.exit(0)
         
         elif sys.argv[1] in ('--version', '-v'):
@@ -34,6 +34,13 @@ __email__ = "dorrellkc@gmail.com"
 __app_name__ = "Tux Assistant"
 __app_id__ = "com.tuxassistant.app"
 
+# Startup profiling hooks imports, so it has to be enabled before the
+# application modules load. tux-assistant.py --profile-startup has already
+# enabled it before importing tux; this covers other launchers that set
+# TUX_PROFILE_STARTUP (those miss the tux.core imports this line triggers).
+from .core import profiling as _profiling
+_profiling.enable_from_environment()
+
 from .app import TuxAssistantApp, main
 
 __all__ = ['TuxAssistantApp', 'main', '__version__', '__version_info__', '__app_name__']
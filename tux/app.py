@@ -10,12 +10,9 @@ Copyright (c) 2025 Christopher Dorrell. Licensed under GPL-3.0.
 import sys
 import os
 import gi
-import sqlite3
 import threading
 import subprocess
-import urllib.request
 import json
-from datetime import datetime, timedelta
 
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
@@ -42,7 +39,19 @@ except (ValueError, ImportError):
             pass  # WebKit not available
 
 from . import __version__, __app_name__, __app_id__
-from .core import get_distro, get_desktop, setup_logging, get_logger
+from .core import (
+    get_distro, get_desktop, setup_logging, get_logger, HistoryStore, DomainBlocklist
+)
+from .core import profiling
+from .core.httpcache import get_http_cache
+from .core.httpclient import get_http_client
+from .core.installed import get_installed_snapshot
+from .core.profiling import profiled
+from .core.search import SearchIndex
+from .core.content_filters import (
+    FilterCache, compile_rules, list_sources, read_lines, shard_rules, sources_hash,
+    IDENTIFIER_PREFIX as FILTER_IDENTIFIER_PREFIX
+)
 from .modules import ModuleRegistry, ModuleCategory, create_icon_simple
 
 # Initialize logging
@@ -77,6 +86,7 @@ class TuxAssistantApp(Adw.Application):
         self.connect('startup', self.on_startup)
         self.connect('open', self.on_open)
     
+    @profiled()
     def on_startup(self, app):
         """Called when the application starts."""
         # Register bundled icons with GTK icon theme
@@ -116,6 +126,7 @@ class TuxAssistantApp(Adw.Application):
         """
         pass  # Run sudo ./install.sh for development
     
+    @profiled()
     def load_css(self):
         """Load custom CSS for improved readability from external file."""
         css_provider = Gtk.CssProvider()
@@ -135,10 +146,16 @@ class TuxAssistantApp(Adw.Application):
             Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
         )
     
+    @profiled()
     def on_activate(self, app):
         """Called when the application is activated."""
         if not self.window:
             self.window = TuxAssistantWindow(application=self)
+            # Keep the installed-package snapshot current while the app runs
+            get_installed_snapshot().watch()
+        
+        if profiling.is_enabled():
+            self.window.connect("map", self._on_profile_window_mapped)
         
         self.window.present()
         
@@ -146,6 +163,30 @@ class TuxAssistantApp(Adw.Application):
         if self._pending_urls:
             GLib.timeout_add(500, self._open_pending_urls)
     
+    def _on_profile_window_mapped(self, window):
+        """Mark the first painted frame and write the startup profile."""
+        if not profiling.is_enabled():
+            return
+        clock = window.get_frame_clock()
+        if clock is None:
+            GLib.idle_add(self._finish_startup_profile)
+            return
+        
+        def on_after_paint(clock):
+            clock.disconnect(handler_id)
+            profiling.mark("first-frame")
+            GLib.idle_add(self._finish_startup_profile)
+        
+        handler_id = clock.connect("after-paint", on_after_paint)
+    
+    def _finish_startup_profile(self):
+        """Write the startup profile once the first frame is up."""
+        paths = profiling.finish()
+        if paths:
+            print(f"Startup profile: {paths[0]}")
+            print(f"Chrome trace:    {paths[1]}  (open in chrome://tracing or ui.perfetto.dev)")
+        return False
+    
     def on_open(self, app, files, n_files, hint):
         """Handle files/URLs passed to the application."""
         for gfile in files:
@@ -172,6 +213,7 @@ class TuxAssistantApp(Adw.Application):
             self._pending_urls.clear()
         return False  # Don't repeat
     
+    @profiled()
     def create_actions(self):
         """Create application actions."""
         # Quit action
@@ -367,14 +409,18 @@ class TuxAssistantWindow(Adw.ApplicationWindow):
     CONFIG_DIR = GLib.get_user_config_dir() + "/tux-assistant"
     CONFIG_FILE = CONFIG_DIR + "/window.conf"
     BOOKMARKS_FILE = CONFIG_DIR + "/bookmarks.json"
+    BLOCKLISTS_DIR = CONFIG_DIR + "/blocklists"  # ads/*.txt, trackers/*.txt (hosts format)
     HISTORY_DB = CONFIG_DIR + "/history.db"
-    UPDATE_CHECK_FILE = CONFIG_DIR + "/update_check.json"
+    UPDATE_CHECK_MAX_AGE = 24 * 60 * 60  # Check GitHub at most once a day
+    FAVICON_MAX_AGE = 7 * 24 * 60 * 60
+    FAVICON_URL = "https://icons.duckduckgo.com/ip3/{domain}.ico"
     GITHUB_RELEASES_URL = "https://api.github.com/repos/dorrellkc/Tux-Assistant/releases/latest"
     
     # History limits - designed for daily use over years
     HISTORY_MAX_SIZE_MB = 200  # Maximum database size
     HISTORY_MAX_ENTRIES = 500000  # Maximum entries
     HISTORY_CLEANUP_PERCENT = 20  # Delete this % when limit hit
+    HISTORY_MAINTENANCE_INTERVAL = 6 * 3600  # Seconds between maintenance runs
     
     # Privacy blocklists - common ad and tracker domains
     AD_DOMAINS = {
@@ -442,6 +488,7 @@ class TuxAssistantWindow(Adw.ApplicationWindow):
         'appsflyer.com', 'kochava.com', 'singular.net',
     }
     
+    @profiled()
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         
@@ -463,12 +510,14 @@ class TuxAssistantWindow(Adw.ApplicationWindow):
         self.connect("notify::maximized", self._on_state_changed)
         
         # Detect system info
-        self.distro = get_distro()
-        self.desktop = get_desktop()
+        with profiling.span("detect system"):
+            self.distro = get_distro()
+            self.desktop = get_desktop()
         
         # Initialize bookmarks and folders
         self.bookmarks = []
         self.bookmark_folders = []  # List of folder names
+        self._favicon_fetches = set()  # Favicon URLs being downloaded
         self._load_bookmarks()
         
         # Initialize downloads list
@@ -480,6 +529,7 @@ class TuxAssistantWindow(Adw.ApplicationWindow):
         self.block_ads = browser_settings.get('block_ads', True)
         self.block_trackers = browser_settings.get('block_trackers', True)
         self.pages_protected = 0  # Track protected pages this session
+        self._init_blocklist()
         
         # SponsorBlock settings
         self.sponsorblock_enabled = browser_settings.get('sponsorblock_enabled', True)
@@ -503,6 +553,16 @@ class TuxAssistantWindow(Adw.ApplicationWindow):
         # Initialize history database
         self._init_history_db()
         
+        # Module search index (built once in the background, see _get_search_index)
+        self._search_index = None
+        self._search_index_generation = -1
+        self._search_index_lock = threading.Lock()
+        GLib.idle_add(self._prewarm_search_index)
+        
+        # Import module pages while idle so the first click is instant
+        if self.PREWARM_MODULES:
+            GLib.idle_add(self._prewarm_next_module, priority=GLib.PRIORITY_LOW)
+        
         # Build UI
         self.build_ui()
         
@@ -640,6 +700,7 @@ class TuxAssistantWindow(Adw.ApplicationWindow):
         """Handle window state change (maximized/unmaximized)."""
         self._save_window_size()
     
+    @profiled()
     def _load_bookmarks(self):
         """Load bookmarks and folders from JSON file."""
         import json
@@ -684,126 +745,32 @@ class TuxAssistantWindow(Adw.ApplicationWindow):
     
     # ==================== History Database Methods ====================
     
+    @profiled()
     def _init_history_db(self):
-        """Initialize the history SQLite database."""
+        """Open the history store (long-lived connections, background writer)."""
         try:
-            os.makedirs(self.CONFIG_DIR, exist_ok=True)
-            
-            conn = sqlite3.connect(self.HISTORY_DB)
-            cursor = conn.cursor()
-            
-            # Create history table with frecency support
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS history (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    url TEXT NOT NULL UNIQUE,
-                    title TEXT,
-                    visit_count INTEGER DEFAULT 1,
-                    last_visit REAL NOT NULL,
-                    first_visit REAL NOT NULL,
-                    frecency INTEGER DEFAULT 0
-                )
-            ''')
-            
-            # Indexes for fast queries
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_history_url ON history(url)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_history_last_visit ON history(last_visit DESC)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_history_frecency ON history(frecency DESC)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_history_title ON history(title)')
-            
-            conn.commit()
-            conn.close()
+            self.history_store = HistoryStore(self.HISTORY_DB)
+            self.history_store.open()
             
-            # Check if maintenance needed (in background)
+            # Check if maintenance needed (in background), then periodically
             threading.Thread(target=self._check_history_maintenance, daemon=True).start()
+            GLib.timeout_add_seconds(self.HISTORY_MAINTENANCE_INTERVAL,
+                                     self._on_history_maintenance_timer)
             
         except Exception as e:
+            self.history_store = None
             log.error(f"Failed to initialize history database: {e}")
     
     def _record_history(self, url, title=None):
-        """Record a page visit to history with frecency update."""
+        """Record a page visit to history (queued, never blocks page loads)."""
         if not url or url.startswith('about:') or url.startswith('data:'):
             return
         
-        import time
-        now = time.time()
-        
         try:
-            conn = sqlite3.connect(self.HISTORY_DB)
-            cursor = conn.cursor()
-            
-            # Check if URL exists
-            cursor.execute('SELECT id, visit_count, first_visit FROM history WHERE url = ?', (url,))
-            existing = cursor.fetchone()
-            
-            if existing:
-                # Update existing entry
-                entry_id, visit_count, first_visit = existing
-                new_count = visit_count + 1
-                frecency = self._calculate_frecency(new_count, now, first_visit)
-                
-                cursor.execute('''
-                    UPDATE history 
-                    SET title = COALESCE(?, title),
-                        visit_count = ?,
-                        last_visit = ?,
-                        frecency = ?
-                    WHERE id = ?
-                ''', (title, new_count, now, frecency, entry_id))
-            else:
-                # Insert new entry
-                frecency = self._calculate_frecency(1, now, now)
-                cursor.execute('''
-                    INSERT INTO history (url, title, visit_count, last_visit, first_visit, frecency)
-                    VALUES (?, ?, 1, ?, ?, ?)
-                ''', (url, title or url, now, now, frecency))
-            
-            conn.commit()
-            conn.close()
-            
+            self.history_store.record_visit(url, title)
         except Exception as e:
             log.error(f"Failed to record history: {e}")
     
-    def _calculate_frecency(self, visit_count, last_visit, first_visit):
-        """
-        Calculate frecency score (frequency × recency).
-        Higher score = more relevant for autocomplete.
-        
-        Formula inspired by Firefox:
-        - Recent visits worth more
-        - Frequent visits compound
-        - Decay over time
-        """
-        import time
-        now = time.time()
-        
-        # Time buckets (in seconds)
-        HOUR = 3600
-        DAY = 86400
-        WEEK = 604800
-        MONTH = 2592000
-        
-        # Age of last visit
-        age = now - last_visit
-        
-        # Recency weight (more recent = higher)
-        if age < HOUR:
-            recency_weight = 100
-        elif age < DAY:
-            recency_weight = 70
-        elif age < WEEK:
-            recency_weight = 50
-        elif age < MONTH:
-            recency_weight = 30
-        else:
-            recency_weight = 10
-        
-        # Frequency bonus (caps at reasonable level)
-        frequency_bonus = min(visit_count * 10, 200)
-        
-        # Combined score
-        return recency_weight + frequency_bonus
-    
     def _get_history(self, limit=50, offset=0, search=None, time_filter=None):
         """
         Get history entries.
@@ -820,13 +787,7 @@ class TuxAssistantWindow(Adw.ApplicationWindow):
         import time
         
         try:
-            conn = sqlite3.connect(self.HISTORY_DB)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            query = 'SELECT url, title, visit_count, last_visit, frecency FROM history'
-            params = []
-            conditions = []
+            since = until = None
             
             # Time filter
             if time_filter:
@@ -834,35 +795,17 @@ class TuxAssistantWindow(Adw.ApplicationWindow):
                 today_start = now - (now % 86400)  # Start of today (UTC)
                 
                 if time_filter == 'today':
-                    conditions.append('last_visit >= ?')
-                    params.append(today_start)
+                    since = today_start
                 elif time_filter == 'yesterday':
-                    conditions.append('last_visit >= ? AND last_visit < ?')
-                    params.extend([today_start - 86400, today_start])
+                    since, until = today_start - 86400, today_start
                 elif time_filter == 'week':
-                    conditions.append('last_visit >= ?')
-                    params.append(now - 604800)
+                    since = now - 604800
                 elif time_filter == 'month':
-                    conditions.append('last_visit >= ?')
-                    params.append(now - 2592000)
-            
-            # Search filter
-            if search:
-                conditions.append('(url LIKE ? OR title LIKE ?)')
-                search_term = f'%{search}%'
-                params.extend([search_term, search_term])
-            
-            if conditions:
-                query += ' WHERE ' + ' AND '.join(conditions)
-            
-            query += ' ORDER BY last_visit DESC LIMIT ? OFFSET ?'
-            params.extend([limit, offset])
+                    since = now - 2592000
             
-            cursor.execute(query, params)
-            results = [dict(row) for row in cursor.fetchall()]
-            
-            conn.close()
-            return results
+            return self.history_store.get_history(
+                limit=limit, offset=offset, search=search, since=since, until=until
+            )
             
         except Exception as e:
             log.error(f"Failed to get history: {e}")
@@ -874,24 +817,7 @@ class TuxAssistantWindow(Adw.ApplicationWindow):
             return []
         
         try:
-            conn = sqlite3.connect(self.HISTORY_DB)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            # Search by URL or title, order by frecency
-            search_term = f'%{query}%'
-            cursor.execute('''
-                SELECT url, title, frecency 
-                FROM history 
-                WHERE url LIKE ? OR title LIKE ?
-                ORDER BY frecency DESC
-                LIMIT ?
-            ''', (search_term, search_term, limit))
-            
-            results = [dict(row) for row in cursor.fetchall()]
-            conn.close()
-            return results
-            
+            return self.history_store.get_suggestions(query, limit)
         except Exception as e:
             log.error(f"Failed to get history suggestions: {e}")
             return []
@@ -899,37 +825,18 @@ class TuxAssistantWindow(Adw.ApplicationWindow):
     def _get_history_count(self):
         """Get total number of history entries."""
         try:
-            conn = sqlite3.connect(self.HISTORY_DB)
-            cursor = conn.cursor()
-            cursor.execute('SELECT COUNT(*) FROM history')
-            count = cursor.fetchone()[0]
-            conn.close()
-            return count
+            return self.history_store.count()
         except Exception:
             return 0
     
     def _delete_history_entry(self, url):
         """Delete a single history entry."""
-        try:
-            conn = sqlite3.connect(self.HISTORY_DB)
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM history WHERE url = ?', (url,))
-            conn.commit()
-            conn.close()
-            return True
-        except Exception as e:
-            log.error(f"Failed to delete history entry: {e}")
-            return False
+        return self._delete_history_entries([url])
     
     def _delete_history_entries(self, urls):
         """Delete multiple history entries."""
         try:
-            conn = sqlite3.connect(self.HISTORY_DB)
-            cursor = conn.cursor()
-            cursor.executemany('DELETE FROM history WHERE url = ?', [(url,) for url in urls])
-            conn.commit()
-            conn.close()
-            return True
+            return self.history_store.delete(urls)
         except Exception as e:
             log.error(f"Failed to delete history entries: {e}")
             return False
@@ -944,21 +851,13 @@ class TuxAssistantWindow(Adw.ApplicationWindow):
         import time
         
         try:
-            conn = sqlite3.connect(self.HISTORY_DB)
-            cursor = conn.cursor()
-            
             if time_range == 'all':
-                cursor.execute('DELETE FROM history')
+                self.history_store.clear()
             elif time_range == 'hour':
-                cutoff = time.time() - 3600
-                cursor.execute('DELETE FROM history WHERE last_visit >= ?', (cutoff,))
+                self.history_store.clear(since=time.time() - 3600)
             elif time_range == 'today':
                 now = time.time()
-                today_start = now - (now % 86400)
-                cursor.execute('DELETE FROM history WHERE last_visit >= ?', (today_start,))
-            
-            conn.commit()
-            conn.close()
+                self.history_store.clear(since=now - (now % 86400))
             
             # VACUUM in background to reclaim space
             threading.Thread(target=self._vacuum_history_db, daemon=True).start()
@@ -968,9 +867,22 @@ class TuxAssistantWindow(Adw.ApplicationWindow):
             log.error(f"Failed to clear history: {e}")
             return False
     
+    def _on_history_maintenance_timer(self):
+        """Run periodic history maintenance off the main thread."""
+        threading.Thread(target=self._check_history_maintenance, daemon=True).start()
+        return True  # Keep the timer running
+    
     def _check_history_maintenance(self):
-        """Check if history database needs maintenance (size/entry limits)."""
+        """Check if history database needs maintenance (size/entry limits).
+        
+        Also rebases decayed frecency scores. Ranking doesn't depend on this
+        (it uses a time-independent sort key), it just keeps stored scores fresh.
+        """
         try:
+            rebased = self.history_store.recompute_frecency()
+            if rebased:
+                log.debug(f"Rebased frecency for {rebased} history entries")
+            
             # Check file size
             if os.path.exists(self.HISTORY_DB):
                 size_mb = os.path.getsize(self.HISTORY_DB) / (1024 * 1024)
@@ -991,26 +903,11 @@ class TuxAssistantWindow(Adw.ApplicationWindow):
     def _cleanup_old_history(self):
         """Delete oldest entries to stay within limits."""
         try:
-            conn = sqlite3.connect(self.HISTORY_DB)
-            cursor = conn.cursor()
-            
-            # Get count
-            cursor.execute('SELECT COUNT(*) FROM history')
-            count = cursor.fetchone()[0]
-            
             # Delete oldest 20%
-            delete_count = int(count * self.HISTORY_CLEANUP_PERCENT / 100)
+            delete_count = self.history_store.delete_oldest(self.HISTORY_CLEANUP_PERCENT)
             if delete_count > 0:
-                cursor.execute('''
-                    DELETE FROM history WHERE id IN (
-                        SELECT id FROM history ORDER BY last_visit ASC LIMIT ?
-                    )
-                ''', (delete_count,))
-                conn.commit()
                 print(f"Cleaned up {delete_count} old history entries")
             
-            conn.close()
-            
             # VACUUM to reclaim space
             self._vacuum_history_db()
             
@@ -1020,9 +917,7 @@ class TuxAssistantWindow(Adw.ApplicationWindow):
     def _vacuum_history_db(self):
         """Reclaim space in history database (run in background thread)."""
         try:
-            conn = sqlite3.connect(self.HISTORY_DB)
-            conn.execute('VACUUM')
-            conn.close()
+            self.history_store.vacuum()
         except Exception as e:
             log.error(f"History VACUUM failed: {e}")
     
@@ -1136,6 +1031,7 @@ class TuxAssistantWindow(Adw.ApplicationWindow):
             else:
                 self.tux_fetch_panel.set_visible(True)
     
+    @profiled()
     def build_ui(self):
         """Build the main user interface."""
         import os
@@ -2634,9 +2530,10 @@ class TuxAssistantWindow(Adw.ApplicationWindow):
         webview.set_vexpand(True)
         webview.set_hexpand(True)
         
-        # Apply ad-hiding CSS if blocking is enabled
+        # Apply ad-hiding CSS and compiled content filters if blocking is enabled
         if self.block_ads:
             self._apply_ad_blocking_css(webview)
+            self._apply_content_filters(webview)
         
         # Configure settings
         settings = webview.get_settings()
@@ -3486,42 +3383,44 @@ user_pref("browser.shell.checkDefaultBrowser", false);
             if not domain:
                 return icon
             
-            # Check favicon cache
-            cache_dir = os.path.join(GLib.get_user_cache_dir(), 'tux-assistant', 'favicons')
-            os.makedirs(cache_dir, exist_ok=True)
-            
-            cache_file = os.path.join(cache_dir, f"{domain}.ico")
-            
-            if os.path.exists(cache_file):
-                # Load from cache
+            # Check the HTTP cache (any age: a stale icon beats none)
+            favicon_url = self.FAVICON_URL.format(domain=domain)
+            cache = get_http_cache()
+            entry = cache.lookup(favicon_url)
+            data = cache.body(favicon_url) if entry else None
+            if data:
                 try:
-                    pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(cache_file, 24, 24, True)
+                    loader = GdkPixbuf.PixbufLoader()
+                    loader.write(data)
+                    loader.close()
+                    pixbuf = loader.get_pixbuf().scale_simple(24, 24, GdkPixbuf.InterpType.BILINEAR)
                     icon = Gtk.Image.new_from_pixbuf(pixbuf)
                 except Exception:
                     pass
-            else:
-                # Queue async favicon fetch (don't block UI)
-                GLib.idle_add(self._fetch_favicon_async, domain, cache_file)
+            
+            if data and entry.is_fresh(self.FAVICON_MAX_AGE):
+                cache.record('hits', entry.size)
+            elif favicon_url not in self._favicon_fetches:
+                # Fetch or revalidate in the background (don't block UI);
+                # the icon shows the next time the list is built
+                self._favicon_fetches.add(favicon_url)
+                threading.Thread(
+                    target=self._fetch_favicon_async, args=(favicon_url,), daemon=True
+                ).start()
         except Exception:
             pass
         
         return icon
     
-    def _fetch_favicon_async(self, domain, cache_file):
-        """Fetch favicon in background."""
-        import urllib.request
-        import os
-        
+    def _fetch_favicon_async(self, favicon_url):
+        """Fetch a favicon into the HTTP cache (runs in background thread)."""
         try:
-            # Use DuckDuckGo's favicon service
-            favicon_url = f"https://icons.duckduckgo.com/ip3/{domain}.ico"
-            
-            # Fetch with timeout
-            urllib.request.urlretrieve(favicon_url, cache_file)
+            # DuckDuckGo's favicon service
+            get_http_client().get(favicon_url, timeout=10, max_age=self.FAVICON_MAX_AGE)
         except Exception:
             pass
-        
-        return False  # Don't repeat
+        finally:
+            self._favicon_fetches.discard(favicon_url)
     
     def _update_bookmark_star(self):
         """Update bookmark star icon based on current URL."""
@@ -6373,35 +6272,34 @@ user_pref("browser.shell.checkDefaultBrowser", false);
         except Exception as e:
             self.show_toast(f"OCS install failed: {e}")
     
+    @profiled()
+    def _init_blocklist(self):
+        """Compile built-in ad/tracker domains; load user host lists in background."""
+        self.blocklist = DomainBlocklist()
+        self.blocklist.add(self.AD_DOMAINS, 'ads')
+        self.blocklist.add(self.TRACKER_DOMAINS, 'trackers')
+        
+        if os.path.isdir(self.BLOCKLISTS_DIR):
+            def load():
+                count = self.blocklist.load_directory(self.BLOCKLISTS_DIR)
+                log.info(f"Loaded {count} blocklist entries from {self.BLOCKLISTS_DIR}")
+            threading.Thread(target=load, daemon=True).start()
+    
     def _should_block_uri(self, uri):
         """Check if a URI should be blocked based on privacy settings."""
         if not uri:
             return False
         
+        categories = []
+        if self.block_ads:
+            categories.append('ads')
+        if self.block_trackers:
+            categories.append('trackers')
+        
         try:
-            # Extract domain from URI
-            from urllib.parse import urlparse
-            parsed = urlparse(uri)
-            domain = parsed.netloc.lower()
-            
-            # Remove www. prefix for matching
-            if domain.startswith('www.'):
-                domain = domain[4:]
-            
-            # Check against blocklists
-            if self.block_ads:
-                for ad_domain in self.AD_DOMAINS:
-                    if ad_domain in domain or domain.endswith('.' + ad_domain):
-                        return True
-            
-            if self.block_trackers:
-                for tracker_domain in self.TRACKER_DOMAINS:
-                    if tracker_domain in domain or domain.endswith('.' + tracker_domain):
-                        return True
+            return self.blocklist.match(uri, categories) is not None
         except Exception:
-            pass
-        
-        return False
+            return False
     
     def _on_https_toggled(self, switch, pspec):
         """Handle HTTPS toggle."""
@@ -7039,13 +6937,7 @@ user_pref("browser.shell.checkDefaultBrowser", false);
     def _on_clear_history_clicked(self, button):
         """Clear browsing history."""
         try:
-            history_db = os.path.join(self.CONFIG_DIR, 'browser_history.db')
-            if os.path.exists(history_db):
-                import sqlite3
-                conn = sqlite3.connect(history_db)
-                conn.execute("DELETE FROM history")
-                conn.commit()
-                conn.close()
+            self.history_store.clear()
             self._show_toast("History cleared")
         except Exception as e:
             self._show_toast(f"Failed to clear history: {e}")
@@ -7098,13 +6990,7 @@ user_pref("browser.shell.checkDefaultBrowser", false);
         if response == "clear":
             # Clear history
             try:
-                history_db = os.path.join(self.CONFIG_DIR, 'browser_history.db')
-                if os.path.exists(history_db):
-                    import sqlite3
-                    conn = sqlite3.connect(history_db)
-                    conn.execute("DELETE FROM history")
-                    conn.commit()
-                    conn.close()
+                self.history_store.clear()
             except Exception:
                 pass
             
@@ -7248,38 +7134,19 @@ user_pref("browser.shell.checkDefaultBrowser", false);
         # Store release URL for download button
         self.update_release_url = None
     
+    @profiled()
     def _check_for_updates(self):
         """Check GitHub for updates (runs in background thread)."""
         def do_check():
             try:
-                # Check if we should skip (checked in last 24 hours)
-                if os.path.exists(self.UPDATE_CHECK_FILE):
-                    try:
-                        with open(self.UPDATE_CHECK_FILE, 'r') as f:
-                            cached = json.load(f)
-                        last_check = datetime.fromisoformat(cached.get('last_check', '2000-01-01'))
-                        if datetime.now() - last_check < timedelta(hours=24):
-                            # Re-verify cached version is actually newer than CURRENT version
-                            cached_version = cached.get('latest_version', '')
-                            current = APP_VERSION.lstrip('v')
-                            if cached_version and self._compare_versions(cached_version, current) > 0:
-                                GLib.idle_add(
-                                    self._show_update_available,
-                                    cached_version,
-                                    cached.get('changelog', ''),
-                                    cached.get('release_url', '')
-                                )
-                            return
-                    except (json.JSONDecodeError, ValueError):
-                        pass  # Invalid cache, check anyway
-                
-                # Fetch latest release from GitHub
-                req = urllib.request.Request(
+                # Fetch latest release from GitHub. The HTTP cache answers
+                # for a day; after that the request carries the release's
+                # ETag and an unchanged release costs a 304.
+                data = get_http_client().get_json(
                     self.GITHUB_RELEASES_URL,
-                    headers={'User-Agent': f'Tux-Assistant/{APP_VERSION}'}
+                    headers={'User-Agent': f'Tux-Assistant/{APP_VERSION}'},
+                    timeout=10, cached=True, max_age=self.UPDATE_CHECK_MAX_AGE
                 )
-                with urllib.request.urlopen(req, timeout=10) as response:
-                    data = json.loads(response.read().decode('utf-8'))
                 
                 latest_version = data.get('tag_name', '').lstrip('v')
                 changelog = data.get('body', '')[:500]  # Limit changelog length
@@ -7289,17 +7156,6 @@ user_pref("browser.shell.checkDefaultBrowser", false);
                 current = APP_VERSION.lstrip('v')
                 update_available = self._compare_versions(latest_version, current) > 0
                 
-                # Cache the result
-                os.makedirs(self.CONFIG_DIR, exist_ok=True)
-                with open(self.UPDATE_CHECK_FILE, 'w') as f:
-                    json.dump({
-                        'last_check': datetime.now().isoformat(),
-                        'latest_version': latest_version,
-                        'update_available': update_available,
-                        'changelog': changelog,
-                        'release_url': release_url
-                    }, f)
-                
                 # Show update if available
                 if update_available:
                     GLib.idle_add(
@@ -7383,6 +7239,7 @@ user_pref("browser.shell.checkDefaultBrowser", false);
             else:
                 self.blocked_label.set_label("🛡️ Protection active")
     
+    @profiled()
     def _init_content_filters(self):
         """Initialize WebKit content filter store for ad blocking."""
         try:
@@ -7405,30 +7262,41 @@ user_pref("browser.shell.checkDefaultBrowser", false);
             print(f"[Privacy] Failed to init content filters: {e}")
     
     def _load_or_create_filters(self):
-        """Load existing filters or create new ones."""
+        """Load precompiled filters, or compile them if the lists changed.
+        
+        Hashing and compiling the lists happens on a background thread;
+        when the content hash matches the cached manifest, startup only
+        loads the already-compiled shards from the store.
+        """
         if not self.content_filter_store:
             return
         
-        # Check if we have a cached filter
-        filter_file = os.path.join(self.CONFIG_DIR, 'filters', 'easylist.json')
+        filter_dir = os.path.join(self.CONFIG_DIR, 'filters')
+        self.filter_cache = FilterCache(filter_dir)
         
-        if not os.path.exists(filter_file):
-            # Create our filter rules
-            self._create_filter_rules(filter_file)
+        @profiled("content filters: prepare")
+        def prepare():
+            try:
+                builtin = self._create_filter_rules()
+                sources = list_sources(self.BLOCKLISTS_DIR) if os.path.isdir(self.BLOCKLISTS_DIR) else []
+                source_hash = sources_hash(sources, builtin)
+                
+                identifiers = self.filter_cache.cached_identifiers(source_hash)
+                if identifiers:
+                    GLib.idle_add(self._load_cached_filters, source_hash, identifiers)
+                    return
+                
+                rules = compile_rules(read_lines(sources), builtin)
+                shards = shard_rules(rules)
+                print(f"[Privacy] Compiled {len(rules)} filter rules into {len(shards)} list(s)")
+                GLib.idle_add(self._save_compiled_filters, source_hash, shards, len(rules))
+            except Exception as e:
+                print(f"[Privacy] Failed to prepare filters: {e}")
         
-        # Load the filter
-        try:
-            self.content_filter_store.load(
-                'tux-adblock',
-                None,  # cancellable
-                self._on_filter_loaded
-            )
-        except Exception as e:
-            print(f"[Privacy] Filter load failed, saving new: {e}")
-            self._save_and_load_filter(filter_file)
+        threading.Thread(target=prepare, daemon=True).start()
     
-    def _create_filter_rules(self, filter_file):
-        """Create WebKit content blocker rules in JSON format."""
+    def _create_filter_rules(self):
+        """Built-in WebKit content blocker rules, merged with any user lists."""
         # WebKit Content Blocker format (same as Safari)
         # This is a curated list based on EasyList patterns
         rules = [
@@ -7477,52 +7345,92 @@ user_pref("browser.shell.checkDefaultBrowser", false);
             {"trigger": {"url-filter": ".*"}, "action": {"type": "css-display-none", "selector": "ins.adsbygoogle, amp-ad, amp-embed, amp-sticky-ad"}},
         ]
         
-        import json
-        with open(filter_file, 'w') as f:
-            json.dump(rules, f)
+        return rules
+    
+    def _load_cached_filters(self, source_hash, identifiers):
+        """Load already-compiled filter shards from the store (main thread)."""
+        state = {'pending': len(identifiers), 'failed': False}
+        
+        def on_loaded(store, result):
+            try:
+                self._add_content_filter(store.load_finish(result))
+            except Exception as e:
+                print(f"[Privacy] Cached filter missing, recompiling: {e}")
+                state['failed'] = True
+            state['pending'] -= 1
+            if state['pending'] == 0:
+                if state['failed']:
+                    # Store was cleared behind our back; rebuild everything
+                    self.content_filters = []
+                    self.filter_cache.save_manifest('', [], 0)
+                    self._load_or_create_filters()
+                else:
+                    print(f"[Privacy] Loaded {len(identifiers)} precompiled content filter(s)")
         
-        print(f"[Privacy] Created {len(rules)} filter rules")
+        for identifier in identifiers:
+            self.content_filter_store.load(identifier, None, on_loaded)
+        return False
     
-    def _save_and_load_filter(self, filter_file):
-        """Save filter to store and load it."""
-        if not self.content_filter_store or not os.path.exists(filter_file):
-            return
+    def _save_compiled_filters(self, source_hash, shards, rule_count):
+        """Compile shards into the store, then record them in the manifest."""
+        identifiers = FilterCache.identifiers_for(source_hash, len(shards))
+        state = {'pending': len(shards), 'failed': False}
         
-        try:
-            with open(filter_file, 'r') as f:
-                rules_json = f.read()
-            
-            # Save to the filter store
+        def on_saved(store, result):
+            try:
+                self._add_content_filter(store.save_finish(result))
+            except Exception as e:
+                print(f"[Privacy] Filter save failed: {e}")
+                state['failed'] = True
+            state['pending'] -= 1
+            if state['pending'] == 0 and not state['failed']:
+                self.filter_cache.save_manifest(source_hash, identifiers, rule_count)
+                self._remove_stale_filters(identifiers)
+                print("[Privacy] Content filters compiled and ready")
+        
+        for identifier, shard in zip(identifiers, shards):
             self.content_filter_store.save(
-                'tux-adblock',
-                GLib.Bytes.new(rules_json.encode('utf-8')),
+                identifier,
+                GLib.Bytes.new(json.dumps(shard).encode('utf-8')),
                 None,  # cancellable
-                self._on_filter_saved
+                on_saved
             )
-        except Exception as e:
-            print(f"[Privacy] Failed to save filter: {e}")
+        return False
     
-    def _on_filter_saved(self, store, result):
-        """Called when filter is saved."""
+    def _remove_stale_filters(self, keep):
+        """Delete compiled filters from older list versions."""
+        def on_identifiers(store, result):
+            try:
+                for identifier in store.fetch_identifiers_finish(result) or []:
+                    if identifier.startswith(FILTER_IDENTIFIER_PREFIX) and identifier not in keep:
+                        store.remove(identifier, None, None)
+            except Exception as e:
+                log.debug(f"Could not prune old content filters: {e}")
+        
         try:
-            content_filter = store.save_finish(result)
-            self.content_filters.append(content_filter)
-            print("[Privacy] Content filter saved and ready")
-        except Exception as e:
-            print(f"[Privacy] Filter save failed: {e}")
+            self.content_filter_store.fetch_identifiers(None, on_identifiers)
+        except Exception:
+            pass
     
-    def _on_filter_loaded(self, store, result):
-        """Called when filter is loaded."""
+    def _add_content_filter(self, content_filter):
+        """Track a ready filter and apply it to tabs that are already open."""
+        self.content_filters.append(content_filter)
+        if not self.block_ads or not hasattr(self, 'browser_tab_view'):
+            return
+        for i in range(self.browser_tab_view.get_n_pages()):
+            page = self.browser_tab_view.get_nth_page(i)
+            webview = page.get_child() if page else None
+            if webview:
+                webview.get_user_content_manager().add_filter(content_filter)
+    
+    def _apply_content_filters(self, webview):
+        """Attach compiled content filters to a new WebView."""
         try:
-            content_filter = store.load_finish(result)
-            self.content_filters.append(content_filter)
-            print("[Privacy] Content filter loaded")
+            content_manager = webview.get_user_content_manager()
+            for content_filter in self.content_filters:
+                content_manager.add_filter(content_filter)
         except Exception as e:
-            # Filter doesn't exist yet, create it
-            filter_file = os.path.join(self.CONFIG_DIR, 'filters', 'easylist.json')
-            if not os.path.exists(filter_file):
-                self._create_filter_rules(filter_file)
-            self._save_and_load_filter(filter_file)
+            log.error(f"Failed to apply content filters: {e}")
     
     def _apply_ad_blocking_css(self, webview):
         """Apply CSS to hide common ad elements."""
@@ -9303,49 +9211,120 @@ read -p "Press Enter to close..."
     # Search Functionality
     # =========================================================================
     
-    def _build_search_index(self) -> list:
-        """Build searchable index from all modules."""
-        search_items = []
+    # Also index content inside modules (software center apps, help topics)
+    SEARCH_MODULE_CONTENT = True
+    
+    # Import module pages in the background after startup
+    PREWARM_MODULES = True
+    
+    def _build_search_index(self) -> SearchIndex:
+        """Build searchable index from all modules (and their content)."""
+        index = SearchIndex()
         
         for category in ModuleRegistry.get_categories():
             modules = ModuleRegistry.get_modules_by_category(category)
             for mod in modules:
-                # Add module with keywords
-                keywords = [
-                    mod.name.lower(),
-                    mod.id.lower(),
-                    mod.description.lower() if mod.description else "",
-                    category.value.lower(),
-                ]
-                
-                # Add common search terms for each module
-                module_keywords = {
-                    "gaming": ["steam", "lutris", "proton", "wine", "games", "play"],
-                    "software_center": ["install", "apps", "software", "packages", "flatpak", "snap"],
-                    "system_maintenance": ["update", "clean", "cache", "startup", "services"],
-                    "networking_simple": ["wifi", "network", "internet", "connection", "vpn", "samba"],
-                    "hardware_manager": ["printer", "bluetooth", "drivers", "sound", "audio"],
-                    "desktop_enhancements": ["theme", "icon", "font", "wallpaper", "gnome", "kde", "extensions"],
-                    "backup_restore": ["backup", "restore", "timeshift", "snapshot"],
-                    "setup_tools": ["codecs", "drivers", "nvidia", "setup"],
-                    "media_server": ["plex", "jellyfin", "media", "server", "dvd"],
-                    "developer_tools": ["git", "ssh", "code", "programming", "aur", "deb", "rpm"],
-                    "help_learning": ["help", "tutorial", "learn", "troubleshoot", "guide"],
-                    "repo_management": ["repository", "repo", "ppa", "copr", "packman", "multilib"],
-                }
-                
-                if mod.id in module_keywords:
-                    keywords.extend(module_keywords[mod.id])
-                
-                search_items.append({
-                    "module": mod,
-                    "keywords": " ".join(keywords),
-                    "name": mod.name,
-                    "description": mod.description or "",
-                    "icon": mod.icon,
-                })
+                index.add(
+                    {
+                        "module": mod,
+                        "name": mod.name,
+                        "description": mod.description or "",
+                        "icon": mod.icon,
+                        "open_func": None,
+                    },
+                    title=mod.name,
+                    keywords=" ".join([mod.id.replace("_", " "), category.value,
+                                       *mod.keywords]),
+                    description=mod.description or "",
+                )
         
-        return search_items
+        if self.SEARCH_MODULE_CONTENT:
+            for module_id, provider in ModuleRegistry.get_search_providers().items():
+                mod = ModuleRegistry.get_module(module_id)
+                if not mod or not mod.enabled:
+                    continue
+                try:
+                    entries = provider()
+                except Exception as e:
+                    log.warning(f"Search provider for {module_id} failed: {e}")
+                    continue
+                for entry in entries:
+                    index.add(
+                        {
+                            "module": mod,
+                            "name": entry.title,
+                            "description": f"{mod.name} · {entry.description}",
+                            "icon": entry.icon or mod.icon,
+                            "open_func": entry.open_func,
+                        },
+                        title=entry.title,
+                        keywords=entry.keywords,
+                        description=entry.description,
+                    )
+        
+        index.build()
+        return index
+    
+    def _get_search_index(self) -> SearchIndex:
+        """
+        Get the cached search index.
+        
+        Only the very first build is waited for. When modules changed since
+        the index was built, the current one is returned and a worker
+        thread rebuilds it for the next query.
+        """
+        index = self._search_index
+        if index is not None:
+            if self._search_index_generation != ModuleRegistry.generation():
+                self._refresh_search_index()
+            return index
+        with self._search_index_lock:
+            if self._search_index is None:
+                self._update_search_index()
+            return self._search_index
+    
+    def _update_search_index(self):
+        """Build and store a new search index (caller holds the lock)."""
+        # Read first: a change during the build triggers another one
+        generation = ModuleRegistry.generation()
+        self._search_index = self._build_search_index()
+        self._search_index_generation = generation
+    
+    def _refresh_search_index(self):
+        """Rebuild the search index on a worker thread, unless one already is."""
+        if not self._search_index_lock.acquire(blocking=False):
+            return
+        
+        def rebuild():
+            try:
+                if self._search_index_generation != ModuleRegistry.generation():
+                    self._update_search_index()
+            finally:
+                self._search_index_lock.release()
+        
+        threading.Thread(target=rebuild, daemon=True).start()
+    
+    def _prewarm_search_index(self):
+        """Build the search index in the background so typing never waits."""
+        threading.Thread(target=self._get_search_index, daemon=True).start()
+        return False
+    
+    def _prewarm_next_module(self):
+        """Import one not-yet-loaded module page per idle callback."""
+        pending = ModuleRegistry.get_pending_modules()
+        if not pending:
+            return False
+        # A failed import is recorded by the registry and left out of the
+        # pending list, so the next callback moves on to the next module
+        ModuleRegistry.load_module(pending[0])
+        return len(pending) > 1
+    
+    def _open_search_result(self, match):
+        """Open a search result (a module page or content inside a module)."""
+        if match["open_func"]:
+            match["open_func"](self)
+        else:
+            self.on_module_clicked(None, match["module"])
     
     def _on_search_changed(self, entry):
         """Handle search text changes - show/hide results."""
@@ -9368,26 +9347,21 @@ read -p "Press Enter to close..."
         while child := self.search_results_box.get_first_child():
             self.search_results_box.remove(child)
         
-        # Search
-        search_index = self._build_search_index()
-        matches = []
-        
-        for item in search_index:
-            if query in item["keywords"]:
-                matches.append(item)
+        # Search (cached index, ranked)
+        matches = self._get_search_index().search(query, limit=10)
         
         if matches:
             results_group = Adw.PreferencesGroup()
             results_group.set_title(f"Results for \"{entry.get_text().strip()}\"")
             
-            for match in matches[:10]:  # Limit to 10 results
+            for match in matches:
                 row = Adw.ActionRow()
                 row.set_title(match["name"])
                 row.set_subtitle(match["description"])
                 row.set_activatable(True)
                 row.add_prefix(Gtk.Image.new_from_icon_name(match["icon"]))
                 row.add_suffix(Gtk.Image.new_from_icon_name("tux-go-next-symbolic"))
-                row.connect("activated", self.on_module_clicked, match["module"])
+                row.connect("activated", lambda r, m=match: self._open_search_result(m))
                 results_group.add(row)
             
             self.search_results_box.append(results_group)
@@ -9416,18 +9390,14 @@ read -p "Press Enter to close..."
             return
         
         # Check for matches
-        search_index = self._build_search_index()
-        matches = [item for item in search_index if query in item["keywords"]]
+        matches = self._get_search_index().search(query, limit=1)
         
         if matches:
-            # Navigate to first match
-            mod = matches[0]["module"]
-            if mod.page_class:
-                page = mod.page_class(self)
-                self.navigation_view.push(page)
-                entry.set_text("")
-                self.search_results_box.set_visible(False)
-                self.modules_content_box.set_visible(True)
+            # Navigate to best match
+            self._open_search_result(matches[0])
+            entry.set_text("")
+            self.search_results_box.set_visible(False)
+            self.modules_content_box.set_visible(True)
         else:
             # No matches - do web search
             self._do_web_search(entry.get_text().strip())
@@ -9470,9 +9440,11 @@ read -p "Press Enter to close..."
     
     def on_module_clicked(self, row, module_info):
         """Handle module click - navigate to module page."""
-        if module_info.page_class:
+        # Imports the module on first use
+        page_class = module_info.get_page_class()
+        if page_class:
             # Create an instance of the module's page class
-            page = module_info.page_class(self)
+            page = page_class(self)
             self.navigation_view.push(page)
         else:
             # Module exists but has no page yet
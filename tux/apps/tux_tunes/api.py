@@ -7,28 +7,49 @@ API Documentation: https://docs.radio-browser.info/
 Copyright (c) 2025 Christopher Dorrell. Licensed under GPL-3.0.
 """
 
-import json
-import urllib.request
 import urllib.parse
 import random
 import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from dataclasses import dataclass
 from typing import Optional
 
+from ...core.httpclient import HttpClient, get_http_client
+
+
+# Used until DNS has answered, or if it can't
+FALLBACK_SERVERS = [
+    "de1.api.radio-browser.info",
+    "de2.api.radio-browser.info",
+    "fi1.api.radio-browser.info",
+    "nl1.api.radio-browser.info",
+]
+
+REQUEST_TIMEOUT = 10
+HEALTH_CHECK_TIMEOUT = 3
+RANKING_MAX_AGE = 10 * 60    # Re-check mirrors after this long
+HEDGE_FACTOR = 3             # Ask the runner-up once the fastest takes this many times its usual latency
+MIN_HEDGE_DELAY = 0.25
+
 
 def get_api_servers() -> list[str]:
     """Get list of available API servers via DNS lookup."""
     try:
         # Query DNS for available servers
-        ips = socket.getaddrinfo('all.api.radio-browser.info', 443, socket.AF_INET, socket.SOCK_STREAM)
-        hosts = set()
-        for ip in ips:
+        infos = socket.getaddrinfo('all.api.radio-browser.info', 443, socket.AF_INET, socket.SOCK_STREAM)
+        ips = sorted({info[4][0] for info in infos})
+        
+        def reverse(ip):
             try:
-                # Reverse DNS to get hostname
-                hostname = socket.gethostbyaddr(ip[4][0])[0]
-                hosts.add(hostname)
+                return socket.gethostbyaddr(ip)[0]
             except Exception:
-                pass
+                return None
+        
+        # Reverse DNS to get hostnames, all at once
+        with ThreadPoolExecutor(max_workers=max(1, len(ips))) as pool:
+            hosts = {host for host in pool.map(reverse, ips) if host}
         if hosts:
             print(f"Found API servers via DNS: {hosts}")
             return list(hosts)
@@ -36,12 +57,100 @@ def get_api_servers() -> list[str]:
         print(f"DNS lookup failed: {e}")
     
     # Fallback to known servers
-    return [
-        "de1.api.radio-browser.info",
-        "de2.api.radio-browser.info",
-        "fi1.api.radio-browser.info",
-        "nl1.api.radio-browser.info",
-    ]
+    return list(FALLBACK_SERVERS)
+
+
+class MirrorPool:
+    """
+    Radio Browser mirrors ranked by measured latency.
+    
+    Discovery and health checks run in the background: the servers are
+    resolved, every mirror is asked for /json/stats in parallel, and the
+    ones that answer are ranked fastest first (which also leaves a warm
+    keep-alive connection to each in the HTTP client's pool). Latencies
+    of real requests keep the ranking current.
+    """
+    
+    def __init__(self, http: HttpClient, user_agent: str):
+        self.http = http
+        self.user_agent = user_agent
+        self._latency: dict[str, float] = {}    # Smoothed seconds per host
+        self._failures: dict[str, int] = {}     # Consecutive failures per host
+        self._servers = list(FALLBACK_SERVERS)
+        random.shuffle(self._servers)
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._ranked_at = 0.0
+        self.ready = threading.Event()          # Set after the first ranking
+    
+    def refresh(self):
+        """Re-resolve and re-check the mirrors in a background thread."""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh, name='tux-tunes-mirrors', daemon=True).start()
+    
+    def _refresh(self):
+        try:
+            servers = get_api_servers()
+            with self._lock:
+                self._servers = servers
+            results = {}
+            with ThreadPoolExecutor(max_workers=len(servers)) as pool:
+                futures = {pool.submit(self._check, host): host for host in servers}
+                # Rank as answers arrive: requests can use the first
+                # healthy mirror without waiting for the slowest check
+                for future in as_completed(futures):
+                    host, latency = futures[future], future.result()
+                    results[host] = latency
+                    self.report(host, latency)
+                    if latency is not None:
+                        self.ready.set()
+            with self._lock:
+                self._ranked_at = time.monotonic()
+            ranking = ', '.join(f"{host} ({results[host] * 1000:.0f} ms)"
+                                for host in sorted(results, key=lambda h: results[h] or 0)
+                                if results[host] is not None)
+            print(f"API servers by latency: {ranking or 'none reachable'}")
+        except Exception as e:
+            print(f"API server check failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+            self.ready.set()
+    
+    def _check(self, host: str) -> Optional[float]:
+        """Seconds for host to answer /json/stats, or None if it didn't."""
+        started = time.monotonic()
+        try:
+            self.http.get_json(f"https://{host}/json/stats", timeout=HEALTH_CHECK_TIMEOUT,
+                               retries=0, headers={'User-Agent': self.user_agent})
+        except Exception:
+            return None
+        return time.monotonic() - started
+    
+    def ranked(self) -> list[str]:
+        """Healthy mirrors fastest first, then unmeasured ones, then failing ones."""
+        if time.monotonic() - self._ranked_at > RANKING_MAX_AGE:
+            self.refresh()
+        with self._lock:
+            return sorted(self._servers, key=lambda h: (
+                self._failures.get(h, 0), h not in self._latency, self._latency.get(h, 0.0)))
+    
+    def latency(self, host: str) -> Optional[float]:
+        with self._lock:
+            return self._latency.get(host)
+    
+    def report(self, host: str, latency: Optional[float]):
+        """Record a request's latency (None if it failed)."""
+        with self._lock:
+            if latency is None:
+                self._failures[host] = self._failures.get(host, 0) + 1
+                return
+            self._failures[host] = 0
+            previous = self._latency.get(host)
+            self._latency[host] = latency if previous is None else 0.7 * previous + 0.3 * latency
 
 
 @dataclass
@@ -108,56 +217,116 @@ class Station:
 class RadioBrowserAPI:
     """Client for the radio-browser.info API."""
     
-    def __init__(self):
-        self.servers = get_api_servers()
-        random.shuffle(self.servers)
-        self.server_index = 0
+    def __init__(self, catalog=None):
         self.user_agent = "TuxTunes/1.0"
+        # Optional StationCatalog: once downloaded it answers every
+        # lookup, and the network is only used for clicks and votes
+        self.catalog = catalog
+        self.http = get_http_client()
+        self.mirrors = MirrorPool(self.http, self.user_agent)
+        self.mirrors.refresh()
+        self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='tux-tunes-api')
+    
+    @property
+    def servers(self) -> list[str]:
+        """Known servers, fastest first."""
+        return self.mirrors.ranked()
     
     @property
     def current_server(self) -> str:
-        """Get current server hostname."""
-        return self.servers[self.server_index % len(self.servers)]
+        """Get the fastest server's hostname."""
+        return self.servers[0]
     
     @property
     def base_url(self) -> str:
         """Get current server base URL."""
         return f"https://{self.current_server}/json"
     
-    def _try_next_server(self):
-        """Try the next server in the list."""
-        self.server_index += 1
-        print(f"Switching to server: {self.current_server}")
+    def _fetch(self, server: str, endpoint: str, params: Optional[dict]):
+        """One request to one server, feeding its latency into the ranking."""
+        started = time.monotonic()
+        try:
+            # No retries on the same server: another mirror is quicker
+            data = self.http.get_json(f"https://{server}/json/{endpoint}", params=params,
+                                      timeout=REQUEST_TIMEOUT, retries=0,
+                                      headers={'User-Agent': self.user_agent})
+        except Exception as e:
+            self.mirrors.report(server, None)
+            print(f"API request failed on {server}: {e}")
+            raise
+        self.mirrors.report(server, time.monotonic() - started)
+        return data
     
-    def _request(self, endpoint: str, params: Optional[dict] = None) -> list[dict]:
-        """Make API request and return JSON response."""
-        # Try each server until one works
-        for attempt in range(len(self.servers)):
-            url = f"{self.base_url}/{endpoint}"
-            
-            if params:
-                url += "?" + urllib.parse.urlencode(params)
-            
-            print(f"API Request: {url}")
-            
-            req = urllib.request.Request(url)
-            req.add_header('User-Agent', self.user_agent)
-            req.add_header('Accept', 'application/json')
-            
+    def _hedged(self, servers: list[str], endpoint: str, params: Optional[dict]):
+        """
+        Ask the fastest server, and the runner-up too if the first is slow.
+        
+        The runner-up is asked once the fastest has taken HEDGE_FACTOR
+        times its usual latency, or straight away while nothing has been
+        measured yet. The first answer wins.
+        """
+        futures = [self._pool.submit(self._fetch, servers[0], endpoint, params)]
+        if len(servers) > 1:
+            latency = self.mirrors.latency(servers[0])
+            delay = 0 if latency is None else max(MIN_HEDGE_DELAY, HEDGE_FACTOR * latency)
+            done, _ = wait(futures, timeout=delay)
+            if not done or futures[0].exception():
+                futures.append(self._pool.submit(self._fetch, servers[1], endpoint, params))
+        
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if not future.exception():
+                    return future.result()
+        raise futures[0].exception()
+    
+    def fetch(self, endpoint: str, params: Optional[dict] = None, hedge: bool = True):
+        """
+        Make API request and return the decoded JSON.
+        
+        Raises:
+            Exception: The last server's error, if every server failed
+        """
+        # Don't make the user wait on a slow DNS answer, but give the
+        # background check a moment to rank the mirrors
+        self.mirrors.ready.wait(timeout=1.0)
+        servers = self.mirrors.ranked()
+        print(f"API Request: {endpoint} ({servers[0]})")
+        
+        # Race the two fastest, then fall back to the rest one by one
+        attempts = [servers[:2]] if hedge else [servers[:1], servers[1:2]]
+        attempts += [[server] for server in servers[2:]]
+        error = None
+        for candidates in attempts:
+            if not candidates:
+                continue
             try:
-                with urllib.request.urlopen(req, timeout=10) as response:
-                    data = json.loads(response.read().decode('utf-8'))
-                    print(f"API returned {len(data) if isinstance(data, list) else 'non-list'} results")
-                    return data if isinstance(data, list) else []
+                return self._hedged(candidates, endpoint, params)
             except Exception as e:
-                print(f"API request failed on {self.current_server}: {e}")
-                self._try_next_server()
+                error = e
         
-        print("All API servers failed")
-        return []
+        self.mirrors.refresh()
+        raise error
+    
+    def _request(self, endpoint: str, params: Optional[dict] = None, hedge: bool = True) -> list[dict]:
+        """Make API request and return JSON response."""
+        try:
+            data = self.fetch(endpoint, params, hedge)
+        except Exception:
+            print("All API servers failed")
+            return []
+        print(f"API returned {len(data) if isinstance(data, list) else 'non-list'} results")
+        return data if isinstance(data, list) else []
+    
+    def _local(self) -> bool:
+        """Whether the local catalog can answer lookups."""
+        return self.catalog is not None and self.catalog.ready
     
     def search(self, query: str, limit: int = 50) -> list[Station]:
         """Search for stations by name."""
+        if self._local():
+            return self.catalog.search(query, limit)
         data = self._request('stations/search', {
             'name': query,
             'limit': limit,
@@ -169,6 +338,8 @@ class RadioBrowserAPI:
     
     def search_by_tag(self, tag: str, limit: int = 50) -> list[Station]:
         """Search stations by tag/genre."""
+        if self._local():
+            return self.catalog.search_by_tag(tag, limit)
         # URL path style: /stations/bytag/rock
         data = self._request(f'stations/bytag/{urllib.parse.quote(tag)}', {
             'limit': limit,
@@ -180,6 +351,8 @@ class RadioBrowserAPI:
     
     def search_by_country(self, country: str, limit: int = 50) -> list[Station]:
         """Search stations by country."""
+        if self._local():
+            return self.catalog.search_by_country(country, limit)
         data = self._request(f'stations/bycountry/{urllib.parse.quote(country)}', {
             'limit': limit,
             'order': 'clickcount',
@@ -190,6 +363,8 @@ class RadioBrowserAPI:
     
     def get_popular(self, limit: int = 50) -> list[Station]:
         """Get most clicked stations."""
+        if self._local():
+            return self.catalog.get_popular(limit)
         data = self._request('stations/topclick', {
             'limit': limit,
             'hidebroken': 'true',
@@ -198,6 +373,8 @@ class RadioBrowserAPI:
     
     def get_trending(self, limit: int = 50) -> list[Station]:
         """Get stations with recent clicks."""
+        if self._local():
+            return self.catalog.get_trending(limit)
         data = self._request('stations/lastclick', {
             'limit': limit,
             'hidebroken': 'true',
@@ -206,6 +383,8 @@ class RadioBrowserAPI:
     
     def get_top_voted(self, limit: int = 50) -> list[Station]:
         """Get most voted stations."""
+        if self._local():
+            return self.catalog.get_top_voted(limit)
         data = self._request('stations/topvote', {
             'limit': limit,
             'hidebroken': 'true',
@@ -214,6 +393,8 @@ class RadioBrowserAPI:
     
     def get_tags(self, limit: int = 100) -> list[dict]:
         """Get available tags/genres."""
+        if self._local():
+            return self.catalog.get_tags(limit)
         return self._request('tags', {
             'limit': limit,
             'order': 'stationcount',
@@ -222,6 +403,8 @@ class RadioBrowserAPI:
     
     def get_countries(self, limit: int = 100) -> list[dict]:
         """Get countries with stations."""
+        if self._local():
+            return self.catalog.get_countries(limit)
         return self._request('countries', {
             'limit': limit,
             'order': 'stationcount', 
@@ -231,13 +414,14 @@ class RadioBrowserAPI:
     def click(self, station_uuid: str):
         """Register a click/play for a station."""
         try:
-            self._request(f'url/{station_uuid}')
+            # Not hedged: each answer would count as a click
+            self._request(f'url/{station_uuid}', hedge=False)
         except Exception:
             pass
     
     def vote(self, station_uuid: str):
         """Vote for a station."""
         try:
-            self._request(f'vote/{station_uuid}')
+            self._request(f'vote/{station_uuid}', hedge=False)
         except Exception:
             pass
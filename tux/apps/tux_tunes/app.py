@@ -231,6 +231,18 @@ class PreferencesDialog(Adw.PreferencesDialog):
         min_dur_row.set_value(self.library.get_config('min_recording_seconds', 30))
         min_dur_row.connect("notify::value", self._on_min_duration_changed)
         play_group.add(min_dur_row)
+        
+        # Station catalog group
+        catalog_group = Adw.PreferencesGroup()
+        catalog_group.set_title("Stations")
+        playback_page.add(catalog_group)
+        
+        catalog_row = Adw.SwitchRow()
+        catalog_row.set_title("Offline station catalog")
+        catalog_row.set_subtitle("Download the station list for instant search that works offline")
+        catalog_row.set_active(self.library.get_config('offline_catalog', False))
+        catalog_row.connect("notify::active", self._on_offline_catalog_changed)
+        catalog_group.add(catalog_row)
     
     def _on_recording_mode_changed(self, row, param):
         """Handle recording mode change."""
@@ -254,6 +266,15 @@ class PreferencesDialog(Adw.PreferencesDialog):
         self.library.set_config('min_recording_seconds', int(row.get_value()))
         self.window.player.min_recording_seconds = int(row.get_value())
     
+    def _on_offline_catalog_changed(self, row, param):
+        """Handle offline catalog toggle."""
+        enabled = row.get_active()
+        self.library.set_config('offline_catalog', enabled)
+        if enabled:
+            self.window.enable_catalog()
+        else:
+            self.window.disable_catalog()
+    
     def _on_choose_directory(self, row):
         """Handle directory chooser."""
         dialog = Gtk.FileDialog()
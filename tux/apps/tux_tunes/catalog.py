@@ -0,0 +1,431 @@
+"""
+Tux Tunes - Local Station Catalog
+
+An optional offline copy of the Radio Browser station list in SQLite,
+so searches, genre lists and the popular/trending/top-voted lists are
+answered locally in milliseconds and keep working without a network.
+
+- A full download (paged, in the background) fills the catalog and runs
+  again weekly to drop stations that were removed upstream (once two
+  downloads in a row no longer list them).
+- In between, a cheap incremental sync applies the station edits made
+  since the last one (stations/changed) and refreshes click and vote
+  counts for the lists that are ordered by them.
+- Station names and tags have a trigram full-text index, so substring
+  searches like the API's are indexed.
+
+Copyright (c) 2025 Christopher Dorrell. Licensed under GPL-3.0.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from .api import Station
+
+
+PAGE_SIZE = 10000
+FULL_SYNC_AGE = 7 * 24 * 60 * 60       # Re-download everything weekly
+INCREMENTAL_SYNC_AGE = 6 * 60 * 60     # Apply changes and counters this often
+COUNTER_REFRESH = 1000                 # Stations per list whose counts are refreshed
+
+# Trigram tokens are 3 characters; shorter queries fall back to LIKE
+FTS_MIN_QUERY = 3
+
+# API fields stored per station (names as the API returns them, so rows
+# convert straight to Station.from_dict)
+COLUMNS = (
+    'stationuuid', 'name', 'url', 'url_resolved', 'homepage', 'favicon',
+    'country', 'countrycode', 'state', 'language', 'tags', 'codec',
+    'bitrate', 'votes', 'clickcount', 'clicktimestamp', 'lastcheckok',
+    'lastchangetime', 'changeuuid',
+)
+
+SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS stations (
+        id INTEGER PRIMARY KEY,
+        stationuuid TEXT NOT NULL UNIQUE,
+        name TEXT, url TEXT, url_resolved TEXT, homepage TEXT, favicon TEXT,
+        country TEXT, countrycode TEXT, state TEXT, language TEXT, tags TEXT,
+        codec TEXT, bitrate INTEGER, votes INTEGER, clickcount INTEGER,
+        clicktimestamp TEXT, lastcheckok INTEGER, lastchangetime TEXT, changeuuid TEXT,
+        generation INTEGER NOT NULL DEFAULT 0
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_stations_clickcount ON stations(clickcount DESC)',
+    'CREATE INDEX IF NOT EXISTS idx_stations_votes ON stations(votes DESC)',
+    'CREATE INDEX IF NOT EXISTS idx_stations_clicktimestamp ON stations(clicktimestamp DESC)',
+    'CREATE TABLE IF NOT EXISTS tags (name TEXT PRIMARY KEY, stationcount INTEGER)',
+    'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)',
+]
+
+FTS_SCHEMA = [
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS stations_fts USING fts5(
+        name, tags, content='stations', content_rowid='id', tokenize='trigram'
+    )
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS stations_fts_ai AFTER INSERT ON stations BEGIN
+        INSERT INTO stations_fts(rowid, name, tags) VALUES (new.id, new.name, new.tags);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS stations_fts_ad AFTER DELETE ON stations BEGIN
+        INSERT INTO stations_fts(stations_fts, rowid, name, tags)
+        VALUES ('delete', old.id, old.name, old.tags);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS stations_fts_au AFTER UPDATE OF name, tags ON stations
+    WHEN old.name IS NOT new.name OR old.tags IS NOT new.tags BEGIN
+        INSERT INTO stations_fts(stations_fts, rowid, name, tags)
+        VALUES ('delete', old.id, old.name, old.tags);
+        INSERT INTO stations_fts(rowid, name, tags) VALUES (new.id, new.name, new.tags);
+    END
+    ''',
+]
+
+# Fields missing from a record (stations/changed omits the counters)
+# keep their stored values
+UPSERT = (
+    f"INSERT INTO stations ({', '.join(COLUMNS)}, generation) "
+    f"VALUES ({', '.join(':' + c for c in COLUMNS)}, :generation) "
+    f"ON CONFLICT(stationuuid) DO UPDATE SET "
+    + ', '.join(f"{c} = COALESCE(excluded.{c}, stations.{c})" for c in COLUMNS[1:])
+    + ", generation = MAX(stations.generation, excluded.generation)"
+)
+
+# Stations the API would hide with hidebroken=true
+VISIBLE = 'lastcheckok IS NOT 0'
+
+
+def _default_path() -> str:
+    cache = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(cache, 'tux-tunes', 'stations.db')
+
+
+def _row(record: dict, generation: int) -> dict:
+    row = {column: record.get(column) for column in COLUMNS}
+    row['generation'] = generation
+    return row
+
+
+class StationCatalog:
+    """Local copy of the Radio Browser station list."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or _default_path()
+        self._local = threading.local()
+        self._sync_lock = threading.Lock()
+        self.fts_enabled = False
+        self.syncing = False
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = self._connect()
+        for statement in SCHEMA:
+            conn.execute(statement)
+        try:
+            for statement in FTS_SCHEMA:
+                conn.execute(statement)
+            self.fts_enabled = True
+        except sqlite3.OperationalError as e:
+            # SQLite built without FTS5 or older than 3.34 (no trigram)
+            print(f"Catalog full-text search unavailable, using LIKE: {e}")
+        conn.commit()
+        conn.close()
+
+    # ==================== Connections ====================
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """The calling thread's read connection (WAL: reads don't wait for a sync)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def _meta(self, key: str, default=None):
+        row = self._reader().execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    @property
+    def ready(self) -> bool:
+        """Whether a full download has completed (searches can be answered)."""
+        return bool(self._meta('last_full_sync', 0))
+
+    def count(self) -> int:
+        return self._reader().execute('SELECT COUNT(*) FROM stations').fetchone()[0]
+
+    # ==================== Queries ====================
+
+    def _stations(self, sql: str, params=()) -> list[Station]:
+        # Missing (NULL) fields get Station.from_dict's defaults
+        return [Station.from_dict({k: row[k] for k in row.keys() if row[k] is not None})
+                for row in self._reader().execute(sql, params)]
+
+    def _select(self, where: str, order: str, params: tuple, limit: int) -> list[Station]:
+        return self._stations(
+            f"SELECT {', '.join(COLUMNS)} FROM stations WHERE {where} AND {VISIBLE} "
+            f"ORDER BY {order} LIMIT ?", params + (limit,))
+
+    def _text_match(self, column: str, text: str, limit: int) -> list[Station]:
+        """Stations whose `column` contains `text`, most clicked first."""
+        if self.fts_enabled and len(text) >= FTS_MIN_QUERY:
+            phrase = '"' + text.replace('"', '""') + '"'
+            return self._select(
+                'id IN (SELECT rowid FROM stations_fts WHERE stations_fts MATCH ?)',
+                'clickcount DESC', (f'{column} : {phrase}',), limit)
+        return self._select(f'{column} LIKE ?', 'clickcount DESC', (f'%{text}%',), limit)
+
+    def search(self, query: str, limit: int = 50) -> list[Station]:
+        """Stations whose name contains `query`."""
+        return self._text_match('name', query, limit)
+
+    def search_by_tag(self, tag: str, limit: int = 50) -> list[Station]:
+        """Stations with a tag containing `tag`."""
+        return self._text_match('tags', tag, limit)
+
+    def search_by_country(self, country: str, limit: int = 50) -> list[Station]:
+        return self._select('country LIKE ?', 'clickcount DESC', (f'%{country}%',), limit)
+
+    def get_popular(self, limit: int = 50) -> list[Station]:
+        return self._select('1', 'clickcount DESC', (), limit)
+
+    def get_trending(self, limit: int = 50) -> list[Station]:
+        return self._select('clicktimestamp IS NOT NULL', 'clicktimestamp DESC', (), limit)
+
+    def get_top_voted(self, limit: int = 50) -> list[Station]:
+        return self._select('1', 'votes DESC', (), limit)
+
+    def get_tags(self, limit: int = 100) -> list[dict]:
+        rows = self._reader().execute(
+            'SELECT name, stationcount FROM tags ORDER BY stationcount DESC LIMIT ?', (limit,))
+        return [dict(row) for row in rows]
+
+    def get_countries(self, limit: int = 100) -> list[dict]:
+        rows = self._reader().execute(
+            f"SELECT country AS name, COUNT(*) AS stationcount FROM stations "
+            f"WHERE country != '' AND {VISIBLE} GROUP BY country "
+            f"ORDER BY stationcount DESC LIMIT ?", (limit,))
+        return [dict(row) for row in rows]
+
+    # ==================== Sync ====================
+
+    def needs_sync(self, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        return now - max(self._meta('last_full_sync', 0), self._meta('last_sync', 0)) > INCREMENTAL_SYNC_AGE
+
+    def sync_in_background(self, api):
+        """Sync in a daemon thread if the catalog is due for one."""
+        if self.needs_sync():
+            threading.Thread(target=self.sync, args=(api,), name='tux-tunes-catalog',
+                             daemon=True).start()
+
+    def sync(self, api, full: Optional[bool] = None) -> bool:
+        """
+        Bring the catalog up to date from the API.
+
+        Downloads everything if the catalog is empty or its last full
+        download is older than FULL_SYNC_AGE, and applies changes
+        otherwise. Returns False if the sync failed or another one is
+        already running.
+        """
+        if not self._sync_lock.acquire(blocking=False):
+            return False
+        self.syncing = True
+        conn = self._connect()
+        try:
+            now = time.time()
+            if full is None:
+                full = not self._meta('cursor') or now - self._meta('last_full_sync', 0) > FULL_SYNC_AGE
+            started = time.monotonic()
+            if full:
+                self._full_sync(conn, api, self._meta('generation', 0) + 1)
+            else:
+                self._incremental_sync(conn, api)
+            self._rebuild_tags(conn)
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('last_sync', ?)", (now,))
+            conn.commit()
+            print(f"Station catalog {'downloaded' if full else 'updated'}: "
+                  f"{self.count()} stations in {time.monotonic() - started:.1f}s")
+            return True
+        except Exception as e:
+            conn.rollback()
+            print(f"Station catalog sync failed: {e}")
+            return False
+        finally:
+            conn.close()
+            self.syncing = False
+            self._sync_lock.release()
+
+    def _upsert(self, conn: sqlite3.Connection, records: list[dict], generation: int):
+        rows = [_row(r, generation) for r in records if r.get('stationuuid')]
+        with conn:
+            conn.executemany(UPSERT, rows)
+
+    def _full_sync(self, conn: sqlite3.Connection, api, generation: int):
+        """Download every station; drop the ones missing from two downloads in a row."""
+        # Remember where the change log stands now and replay it afterwards:
+        # stations edited while the pages are fetched may be missed
+        newest = api.fetch('stations', {
+            'order': 'changetimestamp', 'reverse': 'true', 'limit': 1,
+        }, hedge=False)
+        if not newest:
+            raise ValueError("the API returned no stations")
+        cursor = newest[0].get('changeuuid')
+
+        offset = 0
+        while True:
+            page = api.fetch('stations', {
+                'offset': offset, 'limit': PAGE_SIZE, 'order': 'changetimestamp',
+            }, hedge=False)
+            self._upsert(conn, page, generation)
+            offset += len(page)
+            if len(page) < PAGE_SIZE:
+                break
+        if not offset:
+            raise ValueError("the API returned no stations")
+
+        with conn:
+            # A station edited or removed mid-download shifts every later one
+            # a row back, so the one at the next page boundary isn't fetched.
+            # Only stations that two downloads in a row didn't list are gone.
+            conn.execute('DELETE FROM stations WHERE generation < ?', (generation - 1,))
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('cursor', ?)", (cursor,))
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('generation', ?)", (generation,))
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('last_full_sync', ?)", (time.time(),))
+        self._apply_changes(conn, api, cursor, generation)
+
+    def _apply_changes(self, conn: sqlite3.Connection, api, cursor: Optional[str], generation: int):
+        """Apply the station edits made after `cursor` (stations/changed)."""
+        while True:
+            changes = api.fetch('stations/changed', {
+                'lastchangeuuid': cursor, 'limit': PAGE_SIZE,
+            }, hedge=False)
+            if not changes:
+                break
+            self._upsert(conn, changes, generation)
+            cursor = changes[-1].get('changeuuid') or cursor
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('cursor', ?)", (cursor,))
+            if len(changes) < PAGE_SIZE:
+                break
+
+    def _incremental_sync(self, conn: sqlite3.Connection, api):
+        """Apply station edits since the last sync and refresh the counters."""
+        generation = self._meta('generation', 0)
+        self._apply_changes(conn, api, self._meta('cursor'), generation)
+
+        # Counts change without an edit; refresh them where they matter
+        for endpoint in ('stations/topclick', 'stations/lastclick', 'stations/topvote'):
+            self._upsert(conn, api.fetch(endpoint, {'limit': COUNTER_REFRESH}, hedge=False), generation)
+
+    def _rebuild_tags(self, conn: sqlite3.Connection):
+        counts: dict[str, int] = {}
+        for (tags,) in conn.execute(f'SELECT tags FROM stations WHERE {VISIBLE}'):
+            for tag in {t.strip().lower() for t in (tags or '').split(',')}:
+                if tag:
+                    counts[tag] = counts.get(tag, 0) + 1
+        with conn:
+            conn.execute('DELETE FROM tags')
+            conn.executemany('INSERT INTO tags VALUES (?, ?)', counts.items())
+
+    def delete(self):
+        """Remove the catalog's files."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+        for suffix in ('', '-wal', '-shm'):
+            try:
+                os.remove(self.path + suffix)
+            except OSError:
+                pass
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def benchmark(stations: int = 50000, queries: int = 200, path: Optional[str] = None) -> dict:
+    """
+    Fill a catalog with synthetic stations through a fake API and time
+    the sync and the local searches.
+    """
+    import random
+    import tempfile
+
+    words = ['radio', 'rock', 'jazz', 'news', 'classic', 'hits', 'fm', 'public', 'dance',
+             'country', 'talk', 'metal', 'lounge', 'chill', 'pop', 'world', 'blues', 'folk']
+    countries = ['Germany', 'France', 'United States', 'Brazil', 'Japan', 'Canada', 'Spain']
+    rng = random.Random(1)
+    records = [{
+        'stationuuid': f'uuid-{n}', 'changeuuid': f'change-{n}',
+        'name': f"{rng.choice(words).title()} {rng.choice(words).title()} {n}",
+        'url': f'http://stream.example/{n}', 'url_resolved': f'http://stream.example/{n}',
+        'country': rng.choice(countries), 'tags': ','.join(rng.sample(words, 3)),
+        'codec': 'MP3', 'bitrate': 128, 'votes': rng.randrange(5000),
+        'clickcount': rng.randrange(10000), 'lastcheckok': 1,
+    } for n in range(stations)]
+
+    class FakeAPI:
+        def fetch(self, endpoint, params=None, hedge=True):
+            if endpoint == 'stations/changed':
+                return []
+            if params.get('reverse') == 'true':
+                return records[::-1][:params['limit']]
+            offset = params.get('offset', 0)
+            return records[offset:offset + params['limit']]
+
+    with tempfile.TemporaryDirectory() as directory:
+        catalog = StationCatalog(path or os.path.join(directory, 'stations.db'))
+        t0 = time.perf_counter()
+        catalog.sync(FakeAPI(), full=True)
+        sync_seconds = time.perf_counter() - t0
+
+        terms = [rng.choice(words) + ' ' + rng.choice(words) for _ in range(queries)]
+        t0 = time.perf_counter()
+        found = sum(len(catalog.search(term, 50)) for term in terms)
+        search_ms = (time.perf_counter() - t0) / queries * 1000
+
+        t0 = time.perf_counter()
+        for term in terms:
+            catalog.search_by_tag(term.split()[0], 50)
+        tag_ms = (time.perf_counter() - t0) / queries * 1000
+
+        t0 = time.perf_counter()
+        catalog.get_popular(50)
+        catalog.get_top_voted(50)
+        lists_ms = (time.perf_counter() - t0) / 2 * 1000
+        size = os.path.getsize(catalog.path)
+        catalog.delete()
+
+    return {
+        'stations': stations,
+        'sync_seconds': sync_seconds,
+        'search_ms': search_ms,
+        'search_results': found / queries,
+        'tag_ms': tag_ms,
+        'lists_ms': lists_ms,
+        'db_bytes': size,
+    }
+
+
+if __name__ == '__main__':
+    r = benchmark()
+    print(f"{r['stations']} stations synced in {r['sync_seconds']:.1f}s "
+          f"({r['db_bytes'] / 1e6:.1f} MB)")
+    print(f"  name search: {r['search_ms']:.2f} ms ({r['search_results']:.0f} results)")
+    print(f"  tag search:  {r['tag_ms']:.2f} ms")
+    print(f"  popular/top voted: {r['lists_ms']:.2f} ms")
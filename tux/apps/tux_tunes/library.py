@@ -95,6 +95,7 @@ class Library:
             'window_width': 900,
             'window_height': 700,
             'window_maximized': False,
+            'offline_catalog': False,  # Keep a local copy of the station list
         }
         
         try:
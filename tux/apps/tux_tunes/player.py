@@ -15,12 +15,10 @@ Copyright (c) 2025 Christopher Dorrell. Licensed under GPL-3.0.
 
 import os
 import re
-import threading
 import time
 from datetime import datetime
 from dataclasses import dataclass
 from typing import Optional, Callable
-from collections import deque
 
 import gi
 gi.require_version('Gst', '1.0')
@@ -28,6 +26,7 @@ gi.require_version('GstPbutils', '1.0')
 from gi.repository import Gst, GstPbutils, GLib
 
 from .api import Station
+from .ringbuffer import RingBuffer
 
 
 # Initialize GStreamer
@@ -75,7 +74,11 @@ class CachedRecording:
 
 
 class AudioBuffer:
-    """Circular buffer for audio data (for pre-buffering)."""
+    """Circular buffer for audio data (for pre-buffering).
+
+    Backed by a preallocated RingBuffer, so chunks are copied in with
+    slice assignments rather than appended byte by byte.
+    """
     
     def __init__(self, max_seconds: float = 10.0, sample_rate: int = 44100, channels: int = 2):
         self.max_seconds = max_seconds
@@ -84,29 +87,38 @@ class AudioBuffer:
         # Approximate bytes per second for 16-bit audio
         self.bytes_per_second = sample_rate * channels * 2
         self.max_bytes = int(max_seconds * self.bytes_per_second)
-        self.buffer = deque(maxlen=self.max_bytes)
-        self.lock = threading.Lock()
+        self.buffer = RingBuffer(self.max_bytes)
+        self.lock = self.buffer.lock
     
     def add(self, data: bytes):
-        """Add data to buffer."""
-        with self.lock:
-            for byte in data:
-                self.buffer.append(byte)
+        """Add a chunk of data to the buffer."""
+        self.buffer.write(data)
     
     def get_all(self) -> bytes:
-        """Get all buffered data."""
-        with self.lock:
-            return bytes(self.buffer)
+        """Get all buffered data (copied)."""
+        return self.buffer.getvalue()
+    
+    def snapshot(self) -> tuple:
+        """Get buffered data as zero-copy (older, newer) memoryviews.
+        
+        The views alias the live buffer; consume them before more audio
+        is added, or use get_all() for a stable copy.
+        """
+        return self.buffer.snapshot()
+    
+    def set_retention(self, max_seconds: float):
+        """Change how many seconds of audio are retained."""
+        self.max_seconds = max_seconds
+        self.max_bytes = int(max_seconds * self.bytes_per_second)
+        self.buffer.resize(self.max_bytes)
     
     def clear(self):
         """Clear the buffer."""
-        with self.lock:
-            self.buffer.clear()
+        self.buffer.clear()
     
     def get_duration(self) -> float:
         """Get approximate duration of buffered audio in seconds."""
-        with self.lock:
-            return len(self.buffer) / self.bytes_per_second if self.bytes_per_second > 0 else 0
+        return len(self.buffer) / self.bytes_per_second if self.bytes_per_second > 0 else 0
 
 
 class Player:
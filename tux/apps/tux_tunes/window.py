@@ -19,6 +19,7 @@ from gi.repository import Gtk, Adw, Gio, GLib, Gdk, GdkPixbuf
 
 from . import __version__, __app_name__
 from .api import RadioBrowserAPI, Station
+from .catalog import StationCatalog
 from .library import Library
 from .player import Player, TrackInfo
 
@@ -65,6 +66,8 @@ class TuxTunesWindow(Adw.ApplicationWindow):
         # Initialize components
         self.library = Library()
         self.api = RadioBrowserAPI()
+        if self.library.get_config('offline_catalog', False):
+            self.enable_catalog()
         self.player = Player(self.library)
         
         # Load window size
@@ -1082,6 +1085,22 @@ class TuxTunesWindow(Adw.ApplicationWindow):
         
         print("Using fallback icon")
     
+    def enable_catalog(self):
+        """Answer lookups from the local station catalog, syncing it in the background."""
+        if self.api.catalog is None:
+            try:
+                self.api.catalog = StationCatalog()
+            except Exception as e:
+                print(f"Station catalog unavailable: {e}")
+                return
+        self.api.catalog.sync_in_background(self.api)
+    
+    def disable_catalog(self):
+        """Go back to searching online and delete the local catalog."""
+        catalog, self.api.catalog = self.api.catalog, None
+        if catalog is not None and not catalog.syncing:
+            catalog.delete()
+    
     def cleanup(self):
         """Clean up resources."""
         self.player.cleanup()
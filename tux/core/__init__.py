@@ -58,6 +58,22 @@ from .hardware import (
     check_hardinfo2_available
 )
 
+from .installed import (
+    InstalledSnapshot,
+    get_installed_snapshot
+)
+
+from .blocklist import (
+    DomainBlocklist,
+    host_from_uri
+)
+
+from .history import (
+    HistoryStore,
+    frecency_decay,
+    frecency_key
+)
+
 from .logger import (
     setup_logging,
     get_logger,
@@ -80,6 +96,12 @@ __all__ = [
     # Hardware
     'HardwareInfo', 'get_hardware_info', 'get_hardinfo2_package_name',
     'is_aur_package', 'launch_hardinfo2', 'check_hardinfo2_available',
+    # Installed packages
+    'InstalledSnapshot', 'get_installed_snapshot',
+    # Blocklist
+    'DomainBlocklist', 'host_from_uri',
+    # History
+    'HistoryStore', 'frecency_decay', 'frecency_key',
     # Logging
     'setup_logging', 'get_logger', 'is_debug_enabled'
 ]
@@ -0,0 +1,275 @@
+"""
+Tux Assistant - Domain Blocklist
+
+Compiled ad/tracker domain matcher for the built-in browser.
+
+Domains are stored in a hashed suffix set, so checking a host costs one
+dict lookup per label ("a.b.example.com" -> 4 lookups) no matter how many
+domains are loaded. Recent host verdicts are kept in an LRU cache, and
+large public host lists can be loaded from disk in the background and
+swapped in atomically.
+
+Copyright (c) 2025 Christopher Dorrell. Licensed under GPL-3.0.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from .logger import get_logger
+
+log = get_logger('tux.blocklist')
+
+
+# Hosts-file sink addresses that precede the blocked domain
+_SINK_ADDRESSES = {'0.0.0.0', '127.0.0.1', '::', '::1', '0'}
+
+# Hosts-file entries that are never real blocks
+_IGNORED_HOSTS = {'localhost', 'localhost.localdomain', 'local', 'broadcasthost',
+                  'ip6-localhost', 'ip6-loopback', '0.0.0.0'}
+
+# Two or more DNS labels of letters, digits and inner hyphens
+_HOSTNAME = re.compile(r'(?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\.)+[a-z0-9](?:[a-z0-9-]*[a-z0-9])?')
+
+
+def host_from_uri(uri: str) -> str:
+    """Extract the lowercase host from a URI without a full urlparse."""
+    start = uri.find('://')
+    start = start + 3 if start >= 0 else 0
+    end = len(uri)
+    for sep in '/?#':
+        pos = uri.find(sep, start)
+        if 0 <= pos < end:
+            end = pos
+    host = uri[start:end]
+
+    at = host.rfind('@')
+    if at >= 0:
+        host = host[at + 1:]
+    if host.startswith('['):
+        # IPv6 literal
+        return host[1:host.find(']')].lower() if ']' in host else host.lower()
+    colon = host.find(':')
+    if colon >= 0:
+        host = host[:colon]
+    return host.rstrip('.').lower()
+
+
+def path_from_uri(uri: str) -> str:
+    """Extract the path (with query) from a URI; '/' if there is none."""
+    start = uri.find('://')
+    start = start + 3 if start >= 0 else 0
+    slash = uri.find('/', start)
+    if slash < 0:
+        return '/'
+    return uri[slash:]
+
+
+def parse_list_line(line: str) -> Optional[str]:
+    """
+    Extract a domain from one line of a blocklist file.
+
+    Understands hosts files ("0.0.0.0 ads.example.com"), plain domain lists
+    and the domain-anchor subset of Adblock syntax ("||ads.example.com^").
+    Returns None for comments, exceptions, rules we can't use and lone
+    tokens that aren't host names (Adblock URL fragments like "-ad.jpg").
+    """
+    line = line.strip()
+    if not line or line[0] in '#!':
+        return None
+
+    if line.startswith('||'):
+        # Only plain "||domain^" rules are pure domain blocks
+        domain = line[2:]
+        if domain.endswith('^'):
+            domain = domain[:-1]
+    else:
+        if line.startswith('@@') or '##' in line:
+            return None
+        parts = line.split('#', 1)[0].split()
+        if not parts:
+            return None
+        if parts[0] in _SINK_ADDRESSES:
+            if len(parts) < 2:
+                return None
+            # Hosts files list host names only, so be lenient about them
+            domain = parts[1].strip('.').lower()
+            if not domain or domain in _IGNORED_HOSTS or '.' not in domain:
+                return None
+            if any(c in domain for c in '/*^|$'):
+                return None
+            return domain
+        elif len(parts) == 1:
+            domain = parts[0]
+        else:
+            return None
+
+    # A lone token may just as well be an Adblock URL fragment ("-ad.jpg",
+    # "_ads.php", ".ad.json?"); only real host names are domain blocks
+    domain = domain.rstrip('.').lower()
+    if domain in _IGNORED_HOSTS or not is_hostname(domain):
+        return None
+    return domain
+
+
+def is_hostname(name: str) -> bool:
+    """True for a plain lowercase DNS name with at least two labels."""
+    return _HOSTNAME.fullmatch(name) is not None
+
+
+class DomainBlocklist:
+    """Suffix-set domain matcher with per-category verdicts and an LRU cache."""
+
+    def __init__(self, cache_size: int = 4096):
+        # domain -> frozenset of categories ("ads", "trackers", ...)
+        self._domains: dict[str, frozenset] = {}
+        # host -> list of (path prefix, category) for rules like "facebook.com/tr"
+        self._path_rules: dict[str, list[tuple[str, str]]] = {}
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._domains)
+
+    # ==================== Building ====================
+
+    def add(self, entries: Iterable[str], category: str):
+        """Add domains (or "domain/path" rules) under a category."""
+        domains = dict(self._domains)
+        path_rules = {host: list(rules) for host, rules in self._path_rules.items()}
+        self._merge(domains, path_rules, entries, category)
+        self._swap(domains, path_rules)
+
+    def load_files(self, files: Iterable[tuple[str, str]]) -> int:
+        """
+        Load blocklist files and swap them in on top of the current rules.
+
+        Parsing happens without holding the lock, so lookups keep using the
+        old rules until the new set is complete. Safe to call from a thread.
+
+        Args:
+            files: (path, category) pairs
+
+        Returns:
+            Number of domains loaded from the files
+        """
+        domains = dict(self._domains)
+        path_rules = {host: list(rules) for host, rules in self._path_rules.items()}
+        loaded = 0
+        for path, category in files:
+            try:
+                with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                    entries = [d for d in map(parse_list_line, f) if d]
+            except OSError as e:
+                log.warning(f"Could not read blocklist {path}: {e}")
+                continue
+            self._merge(domains, path_rules, entries, category)
+            loaded += len(entries)
+        self._swap(domains, path_rules)
+        return loaded
+
+    def load_directory(self, directory: str) -> int:
+        """
+        Load every list under `directory`, one subdirectory per category.
+
+        Example: blocklists/ads/easylist-hosts.txt, blocklists/trackers/*.txt
+        """
+        files = []
+        try:
+            for category in sorted(os.listdir(directory)):
+                cat_dir = os.path.join(directory, category)
+                if not os.path.isdir(cat_dir):
+                    continue
+                for name in sorted(os.listdir(cat_dir)):
+                    path = os.path.join(cat_dir, name)
+                    if os.path.isfile(path):
+                        files.append((path, category))
+        except OSError:
+            return 0
+        return self.load_files(files) if files else 0
+
+    @staticmethod
+    def _merge(domains: dict, path_rules: dict, entries: Iterable[str], category: str):
+        """Merge entries into new (unshared) rule tables."""
+        for entry in entries:
+            entry = entry.strip().lower()
+            if not entry:
+                continue
+            host, slash, path = entry.partition('/')
+            if slash:
+                if host.startswith('www.'):
+                    host = host[4:]
+                path_rules.setdefault(host, []).append(('/' + path, category))
+                continue
+            existing = domains.get(host)
+            if existing is None:
+                domains[host] = frozenset((category,))
+            elif category not in existing:
+                domains[host] = existing | {category}
+
+    def _swap(self, domains: dict, path_rules: dict):
+        """Atomically replace the rule tables and drop stale verdicts."""
+        with self._lock:
+            self._domains = domains
+            self._path_rules = path_rules
+            self._cache.clear()
+
+    # ==================== Lookups ====================
+
+    def host_categories(self, host: str) -> frozenset:
+        """Categories blocking `host` or any parent domain (cached)."""
+        with self._lock:
+            cached = self._cache.get(host)
+            if cached is not None:
+                self._cache.move_to_end(host)
+                return cached
+
+        domains = self._domains
+        found = frozenset()
+        suffix = host
+        while True:
+            hit = domains.get(suffix)
+            if hit:
+                found = found | hit
+            dot = suffix.find('.')
+            if dot < 0:
+                break
+            suffix = suffix[dot + 1:]
+
+        with self._lock:
+            self._cache[host] = found
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return found
+
+    def match(self, uri: str, categories: Iterable[str]) -> Optional[str]:
+        """
+        Check a URI against the enabled categories.
+
+        Returns:
+            The matching category, or None if the URI is allowed
+        """
+        enabled = set(categories)
+        if not enabled:
+            return None
+
+        host = host_from_uri(uri)
+        if not host:
+            return None
+
+        hit = self.host_categories(host) & enabled
+        if hit:
+            return next(iter(hit))
+
+        if self._path_rules:
+            bare = host[4:] if host.startswith('www.') else host
+            rules = self._path_rules.get(bare)
+            if rules:
+                path = path_from_uri(uri)
+                for prefix, category in rules:
+                    if category in enabled and path.startswith(prefix):
+                        return category
+        return None
@@ -0,0 +1,225 @@
+"""
+Tux Assistant - Disk Usage
+
+Measures how much disk space several (possibly nested) directory trees
+take, the way `du` does, in one parallel pass:
+
+- Walks with os.scandir and DirEntry.stat, counting allocated blocks
+  (so sparse files and small files on large blocks are counted as what
+  they really cost) and each hardlinked file only once.
+- Nested categories are split during the walk rather than walked twice:
+  measuring ~/.cache and ~/.cache/thumbnails counts every file under the
+  thumbnails directory towards "thumbnails" only.
+- Every directory is listed by a task on a thread pool; the caller gets
+  running totals while the walk is still going.
+
+Copyright (c) 2025 Christopher Dorrell. Licensed under GPL-3.0.
+"""
+
+import os
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Union
+
+from .logger import get_logger
+
+log = get_logger('tux.diskusage')
+
+
+MAX_WORKERS = min(8, (os.cpu_count() or 2) * 2)
+PROGRESS_INTERVAL = 0.25  # Seconds between running-total reports
+BLOCK_SIZE = 512           # st_blocks unit
+
+
+def _allocated(st: os.stat_result) -> int:
+    return st.st_blocks * BLOCK_SIZE
+
+
+class DiskUsage:
+    """Parallel, single-pass `du` for a set of named directory trees."""
+
+    def __init__(self, max_workers: int = MAX_WORKERS):
+        self.max_workers = max_workers
+
+    def measure(self, categories: dict[str, Union[str, list[str]]],
+                on_progress: Optional[Callable[[dict[str, int]], None]] = None,
+                progress_interval: float = PROGRESS_INTERVAL) -> dict[str, int]:
+        """
+        Bytes allocated under each category's paths.
+
+        Args:
+            categories: {name: path or paths}; ~ is expanded, missing
+                paths count as 0. A path inside another category's path
+                is taken out of that category.
+            on_progress: Called with the running totals (a copy) every
+                `progress_interval` seconds while the walk is going; from
+                the calling thread.
+
+        Returns:
+            {name: bytes} for every category
+        """
+        owners: dict[str, str] = {}
+        for name, paths in categories.items():
+            for path in [paths] if isinstance(paths, str) else paths:
+                owners[os.path.abspath(os.path.expanduser(path))] = name
+
+        totals = dict.fromkeys(categories, 0)
+        seen_links: set[tuple[int, int]] = set()
+        lock = threading.Lock()
+        done = threading.Condition(lock)
+        pending = 0
+
+        def add(local: dict[str, int]):
+            with lock:
+                for name, size in local.items():
+                    totals[name] += size
+
+        def counted(st: os.stat_result) -> bool:
+            """False for another link to an already counted file."""
+            if st.st_nlink < 2 or stat.S_ISDIR(st.st_mode):
+                return True
+            key = (st.st_dev, st.st_ino)
+            with lock:
+                if key in seen_links:
+                    return False
+                seen_links.add(key)
+                return True
+
+        def walk(path: str, name: str):
+            nonlocal pending
+            local = {name: 0}
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        try:
+                            st = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            child = owners.get(entry.path, name)
+                            local[child] = local.get(child, 0) + _allocated(st)
+                            submit(entry.path, child)
+                        elif counted(st):
+                            local[name] += _allocated(st)
+            except OSError:
+                pass  # Unreadable (permissions) or gone
+            finally:
+                add(local)
+                with done:
+                    pending -= 1
+                    if pending == 0:
+                        done.notify_all()
+
+        def submit(path: str, name: str):
+            nonlocal pending
+            with lock:
+                pending += 1
+            pool.submit(walk, path, name)
+
+        # Only the outermost paths are walked; nested ones are reached
+        # through them
+        roots = [p for p in owners
+                 if not any(p != other and p.startswith(other.rstrip(os.sep) + os.sep) for other in owners)]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for path in roots:
+                name = owners[path]
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if stat.S_ISDIR(st.st_mode):
+                    add({name: _allocated(st)})
+                    submit(path, name)
+                elif counted(st):
+                    add({name: _allocated(st)})
+
+            with done:
+                while pending:
+                    done.wait(progress_interval)
+                    if pending and on_progress:
+                        snapshot = dict(totals)
+                        done.release()
+                        try:
+                            on_progress(snapshot)
+                        finally:
+                            done.acquire()
+        return totals
+
+    def size(self, path: str) -> int:
+        """Bytes allocated under one path."""
+        return self.measure({'size': path})['size']
+
+
+# Singleton instance
+_disk_usage: Optional[DiskUsage] = None
+_disk_usage_lock = threading.Lock()
+
+
+def get_disk_usage() -> DiskUsage:
+    """Get the shared disk usage engine."""
+    global _disk_usage
+    with _disk_usage_lock:
+        if _disk_usage is None:
+            _disk_usage = DiskUsage()
+        return _disk_usage
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def benchmark(dirs: int = 400, files_per_dir: int = 50) -> dict:
+    """
+    Size a synthetic ~/.cache with a thumbnails subtree: os.walk +
+    getsize per category, walking the thumbnails twice (the old way),
+    vs. one parallel pass.
+    """
+    import tempfile
+
+    def old_dir_size(path):
+        total = 0
+        for dirpath, _dirnames, filenames in os.walk(path):
+            for filename in filenames:
+                try:
+                    total += os.path.getsize(os.path.join(dirpath, filename))
+                except OSError:
+                    pass
+        return total
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = os.path.join(tmp, '.cache')
+        thumbs = os.path.join(cache, 'thumbnails')
+        for i in range(dirs):
+            parent = thumbs if i % 4 == 0 else cache
+            d = os.path.join(parent, f'app{i % 40}', f'd{i}')
+            os.makedirs(d, exist_ok=True)
+            for j in range(files_per_dir):
+                with open(os.path.join(d, f'f{j}'), 'wb') as f:
+                    f.write(b'x' * (100 + j * 37))
+
+        t0 = time.perf_counter()
+        thumbnails = old_dir_size(thumbs)
+        user_cache = old_dir_size(cache) - old_dir_size(thumbs)
+        old_seconds = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        sizes = DiskUsage().measure({'user_cache': cache, 'thumbnails': thumbs})
+        new_seconds = time.perf_counter() - t0
+
+    return {
+        'files': dirs * files_per_dir,
+        'old_seconds': old_seconds,
+        'new_seconds': new_seconds,
+        'old_sizes': {'user_cache': user_cache, 'thumbnails': thumbnails},
+        'sizes': sizes,
+    }
+
+
+if __name__ == '__main__':
+    r = benchmark()
+    print(f"{r['files']} files")
+    print(f"  os.walk + getsize, thumbnails twice: {r['old_seconds']:.3f}s  {r['old_sizes']} (apparent)")
+    print(f"  one parallel scandir pass:           {r['new_seconds']:.3f}s  {r['sizes']} (allocated)")
@@ -0,0 +1,528 @@
+"""
+Tux Assistant - News Feed Fetching
+
+Fetches RSS and Atom feeds concurrently and keeps the parsed items on disk, with
+each feed's ETag and Last-Modified, so that:
+
+- feeds fetched recently aren't requested at all,
+- older ones are revalidated with If-None-Match / If-Modified-Since and
+  an unchanged feed costs a "304 Not Modified" instead of a download,
+- the last known headlines can be shown at startup before any network
+  request has finished (stale-while-revalidate).
+
+The parsed items are kept in the shared HTTP cache (see httpcache), so
+feeds count towards its size bound and statistics like everything else.
+
+Copyright (c) 2025 Christopher Dorrell. Licensed under GPL-3.0.
+"""
+
+import html
+import io
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import BinaryIO, Callable, Iterable, Optional, Union
+from xml.etree import ElementTree
+
+from .httpcache import HttpCache, get_http_cache
+from .httpclient import get_http_client
+from .logger import get_logger
+
+log = get_logger('tux.feeds')
+
+
+DEFAULT_TIMEOUT = 5
+DEFAULT_WORKERS = 8
+# Items kept per feed; callers take as many as they want from the front
+MAX_CACHED_ITEMS = 10
+
+
+@dataclass
+class FeedItem:
+    """One entry of a feed."""
+    title: str
+    url: str
+    published: Optional[float] = None  # Unix time, if the feed gave one
+
+
+@dataclass
+class FeedState:
+    """A feed's cached items and the validators to revalidate them."""
+    url: str
+    items: list[FeedItem] = field(default_factory=list)
+    etag: str = ""
+    last_modified: str = ""
+    fetched_at: float = 0.0   # Last successful fetch or revalidation
+    not_modified: bool = False  # The last fetch was a 304 for the cached items
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (time.time() if now is None else now) - self.fetched_at
+
+
+# =============================================================================
+# Parsing
+# =============================================================================
+
+# Bytes handed to the parser at a time while reading a response
+CHUNK_SIZE = 16 * 1024
+
+# Item elements: RSS 2.0 / RSS 1.0 (RDF) and Atom
+_ITEM_TAGS = {'item', 'entry'}
+# Date elements, most to least preferred: RSS, Dublin Core, Atom
+_DATE_TAGS = ('pubDate', 'date', 'published', 'issued', 'updated', 'modified')
+
+_TAG_RE = re.compile(r'<[^>]+>')
+
+# ISO 8601 forms datetime.fromisoformat() rejects before Python 3.11
+# (fractions other than 3 or 6 digits, offsets without a colon)
+_ISO_FORMATS = (
+    '%Y-%m-%dT%H:%M:%S.%f%z', '%Y-%m-%dT%H:%M:%S%z', '%Y-%m-%dT%H:%M%z',
+    '%Y-%m-%dT%H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M', '%Y-%m-%d',
+)
+# strptime's %f takes at most 6 digits
+_LONG_FRACTION_RE = re.compile(r'(\.\d{6})\d+')
+
+
+def _parse_iso_date(text: str) -> Optional[datetime]:
+    if text[-1] in 'Zz':
+        text = text[:-1] + '+00:00'
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        pass
+    if len(text) > 10:
+        text = text[:10] + 'T' + text[11:]  # Date/time separator may be ' ' or 't'
+    text = _LONG_FRACTION_RE.sub(r'\1', text)
+    for fmt in _ISO_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_date(text: str) -> Optional[float]:
+    """Unix time of an RFC 822 (RSS) or ISO 8601 (Atom, dc:date) date."""
+    text = (text or '').strip()
+    if not text:
+        return None
+    try:
+        parsed = parsedate_to_datetime(text)
+    except (TypeError, ValueError, IndexError):
+        parsed = _parse_iso_date(text)
+        if parsed is None:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _clean_text(text: str, markup: bool = False) -> str:
+    """
+    Plain text of a title with entities decoded and whitespace collapsed.
+
+    Titles are often HTML-escaped once more inside the XML ("&amp;#8217;"),
+    so entities left after XML decoding are decoded too. With `markup`
+    (Atom type="html"), tags are removed first.
+    """
+    if markup:
+        text = _TAG_RE.sub('', text)
+    return ' '.join(html.unescape(text).split())
+
+
+def _local_name(tag: str) -> str:
+    """Tag without its namespace ("{http://www.w3.org/2005/Atom}entry" -> "entry")."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _item_from_element(elem: ElementTree.Element) -> Optional[FeedItem]:
+    title = link = guid = ""
+    dates = {}
+    for child in elem:
+        name = _local_name(child.tag)
+        if name == 'title':
+            title = _clean_text(''.join(child.itertext()), child.get('type') == 'html')
+        elif name == 'link':
+            # RSS: <link>url</link>; Atom: <link rel="alternate" href="url"/>
+            href = child.get('href')
+            if href is None:
+                link = link or (child.text or '').strip()
+            elif child.get('rel', 'alternate') == 'alternate' and not link:
+                link = href.strip()
+        elif name == 'guid' and child.get('isPermaLink', 'true') == 'true':
+            guid = (child.text or '').strip()
+        elif name in _DATE_TAGS and name not in dates:
+            dates[name] = child.text or ''
+
+    link = link or (guid if guid.startswith(('http://', 'https://')) else "")
+    if not (title and link):
+        return None
+    published = None
+    for name in _DATE_TAGS:
+        if name in dates:
+            published = parse_date(dates[name])
+            if published is not None:
+                break
+    return FeedItem(title=title, url=link, published=published)
+
+
+class FeedParser:
+    """
+    Incremental RSS 2.0 / RSS 1.0 / Atom parser.
+
+    Feed it the document in chunks as it arrives; ``done`` turns true once
+    ``max_items`` items have been parsed, and the rest of the document
+    never has to be read. Finished item elements are discarded straight
+    away, so memory stays flat however long the feed is.
+
+    Raises ElementTree.ParseError from feed() on malformed XML.
+    """
+
+    def __init__(self, max_items: int = MAX_CACHED_ITEMS):
+        self.max_items = max_items
+        self.items: list[FeedItem] = []
+        self.done = False
+        self._parser = ElementTree.XMLPullParser(events=('end',))
+
+    def feed(self, data: bytes):
+        if self.done:
+            return
+        self._parser.feed(data)
+        for _event, elem in self._parser.read_events():
+            if _local_name(elem.tag) not in _ITEM_TAGS:
+                continue
+            item = _item_from_element(elem)
+            elem.clear()
+            if item:
+                self.items.append(item)
+                if len(self.items) >= self.max_items:
+                    self.done = True
+                    return
+
+
+_ITEM_RE = re.compile(r'<(item|entry)[\s>](.*?)</\1>', re.DOTALL)
+_TITLE_RE = re.compile(r'<title[^>]*>(?:<!\[CDATA\[)?(.*?)(?:\]\]>)?</title>', re.DOTALL)
+_LINK_RE = re.compile(r'<link>(?:<!\[CDATA\[)?(.*?)(?:\]\]>)?</link>'
+                      r'|<link[^>]*?href="([^"]*)"')
+_DATE_RE = re.compile(r'<(pubDate|dc:date|published|updated)>(.*?)</\1>', re.DOTALL)
+
+
+def _parse_feed_lenient(content: str, max_items: int) -> list[FeedItem]:
+    """
+    Regex fallback for feeds that aren't well-formed XML.
+
+    Sloppy feeds with HTML entities like &nbsp; or stray ampersands
+    are common, and XML parsers (rightly) reject them.
+    """
+    items = []
+    for match in _ITEM_RE.finditer(content):
+        item_content = match.group(2)
+
+        title_match = _TITLE_RE.search(item_content)
+        link_match = _LINK_RE.search(item_content)
+        if not (title_match and link_match):
+            continue
+
+        date_match = _DATE_RE.search(item_content)
+        items.append(FeedItem(
+            # Raw XML text: one level of escaping more than a parser would leave
+            title=_clean_text(html.unescape(title_match.group(1))),
+            url=html.unescape((link_match.group(1) or link_match.group(2) or '').strip()),
+            published=parse_date(date_match.group(2)) if date_match else None,
+        ))
+        if len(items) >= max_items:
+            break
+    return items
+
+
+def read_feed(stream: BinaryIO, max_items: int = MAX_CACHED_ITEMS,
+              chunk_size: int = CHUNK_SIZE) -> list[FeedItem]:
+    """
+    Parse a feed from a file-like object (e.g. an HTTP response) as it is read.
+
+    Stops reading as soon as `max_items` items are parsed. Malformed
+    feeds are read to the end and parsed leniently instead.
+    """
+    parser = FeedParser(max_items)
+    received = []
+    try:
+        while not parser.done:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            received.append(chunk)
+            parser.feed(chunk)
+        return parser.items
+    except ElementTree.ParseError as e:
+        log.debug(f"Feed isn't well-formed XML ({e}), parsing leniently")
+    received.append(stream.read())
+    return _parse_feed_lenient(b''.join(received).decode('utf-8', errors='ignore'), max_items)
+
+
+def parse_feed(content: Union[str, bytes], max_items: int = MAX_CACHED_ITEMS) -> list[FeedItem]:
+    """Items of an RSS or Atom document, in feed order."""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return read_feed(io.BytesIO(content), max_items)
+
+
+# =============================================================================
+# Cache
+# =============================================================================
+
+class FeedCache:
+    """
+    Per-feed state in the shared HTTP cache.
+
+    Entries are keyed "feed:<url>" and hold the parsed items as JSON (not
+    the feed document) along with the feed's validators.
+    """
+
+    def __init__(self, cache: Optional[HttpCache] = None):
+        self.cache = cache or get_http_cache()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return f'feed:{url}'
+
+    def get(self, url: str) -> Optional[FeedState]:
+        key = self._key(url)
+        entry = self.cache.lookup(key)
+        body = self.cache.body(key) if entry else None
+        if body is None:
+            return None
+        try:
+            items = [FeedItem(**item) for item in json.loads(body)]
+        except (ValueError, TypeError):
+            return None
+        return FeedState(url, items, entry.etag, entry.last_modified, entry.stored_at)
+
+    def put(self, state: FeedState):
+        body = json.dumps([asdict(item) for item in state.items]).encode()
+        headers = {'etag': state.etag, 'last-modified': state.last_modified}
+        self.cache.store(self._key(state.url), body, headers, url=state.url)
+
+    def record(self, url: str, event: str, seconds: float = 0.0):
+        """Count a cache outcome for a feed (see HttpCache.record)."""
+        entry = self.cache.lookup(self._key(url))
+        self.cache.record(event, entry.size if entry else 0, seconds)
+
+    def save(self):
+        self.cache.save()
+
+
+# =============================================================================
+# Fetching
+# =============================================================================
+
+def fetch_feed(url: str, cached: Optional[FeedState] = None,
+               timeout: float = DEFAULT_TIMEOUT) -> FeedState:
+    """
+    Download a feed, or revalidate the cached copy.
+
+    Raises:
+        HttpError: The request failed
+    """
+    headers = {}
+    if cached and cached.etag:
+        headers['If-None-Match'] = cached.etag
+    if cached and cached.last_modified:
+        headers['If-Modified-Since'] = cached.last_modified
+
+    with get_http_client().open(url, headers=headers, timeout=timeout, retries=1) as response:
+        if response.status == 304 and cached:
+            return FeedState(url, cached.items, cached.etag, cached.last_modified, time.time(),
+                             not_modified=True)
+        response.raise_for_status()
+        etag = response.headers.get('ETag', '')
+        last_modified = response.headers.get('Last-Modified', '')
+        items = read_feed(response)
+
+    return FeedState(url, items, etag, last_modified, time.time())
+
+
+def fetch_feeds(
+    urls: Iterable[str],
+    cache: FeedCache,
+    max_age: float = 0,
+    timeout: float = DEFAULT_TIMEOUT,
+    workers: int = DEFAULT_WORKERS,
+    on_error: Optional[Callable[[str, Exception], None]] = None,
+) -> dict[str, list[FeedItem]]:
+    """
+    Items of several feeds, fetched in parallel.
+
+    Feeds fetched less than `max_age` seconds ago come straight from the
+    cache; the rest are (re)validated. A feed that fails keeps its cached
+    items, so one slow or broken site never empties the list. The cache
+    is saved before returning.
+
+    Returns:
+        {url: items} for every feed with any items
+    """
+    urls = list(dict.fromkeys(urls))
+    now = time.time()
+    results: dict[str, list[FeedItem]] = {}
+    stale = []
+    for url in urls:
+        cached = cache.get(url)
+        if cached and cached.age(now) < max_age:
+            results[url] = cached.items
+            cache.record(url, 'hits')
+        else:
+            stale.append((url, cached))
+
+    def fetch(url, cached):
+        started = time.monotonic()
+        try:
+            state = fetch_feed(url, cached, timeout)
+        except Exception as e:
+            if on_error:
+                on_error(url, e)
+            if cached:
+                cache.record(url, 'stale')
+            return cached.items if cached else []
+        cache.put(state)
+        if state.not_modified:
+            cache.record(url, 'revalidated')
+        else:
+            cache.record(url, 'misses', time.monotonic() - started)
+        return state.items
+
+    if stale:
+        with ThreadPoolExecutor(max_workers=min(workers, len(stale))) as pool:
+            futures = {url: pool.submit(fetch, url, cached) for url, cached in stale}
+        for url, future in futures.items():
+            results[url] = future.result()
+        cache.save()
+
+    return {url: results[url] for url in urls if results.get(url)}
+
+
+def cached_feeds(urls: Iterable[str], cache: FeedCache) -> dict[str, list[FeedItem]]:
+    """Whatever the cache holds for the feeds, however old (no network)."""
+    result = {}
+    for url in urls:
+        cached = cache.get(url)
+        if cached and cached.items:
+            result[url] = cached.items
+    return result
+
+
+def merge_by_date(feeds: Iterable[tuple[str, list[FeedItem]]],
+                  per_feed: int) -> list[tuple[str, FeedItem]]:
+    """
+    Newest first across feeds, taking at most `per_feed` from each.
+
+    Items without a date go after dated ones, in feed order.
+
+    Args:
+        feeds: (source, items) pairs
+    """
+    merged = [(source, item) for source, items in feeds for item in items[:per_feed]]
+    # Stable sort: undated items keep their original order
+    merged.sort(key=lambda pair: (pair[1].published is None, -(pair[1].published or 0)))
+    return merged
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+class _ThrottledStream(io.BytesIO):
+    """A byte stream that takes as long to read as a download would."""
+
+    def __init__(self, data: bytes, bytes_per_second: float):
+        super().__init__(data)
+        self.bytes_per_second = bytes_per_second
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        time.sleep(len(chunk) / self.bytes_per_second)
+        return chunk
+
+
+def _synthetic_feed(items: int, atom: bool = False) -> bytes:
+    """A large feed with ~1 KB of description per item."""
+    body = html.escape("<p>" + "Lorem ipsum dolor sit amet, consectetur. " * 24 + "</p>")
+    entries = []
+    for n in range(items):
+        stamp = time.gmtime(1_700_000_000 - n * 600)
+        if atom:
+            entries.append(
+                f'<entry><title type="html">Story &amp;lt;{n}&amp;gt; &#8211; update</title>'
+                f'<link rel="alternate" href="https://example.com/{n}"/>'
+                f'<published>{time.strftime("%Y-%m-%dT%H:%M:%SZ", stamp)}</published>'
+                f'<content type="html">{body}</content></entry>')
+        else:
+            entries.append(
+                f'<item><title><![CDATA[Story {n} – update]]></title>'
+                f'<link>https://example.com/{n}</link>'
+                f'<pubDate>{time.strftime("%a, %d %b %Y %H:%M:%S +0000", stamp)}</pubDate>'
+                f'<description>{body}</description></item>')
+    if atom:
+        doc = ('<?xml version="1.0" encoding="utf-8"?>'
+               '<feed xmlns="http://www.w3.org/2005/Atom"><title>Bench</title>'
+               + ''.join(entries) + '</feed>')
+    else:
+        doc = ('<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel>'
+               '<title>Bench</title><link>https://example.com/</link>'
+               + ''.join(entries) + '</channel></rss>')
+    return doc.encode('utf-8')
+
+
+def benchmark(items: int = 5000, max_items: int = MAX_CACHED_ITEMS,
+              bytes_per_second: float = 4_000_000) -> dict:
+    """
+    Compare streaming parsing with download-everything-then-regex.
+
+    A synthetic feed of `items` entries is "downloaded" at
+    `bytes_per_second`. Also times parsing every item from memory.
+    """
+    report = {}
+    for kind in ('rss', 'atom'):
+        data = _synthetic_feed(items, atom=kind == 'atom')
+
+        stream = _ThrottledStream(data, bytes_per_second)
+        t0 = time.perf_counter()
+        read_all = stream.read().decode('utf-8')
+        whole = _parse_feed_lenient(read_all, max_items)
+        whole_seconds = time.perf_counter() - t0
+
+        stream = _ThrottledStream(data, bytes_per_second)
+        t0 = time.perf_counter()
+        streamed = read_feed(stream, max_items)
+        stream_seconds = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        everything = parse_feed(data, max_items=items)
+        parse_all_seconds = time.perf_counter() - t0
+
+        report[kind] = {
+            'feed_bytes': len(data),
+            'items': len(streamed),
+            'dated': sum(1 for i in streamed if i.published),
+            'same_items': [i.url for i in streamed] == [i.url for i in whole],
+            'read_all_seconds': whole_seconds,
+            'streaming_seconds': stream_seconds,
+            'streaming_bytes': stream.bytes_read,
+            'parse_all_items': len(everything),
+            'parse_all_seconds': parse_all_seconds,
+        }
+    return report
+
+
+if __name__ == '__main__':
+    for kind, r in benchmark().items():
+        print(f"{kind}: {r['feed_bytes'] / 1e6:.1f} MB feed, first {r['items']} items "
+              f"({r['dated']} dated, match regex: {r['same_items']})")
+        print(f"  read all + regex: {r['read_all_seconds']:.3f}s")
+        print(f"  streaming:        {r['streaming_seconds']:.3f}s "
+              f"({r['streaming_bytes'] / 1e3:.0f} KB read)")
+        print(f"  parse all {r['parse_all_items']} items: {r['parse_all_seconds']:.3f}s")
@@ -0,0 +1,282 @@
+"""
+Tux Assistant - Git Repository Discovery
+
+Finds git repositories below a set of root directories (~/Development,
+~/Projects, ...) down to a configurable depth:
+
+- Walks with os.scandir, never descending into a repository (its
+  working tree and .git internals are its own business), hidden
+  directories, dependency/build trees (node_modules, vendor, virtualenvs,
+  target, ...) or symlinks.
+- Remembers every directory it visited with its mtime in
+  ~/.cache/tux-assistant/git-repos.json. A directory's mtime only
+  changes when entries are added, removed or renamed in it, so on later
+  scans an unchanged directory costs one stat() - its cached list of
+  subdirectories is reused - and only changed ones are listed again.
+
+Copyright (c) 2025 Christopher Dorrell. Licensed under GPL-3.0.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+from .logger import get_logger
+
+log = get_logger('tux.gitscan')
+
+
+CACHE_VERSION = 1
+DEFAULT_MAX_DEPTH = 3
+
+# Directories that never hold repositories worth listing
+PRUNE_DIRS = frozenset({
+    'node_modules', 'bower_components', 'vendor', 'third_party',
+    'venv', 'env', 'site-packages', '__pycache__',
+    'target', 'build', 'dist', 'out', '_build',
+    'Pods', 'DerivedData',
+})
+
+
+def _default_path() -> str:
+    cache = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(cache, 'tux-assistant', 'git-repos.json')
+
+
+def _pruned(name: str) -> bool:
+    # Hidden directories covers .git, .cache, .venv, .tox, .cargo, ...
+    return name.startswith('.') or name in PRUNE_DIRS
+
+
+class RepoDiscovery:
+    """Incremental, depth-limited search for git repositories."""
+
+    def __init__(self, max_depth: int = DEFAULT_MAX_DEPTH, path: Optional[str] = None):
+        """
+        Args:
+            max_depth: How far below a root repositories are looked for
+                (1 = only its immediate subdirectories)
+            path: Cache file (default ~/.cache/tux-assistant/git-repos.json)
+        """
+        self.max_depth = max_depth
+        self.path = path or _default_path()
+        # path -> [mtime_ns, is_repo, subdirectory names or None past max_depth]
+        self._dirs: Optional[dict[str, list]] = None
+        self._lock = threading.Lock()
+        self.stats = {'listed': 0, 'reused': 0}
+
+    # ==================== Persistence ====================
+
+    def _signature(self) -> dict:
+        # A cache built with other settings lists the wrong subdirectories
+        return {'version': CACHE_VERSION, 'max_depth': self.max_depth, 'prune': sorted(PRUNE_DIRS)}
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            log.warning(f"Ignoring unreadable repository cache {self.path}: {e}")
+            return {}
+        if data.get('signature') != self._signature():
+            return {}
+        return data.get('dirs', {})
+
+    def _save(self):
+        data = {'signature': self._signature(), 'dirs': self._dirs}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            log.warning(f"Could not save repository cache: {e}")
+
+    # ==================== Scanning ====================
+
+    def _visit(self, path: str, depth: int, old: dict) -> Optional[list]:
+        """[mtime_ns, is_repo, subdirs] for one directory; None if unreadable."""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        cached = old.get(path)
+        listing = depth < self.max_depth
+        if cached and cached[0] == mtime and (cached[2] is not None or not listing):
+            self.stats['reused'] += 1
+            return [mtime, cached[1], cached[2] if listing else None]
+
+        if not listing:
+            # Deepest level: only whether it is a repository matters
+            return [mtime, os.path.lexists(os.path.join(path, '.git')), None]
+
+        self.stats['listed'] += 1
+        is_repo = False
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.name == '.git':
+                        is_repo = True
+                    elif not _pruned(entry.name):
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                subdirs.append(entry.name)
+                        except OSError:
+                            continue
+        except OSError:
+            return None
+        return [mtime, is_repo, subdirs]
+
+    def scan(self, roots: Iterable[str],
+             on_found: Optional[Callable[[str], None]] = None) -> list[str]:
+        """
+        Repositories below `roots` (~ is expanded), sorted.
+
+        Args:
+            roots: Directories to search; missing ones are skipped
+            on_found: Called with each repository as it is found
+        """
+        with self._lock:
+            old = self._dirs if self._dirs is not None else self._load()
+            new: dict[str, list] = {}
+            found = []
+            self.stats = {'listed': 0, 'reused': 0}
+            started = time.monotonic()
+
+            stack = [(os.path.expanduser(root), 0) for root in roots]
+            while stack:
+                path, depth = stack.pop()
+                if path in new:
+                    continue  # Overlapping roots
+                info = self._visit(path, depth, old)
+                if info is None:
+                    continue
+                new[path] = info
+                _mtime, is_repo, subdirs = info
+                if is_repo and depth > 0:
+                    found.append(path)
+                    if on_found:
+                        on_found(path)
+                    continue  # Not into a repository's own tree
+                for name in subdirs or ():
+                    stack.append((os.path.join(path, name), depth + 1))
+
+            self._dirs = new
+            self._save()
+            log.debug(f"Found {len(found)} repositories in {time.monotonic() - started:.2f}s "
+                      f"({self.stats['listed']} directories listed, {self.stats['reused']} unchanged)")
+            return sorted(found)
+
+    def scan_in_background(self, roots: Iterable[str], on_done: Callable[[list[str]], None],
+                           on_found: Optional[Callable[[str], None]] = None) -> threading.Thread:
+        """Run scan() on a daemon thread; callbacks are called from that thread."""
+        roots = list(roots)
+        thread = threading.Thread(target=lambda: on_done(self.scan(roots, on_found)), daemon=True)
+        thread.start()
+        return thread
+
+    def clear(self):
+        """Forget the remembered directories; the next scan lists everything."""
+        with self._lock:
+            self._dirs = {}
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                log.warning(f"Could not remove repository cache: {e}")
+
+
+# Singleton instance
+_discovery: Optional[RepoDiscovery] = None
+_discovery_lock = threading.Lock()
+
+
+def get_repo_discovery(max_depth: int = DEFAULT_MAX_DEPTH) -> RepoDiscovery:
+    """Get the shared repository discovery (recreated if the depth changes)."""
+    global _discovery
+    with _discovery_lock:
+        if _discovery is None or _discovery.max_depth != max_depth:
+            _discovery = RepoDiscovery(max_depth)
+        return _discovery
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def benchmark(projects: int = 400, dirs_per_project: int = 60, max_depth: int = 4) -> dict:
+    """
+    Discover repositories in a synthetic home directory of `projects`
+    project folders, each with `dirs_per_project` nested folders (source
+    trees, node_modules, ...); every other project is a repository.
+
+    Compares os.walk descending everywhere with the pruned scandir
+    walker, cold and again with nothing changed.
+    """
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        home = os.path.join(tmp, 'home')
+        total = 0
+        for i in range(projects):
+            group = os.path.join(home, 'Development', f'group{i % 20}', f'project{i}')
+            for j in range(dirs_per_project):
+                kind = ('src', 'node_modules', 'docs')[j % 3]
+                os.makedirs(os.path.join(group, kind, f'd{j // 10}', f'e{j}'), exist_ok=True)
+                total += 1
+            if i % 2 == 0:
+                os.makedirs(os.path.join(group, '.git', 'objects'))
+        roots = [os.path.join(home, 'Development')]
+
+        t0 = time.perf_counter()
+        walked = []
+        for root in roots:
+            for dirpath, dirnames, _files in os.walk(root):
+                if '.git' in dirnames:
+                    walked.append(dirpath)
+        walk_seconds = time.perf_counter() - t0
+
+        discovery = RepoDiscovery(max_depth=max_depth, path=os.path.join(tmp, 'cache.json'))
+        t0 = time.perf_counter()
+        found = discovery.scan(roots)
+        cold_seconds = time.perf_counter() - t0
+
+        warm = RepoDiscovery(max_depth=max_depth, path=discovery.path)
+        t0 = time.perf_counter()
+        warm.scan(roots)
+        warm_seconds = time.perf_counter() - t0
+
+        # One new repository deep in one project group
+        os.makedirs(os.path.join(home, 'Development', 'group3', 'new-project', '.git'))
+        t0 = time.perf_counter()
+        rescanned = warm.scan(roots)
+        changed_seconds = time.perf_counter() - t0
+
+    return {
+        'directories': total,
+        'repos': len(found),
+        'walk_repos': len(walked),
+        'walk_seconds': walk_seconds,
+        'cold_seconds': cold_seconds,
+        'warm_seconds': warm_seconds,
+        'changed_seconds': changed_seconds,
+        'changed_repos': len(rescanned),
+        'changed_listed': warm.stats['listed'],
+    }
+
+
+if __name__ == '__main__':
+    r = benchmark()
+    print(f"{r['directories']} directories, {r['repos']} repositories")
+    print(f"  os.walk everything:       {r['walk_seconds']:.3f}s ({r['walk_repos']} repos)")
+    print(f"  scandir walker, cold:     {r['cold_seconds']:.3f}s")
+    print(f"  nothing changed:          {r['warm_seconds']:.3f}s")
+    print(f"  one new repository:       {r['changed_seconds']:.3f}s "
+          f"({r['changed_listed']} directories listed, {r['changed_repos']} repos)")
@@ -0,0 +1,332 @@
+"""
+Tux Assistant - Git Project Status
+
+Collects the branch, upstream ahead/behind counts, dirty state, last
+commit and origin URL of git repositories for the Developer Tools
+project list:
+
+- One `git status --porcelain=v2 --branch` and one `git log -1` per
+  repository (the origin URL is read from .git/config), instead of five
+  separate git commands.
+- Repositories are queried concurrently on a small worker pool.
+- Results are cached against the mtimes of the files a status depends
+  on (.git/index, HEAD, the branch and upstream refs, packed-refs,
+  FETCH_HEAD), so a refresh only re-queries repositories that changed.
+  Edits to the working tree don't touch any of those, so entries are
+  also re-queried once they are older than `max_age`.
+
+Copyright (c) 2025 Christopher Dorrell. Licensed under GPL-3.0.
+"""
+
+import os
+import re
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional
+
+from .logger import get_logger
+
+log = get_logger('tux.gitstatus')
+
+
+MAX_WORKERS = min(8, (os.cpu_count() or 2) * 2)
+GIT_TIMEOUT = 15
+MAX_AGE = 60.0
+
+_ORIGIN_URL = re.compile(r'^\s*\[remote\s+"origin"\]\s*$(.*?)(?=^\s*\[|\Z)', re.MULTILINE | re.DOTALL)
+_URL_LINE = re.compile(r'^\s*url\s*=\s*(.+?)\s*$', re.MULTILINE)
+
+
+@dataclass
+class GitProject:
+    """Information about a git project."""
+    path: str
+    name: str
+    remote_url: str
+    branch: str
+    has_changes: bool
+    ahead: int  # commits ahead of remote
+    behind: int  # commits behind remote
+    last_commit: str
+    upstream: str = ""
+
+
+@dataclass
+class _Entry:
+    project: GitProject
+    stamp: list
+    checked_at: float = field(default_factory=time.monotonic)
+
+
+def find_git_dir(path: str) -> Optional[str]:
+    """The repository's git directory (follows `gitdir:` files of worktrees)."""
+    dot_git = os.path.join(path, '.git')
+    if os.path.isdir(dot_git):
+        return dot_git
+    try:
+        with open(dot_git) as f:
+            line = f.readline().strip()
+    except OSError:
+        return None
+    if line.startswith('gitdir:'):
+        git_dir = os.path.join(path, line[len('gitdir:'):].strip())
+        return git_dir if os.path.isdir(git_dir) else None
+    return None
+
+
+def read_origin_url(git_dir: str) -> str:
+    """remote.origin.url from the repository's config file ("" if unset)."""
+    # Worktrees keep their config in the main repository
+    common = git_dir
+    try:
+        with open(os.path.join(git_dir, 'commondir')) as f:
+            common = os.path.join(git_dir, f.read().strip())
+    except OSError:
+        pass
+    try:
+        with open(os.path.join(common, 'config')) as f:
+            config = f.read()
+    except OSError:
+        return ""
+    section = _ORIGIN_URL.search(config)
+    if not section:
+        return ""
+    url = _URL_LINE.search(section.group(1))
+    return url.group(1).strip('"') if url else ""
+
+
+def parse_porcelain_v2(output: str) -> tuple[str, str, int, int, bool]:
+    """(branch, upstream, ahead, behind, has_changes) from `status --porcelain=v2 --branch`."""
+    branch, upstream, ahead, behind, has_changes = "detached", "", 0, 0, False
+    for line in output.splitlines():
+        if not line.startswith('# '):
+            if line:
+                has_changes = True
+            continue
+        key, _, value = line[2:].partition(' ')
+        if key == 'branch.head' and value != '(detached)':
+            branch = value
+        elif key == 'branch.upstream':
+            upstream = value
+        elif key == 'branch.ab':
+            for part in value.split():
+                if part.startswith('+'):
+                    ahead = int(part[1:])
+                elif part.startswith('-'):
+                    behind = int(part[1:])
+    return branch, upstream, ahead, behind, has_changes
+
+
+def _git(path: str, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        ['git', '-C', path, *args],
+        capture_output=True, text=True, timeout=GIT_TIMEOUT,
+        env={**os.environ, 'GIT_OPTIONAL_LOCKS': '0', 'LC_ALL': 'C'}
+    )
+
+
+class GitStatusEngine:
+    """Concurrent, cached status collection for many repositories."""
+
+    def __init__(self, max_workers: int = MAX_WORKERS, max_age: float = MAX_AGE):
+        self.max_workers = max_workers
+        self.max_age = max_age
+        self._cache: dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self.stats = {'queried': 0, 'cached': 0}
+
+    # ==================== Change detection ====================
+
+    def _stamp(self, git_dir: str, branch: str = "", upstream: str = "") -> list:
+        """mtimes of the files a repository's status depends on."""
+        names = ['index', 'HEAD', 'packed-refs', 'FETCH_HEAD']
+        if branch and branch != 'detached':
+            names.append(os.path.join('refs', 'heads', branch))
+        if upstream:
+            names.append(os.path.join('refs', 'remotes', upstream))
+        stamp = []
+        for name in names:
+            try:
+                stamp.append(os.stat(os.path.join(git_dir, name)).st_mtime_ns)
+            except OSError:
+                stamp.append(None)
+        return stamp
+
+    def _cached(self, path: str, git_dir: str) -> Optional[GitProject]:
+        with self._lock:
+            entry = self._cache.get(path)
+        if entry is None or time.monotonic() - entry.checked_at >= self.max_age:
+            return None
+        project = entry.project
+        if self._stamp(git_dir, project.branch, project.upstream) != entry.stamp:
+            return None
+        return project
+
+    def invalidate(self, path: Optional[str] = None):
+        """Forget cached statuses (all by default), e.g. after a commit or pull."""
+        with self._lock:
+            if path is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(path, None)
+
+    # ==================== Queries ====================
+
+    def _query(self, path: str, git_dir: str) -> Optional[GitProject]:
+        """Run git for one repository (no caching)."""
+        # Stamped before running: a change during the query invalidates it
+        before = self._stamp(git_dir)
+        status = _git(path, 'status', '--porcelain=v2', '--branch')
+        if status.returncode != 0:
+            log.debug(f"git status failed in {path}: {status.stderr.strip()}")
+            return None
+        branch, upstream, ahead, behind, has_changes = parse_porcelain_v2(status.stdout)
+
+        last = _git(path, 'log', '-1', '--format=%s')
+        last_commit = last.stdout.strip()[:50] if last.returncode == 0 else ""
+
+        project = GitProject(
+            path=path,
+            name=os.path.basename(path),
+            remote_url=read_origin_url(git_dir),
+            branch=branch,
+            has_changes=has_changes,
+            ahead=ahead,
+            behind=behind,
+            last_commit=last_commit,
+            upstream=upstream,
+        )
+        stamp = self._stamp(git_dir, branch, upstream)
+        # `git status` may rewrite the index to refresh its stat data;
+        # that alone isn't a change
+        if stamp[1:len(before)] == before[1:]:
+            with self._lock:
+                self._cache[path] = _Entry(project, stamp)
+        return project
+
+    def status(self, path: str, refresh: bool = False) -> Optional[GitProject]:
+        """Status of one repository; None if it isn't one (or git failed)."""
+        git_dir = find_git_dir(path)
+        if git_dir is None:
+            return None
+        if not refresh:
+            project = self._cached(path, git_dir)
+            if project is not None:
+                with self._lock:
+                    self.stats['cached'] += 1
+                return project
+        with self._lock:
+            self.stats['queried'] += 1
+        try:
+            return self._query(path, git_dir)
+        except (OSError, subprocess.SubprocessError) as e:
+            log.debug(f"Reading git status of {path} failed: {e}")
+            return None
+
+    def status_many(self, paths: Iterable[str], refresh: bool = False,
+                    on_result: Optional[Callable[[str, Optional[GitProject]], None]] = None
+                    ) -> dict[str, Optional[GitProject]]:
+        """
+        Statuses of many repositories, queried concurrently.
+
+        Args:
+            paths: Repository paths
+            refresh: Re-query even repositories whose cached status is current
+            on_result: Called (from a worker thread) as each one finishes
+
+        Returns:
+            {path: GitProject or None}, in the order of `paths`
+        """
+        paths = list(dict.fromkeys(paths))
+        results: dict[str, Optional[GitProject]] = {}
+        if not paths:
+            return results
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(paths))) as pool:
+            futures = {pool.submit(self.status, p, refresh): p for p in paths}
+            for future in as_completed(futures):
+                path = futures[future]
+                results[path] = future.result()
+                if on_result:
+                    on_result(path, results[path])
+        return {p: results[p] for p in paths}
+
+
+# Singleton instance
+_engine: Optional[GitStatusEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_git_status_engine() -> GitStatusEngine:
+    """Get the shared git status engine."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = GitStatusEngine()
+        return _engine
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def benchmark(repos: int = 20, files: int = 200) -> dict:
+    """
+    Status of `repos` synthetic repositories: five git commands per repo
+    serially (the old way) vs. the engine cold and warm.
+    """
+    import tempfile
+
+    def old_way(path):
+        for args in (['remote', 'get-url', 'origin'], ['branch', '--show-current'],
+                     ['status', '--porcelain'],
+                     ['rev-list', '--left-right', '--count', 'HEAD...origin/main'],
+                     ['log', '-1', '--format=%s']):
+            _git(path, *args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(repos):
+            path = os.path.join(tmp, f'repo{i}')
+            os.makedirs(path)
+            for j in range(files):
+                with open(os.path.join(path, f'file{j}.txt'), 'w') as f:
+                    f.write(f'{i} {j}\n')
+            _git(path, 'init', '-q', '-b', 'main')
+            _git(path, 'remote', 'add', 'origin', f'https://example.com/repo{i}.git')
+            _git(path, 'add', '.')
+            _git(path, '-c', 'user.name=Bench', '-c', 'user.email=bench@example.com',
+                 'commit', '-q', '-m', 'Initial commit')
+            paths.append(path)
+
+        t0 = time.perf_counter()
+        for path in paths:
+            old_way(path)
+        serial_seconds = time.perf_counter() - t0
+
+        engine = GitStatusEngine()
+        t0 = time.perf_counter()
+        engine.status_many(paths)
+        cold_seconds = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        engine.status_many(paths)
+        warm_seconds = time.perf_counter() - t0
+
+    return {
+        'repos': repos,
+        'serial_seconds': serial_seconds,
+        'cold_seconds': cold_seconds,
+        'warm_seconds': warm_seconds,
+        'queried': engine.stats['queried'],
+    }
+
+
+if __name__ == '__main__':
+    r = benchmark()
+    print(f"{r['repos']} repositories")
+    print(f"  5 git commands each, serial: {r['serial_seconds']:.3f}s")
+    print(f"  engine, cold:                {r['cold_seconds']:.3f}s")
+    print(f"  engine, unchanged repos:     {r['warm_seconds']:.3f}s ({r['queried']} queries in total)")
@@ -0,0 +1,638 @@
+"""
+Tux Assistant - Browser History Store
+
+Persistent SQLite store for browser history.
+
+Keeps long-lived connections instead of reconnecting per call:
+- One WAL-mode writer connection owned by a background thread that
+  batches queued writes into a single transaction
+- One reader connection per calling thread (WAL lets readers run while
+  the writer commits), so autocomplete never pays connection setup;
+  connections of threads that have exited are closed
+
+Copyright (c) 2025 Christopher Dorrell. Licensed under GPL-3.0.
+"""
+
+import atexit
+import math
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+from .logger import get_logger
+
+log = get_logger('tux.history')
+
+
+SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        url TEXT NOT NULL UNIQUE,
+        title TEXT,
+        visit_count INTEGER DEFAULT 1,
+        last_visit REAL NOT NULL,
+        first_visit REAL NOT NULL,
+        frecency REAL DEFAULT 0,
+        frecency_ref REAL,
+        frecency_key REAL
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_history_url ON history(url)',
+    'CREATE INDEX IF NOT EXISTS idx_history_last_visit ON history(last_visit DESC)',
+    'CREATE INDEX IF NOT EXISTS idx_history_title ON history(title)',
+]
+
+# Trigram full-text index over url/title, kept in sync with `history`
+# by triggers. Trigram tokens make substring matches ('%q%') indexable.
+FTS_SCHEMA = [
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+        url, title, content='history', content_rowid='id', tokenize='trigram'
+    )
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS history_fts_ai AFTER INSERT ON history BEGIN
+        INSERT INTO history_fts(rowid, url, title) VALUES (new.id, new.url, new.title);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS history_fts_ad AFTER DELETE ON history BEGIN
+        INSERT INTO history_fts(history_fts, rowid, url, title)
+        VALUES ('delete', old.id, old.url, old.title);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS history_fts_au AFTER UPDATE OF url, title ON history
+    WHEN old.url IS NOT new.url OR old.title IS NOT new.title BEGIN
+        INSERT INTO history_fts(history_fts, rowid, url, title)
+        VALUES ('delete', old.id, old.url, old.title);
+        INSERT INTO history_fts(rowid, url, title) VALUES (new.id, new.url, new.title);
+    END
+    ''',
+]
+
+# PRAGMA user_version once the FTS index exists and has been populated.
+# Versions only ever go up, so a later version (set on an SQLite without
+# FTS5) doesn't mean the index exists; a newly created one is always filled.
+SCHEMA_VERSION_FTS = 1
+
+# Trigram tokens are 3 characters; shorter queries fall back to LIKE
+FTS_MIN_QUERY = 3
+
+# Weight of (negated) bm25 relevance against frecency_key, which is in
+# log space: each unit of relevance multiplies the score by e^weight.
+# URL matches count double relative to title matches.
+FTS_RANK_WEIGHT = 0.5
+
+# PRAGMA user_version once frecency is stored as (score, reference time)
+SCHEMA_VERSION_DECAY = 2
+
+# Frecency model (exponential decay, as in Firefox):
+#   score(t) = score(ref) * exp(-DECAY_RATE * (t - ref))
+# Each visit decays the stored score to "now" and adds VISIT_POINTS.
+# Because exp(-λ(t - ref)) = exp(-λt) * exp(λref), ordering rows by
+#   frecency_key = ln(score) + λ * ref
+# gives the same order as their current scores at any time t, so ranking
+# is a plain indexed ORDER BY and rows never need rewriting as time passes.
+FRECENCY_HALF_LIFE = 30 * 86400
+DECAY_RATE = math.log(2) / FRECENCY_HALF_LIFE
+VISIT_POINTS = 100.0
+
+# Maintenance rebases scores whose reference time is older than this,
+# so the stored score column stays close to its current value
+FRECENCY_REBASE_AGE = 7 * 86400
+FRECENCY_REBASE_BATCH = 50000
+
+# One statement per visit: insert new URLs, bump existing ones in place
+UPSERT_VISIT = '''
+    INSERT INTO history (url, title, visit_count, last_visit, first_visit,
+                         frecency, frecency_ref, frecency_key)
+    VALUES (:url, COALESCE(:title, :url), 1, :now, :now,
+            :points, :now, frecency_key(:points, :now))
+    ON CONFLICT(url) DO UPDATE SET
+        title = COALESCE(:title, history.title),
+        visit_count = history.visit_count + 1,
+        last_visit = :now,
+        frecency = frecency_decay(history.frecency, history.frecency_ref, :now) + :points,
+        frecency_ref = :now,
+        frecency_key = frecency_key(
+            frecency_decay(history.frecency, history.frecency_ref, :now) + :points, :now)
+'''
+
+
+def frecency_decay(score: float, ref: float, now: float) -> float:
+    """Value at `now` of a frecency score recorded at time `ref`."""
+    if not score:
+        return 0.0
+    return score * math.exp(-DECAY_RATE * max(0.0, now - (ref or now)))
+
+
+def frecency_key(score: float, ref: float) -> float:
+    """Time-independent sort key: higher key = higher current score."""
+    if not score or score <= 0:
+        return float('-inf')
+    return math.log(score) + DECAY_RATE * ref
+
+
+class HistoryStore:
+    """Browser history database with pooled connections and batched writes."""
+
+    def __init__(self, path: str, flush_interval: float = 0.5):
+        """
+        Args:
+            path: SQLite database file
+            flush_interval: Seconds to collect queued writes before committing
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+
+        self._queue: queue.Queue = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._local = threading.local()
+        self._readers: list[tuple[threading.Thread, sqlite3.Connection]] = []
+        self._readers_lock = threading.Lock()
+        self._closed = False
+        self.fts_enabled = False
+
+    # ==================== Connections ====================
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection configured for WAL and our SQL functions."""
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.create_function('frecency_decay', 3, frecency_decay, deterministic=True)
+        conn.create_function('frecency_key', 2, frecency_key, deterministic=True)
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """Get the calling thread's read connection (created on first use)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            with self._readers_lock:
+                self._close_dead_readers()
+                self._readers.append((threading.current_thread(), conn))
+        return conn
+
+    def _close_dead_readers(self):
+        """Close connections of threads that have exited (short-lived workers)."""
+        # Callers hold self._readers_lock
+        alive = []
+        for thread, conn in self._readers:
+            if thread.is_alive():
+                alive.append((thread, conn))
+                continue
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._readers = alive
+
+    def open(self):
+        """Create the schema and start the background writer."""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+
+        conn = self._connect()
+        for statement in SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+        self._migrate(conn)
+        # Writer runs in autocommit mode and manages transactions itself
+        conn.isolation_level = None
+
+        self._writer = threading.Thread(
+            target=self._writer_loop, args=(conn,),
+            name='tux-history-writer', daemon=True
+        )
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _migrate(self, conn: sqlite3.Connection):
+        """Bring databases created by older versions up to date."""
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        self._migrate_fts(conn, version)
+        self._migrate_frecency(conn, version)
+
+    def _migrate_frecency(self, conn: sqlite3.Connection, version: int):
+        """Convert write-time bucket scores to decaying (score, ref) pairs."""
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(history)')}
+        for column in ('frecency_ref', 'frecency_key'):
+            if column not in columns:
+                conn.execute(f'ALTER TABLE history ADD COLUMN {column} REAL')
+
+        if version < SCHEMA_VERSION_DECAY:
+            # Old scores were bucketed at write time and can't be decayed.
+            # Re-seed from visit counts as if every visit happened at last_visit.
+            log.info("Converting history frecency to decaying scores...")
+            conn.execute('''
+                UPDATE history SET
+                    frecency = visit_count * ?,
+                    frecency_ref = last_visit,
+                    frecency_key = frecency_key(visit_count * ?, last_visit)
+            ''', (VISIT_POINTS, VISIT_POINTS))
+            conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION_DECAY}')
+
+        conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_history_frecency_key ON history(frecency_key DESC)')
+        # Nothing sorts by the raw score any more; its index only slowed writes
+        conn.execute('DROP INDEX IF EXISTS idx_history_frecency')
+        conn.commit()
+
+    def _migrate_fts(self, conn: sqlite3.Connection, version: int):
+        """Add the full-text index to databases created before it existed."""
+        try:
+            created = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'history_fts'").fetchone() is None
+            for statement in FTS_SCHEMA:
+                conn.execute(statement)
+            if created or version < SCHEMA_VERSION_FTS:
+                log.info("Building history full-text index...")
+                conn.execute("INSERT INTO history_fts(history_fts) VALUES ('rebuild')")
+                conn.execute(f'PRAGMA user_version = {max(version, SCHEMA_VERSION_FTS)}')
+            conn.commit()
+            self.fts_enabled = True
+        except sqlite3.OperationalError as e:
+            # SQLite built without FTS5 or older than 3.34 (no trigram)
+            conn.rollback()
+            self.fts_enabled = False
+            log.warning(f"History full-text search unavailable, using LIKE: {e}")
+
+    def close(self):
+        """Flush pending writes and close all connections."""
+        if self._closed:
+            return
+        self._closed = True
+
+        if self._writer and self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join(timeout=5)
+
+        with self._readers_lock:
+            for _thread, conn in self._readers:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._readers.clear()
+
+    # ==================== Writer ====================
+
+    def _submit(self, op: Callable[[sqlite3.Connection], object],
+                wait: bool = False, standalone: bool = False):
+        """
+        Queue a write operation for the writer thread.
+
+        Args:
+            op: Callable taking the writer connection
+            wait: Block until the operation has been committed
+            standalone: Run outside a transaction (e.g. VACUUM)
+
+        Returns:
+            The op's return value when wait=True, else None
+        """
+        if self._closed or not self._writer:
+            return None
+
+        done = threading.Event() if wait else None
+        result = {}
+        self._queue.put((op, done, standalone, result))
+        if done:
+            done.wait()
+            if 'error' in result:
+                raise result['error']
+            return result.get('value')
+        return None
+
+    def _writer_loop(self, conn: sqlite3.Connection):
+        """Drain the queue, committing each batch in one transaction."""
+        running = True
+        while running:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+
+            # Debounce: give other writes a moment to join this transaction.
+            # Callers waiting on a result are flushed immediately.
+            deadline = time.monotonic() + self.flush_interval
+            while item[1] is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+                    break
+                batch.append(item)
+
+            # Drain anything else already queued without waiting
+            while running:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+                    break
+                batch.append(item)
+
+            self._run_batch(conn, batch)
+
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _run_batch(self, conn: sqlite3.Connection, batch: list):
+        """Execute a batch of queued operations."""
+        pending = []
+
+        def commit_pending():
+            if not pending:
+                return
+            try:
+                conn.execute('BEGIN')
+                for op, _done, _standalone, result in pending:
+                    result['value'] = op(conn)
+                conn.execute('COMMIT')
+            except Exception as e:
+                log.error(f"History write failed: {e}")
+                try:
+                    conn.execute('ROLLBACK')
+                except Exception:
+                    pass
+                for _op, _done, _standalone, result in pending:
+                    result['error'] = e
+            for _op, done, _standalone, _result in pending:
+                if done:
+                    done.set()
+            pending.clear()
+
+        for entry in batch:
+            op, done, standalone, result = entry
+            if not standalone:
+                pending.append(entry)
+                continue
+            commit_pending()
+            try:
+                result['value'] = op(conn)
+            except Exception as e:
+                log.error(f"History maintenance failed: {e}")
+                result['error'] = e
+            if done:
+                done.set()
+        commit_pending()
+
+    def flush(self):
+        """Block until all previously queued writes are committed."""
+        self._submit(lambda conn: None, wait=True)
+
+    # ==================== Writes ====================
+
+    def record_visit(self, url: str, title: Optional[str] = None,
+                     when: Optional[float] = None):
+        """Queue a page visit. Never blocks on disk."""
+        params = {'url': url, 'title': title, 'now': when or time.time(),
+                  'points': VISIT_POINTS}
+        self._submit(lambda conn: conn.execute(UPSERT_VISIT, params))
+
+    def delete(self, urls: list[str]) -> bool:
+        """Delete history entries by URL."""
+        rows = [(url,) for url in urls]
+        self._submit(
+            lambda conn: conn.executemany('DELETE FROM history WHERE url = ?', rows),
+            wait=True
+        )
+        return True
+
+    def clear(self, since: Optional[float] = None) -> bool:
+        """Delete all history, or only entries visited at/after `since`."""
+        if since is None:
+            op = lambda conn: conn.execute('DELETE FROM history')
+        else:
+            op = lambda conn: conn.execute(
+                'DELETE FROM history WHERE last_visit >= ?', (since,))
+        self._submit(op, wait=True)
+        return True
+
+    def delete_oldest(self, percent: int) -> int:
+        """Delete the least recently visited `percent` of entries."""
+        def op(conn):
+            count = conn.execute('SELECT COUNT(*) FROM history').fetchone()[0]
+            delete_count = int(count * percent / 100)
+            if delete_count > 0:
+                conn.execute('''
+                    DELETE FROM history WHERE id IN (
+                        SELECT id FROM history ORDER BY last_visit ASC LIMIT ?
+                    )
+                ''', (delete_count,))
+            return delete_count
+        return self._submit(op, wait=True) or 0
+
+    def vacuum(self):
+        """Reclaim space (runs on the writer, outside any transaction)."""
+        def op(conn):
+            conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            conn.execute('VACUUM')
+        self._submit(op, wait=True, standalone=True)
+
+    def recompute_frecency(self, now: Optional[float] = None) -> int:
+        """
+        Rebase stale frecency scores to the current time.
+
+        Ranking never needs this (frecency_key is time-independent); it keeps
+        the stored score meaningful and repairs rows written without a key.
+        Runs in batches so page-visit writes can interleave.
+
+        Returns:
+            Number of rows updated
+        """
+        now = now or time.time()
+        cutoff = now - FRECENCY_REBASE_AGE
+        total = 0
+
+        def op(conn):
+            cursor = conn.execute('''
+                UPDATE history SET
+                    frecency = frecency_decay(frecency, frecency_ref, :now),
+                    frecency_ref = :now,
+                    frecency_key = frecency_key(
+                        frecency_decay(frecency, frecency_ref, :now), :now)
+                WHERE id IN (
+                    SELECT id FROM history
+                    WHERE frecency_ref IS NULL OR frecency_key IS NULL
+                       OR frecency_ref < :cutoff
+                    LIMIT :batch
+                )
+            ''', {'now': now, 'cutoff': cutoff, 'batch': FRECENCY_REBASE_BATCH})
+            return cursor.rowcount
+
+        while True:
+            updated = self._submit(op, wait=True) or 0
+            total += updated
+            if updated < FRECENCY_REBASE_BATCH:
+                return total
+
+    # ==================== Reads ====================
+
+    def query(self, sql: str, params=()) -> list[dict]:
+        """Run a read-only query on this thread's connection."""
+        cursor = self._reader().execute(sql, params)
+        return [dict(row) for row in cursor.fetchall()]
+
+    def count(self) -> int:
+        """Total number of history entries."""
+        return self._reader().execute('SELECT COUNT(*) FROM history').fetchone()[0]
+
+    def get_history(self, limit: int = 50, offset: int = 0,
+                    search: Optional[str] = None,
+                    since: Optional[float] = None,
+                    until: Optional[float] = None) -> list[dict]:
+        """Get entries newest first, optionally filtered by text and time."""
+        sql = (
+            'SELECT url, title, visit_count, last_visit, '
+            'frecency_decay(frecency, frecency_ref, ?) AS frecency FROM history'
+        )
+        params = [time.time()]
+        conditions = []
+
+        if since is not None:
+            conditions.append('last_visit >= ?')
+            params.append(since)
+        if until is not None:
+            conditions.append('last_visit < ?')
+            params.append(until)
+
+        if search and self._use_fts(search):
+            conditions.append(
+                'id IN (SELECT rowid FROM history_fts WHERE history_fts MATCH ?)')
+            params.append(self._fts_phrase(search))
+        elif search:
+            conditions.append('(url LIKE ? OR title LIKE ?)')
+            search_term = f'%{search}%'
+            params.extend([search_term, search_term])
+
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+
+        sql += ' ORDER BY last_visit DESC LIMIT ? OFFSET ?'
+        params.extend([limit, offset])
+        return self.query(sql, params)
+
+    def get_suggestions(self, text: str, limit: int = 8) -> list[dict]:
+        """Get autocomplete suggestions ranked by FTS relevance and frecency."""
+        now = time.time()
+        if self._use_fts(text):
+            return self.query('''
+                SELECT h.url, h.title,
+                       frecency_decay(h.frecency, h.frecency_ref, ?) AS frecency
+                FROM history_fts
+                JOIN history h ON h.id = history_fts.rowid
+                WHERE history_fts MATCH ?
+                ORDER BY h.frecency_key - ? * bm25(history_fts, 2.0, 1.0) DESC
+                LIMIT ?
+            ''', (now, self._fts_phrase(text), FTS_RANK_WEIGHT, limit))
+
+        search_term = f'%{text}%'
+        return self.query('''
+            SELECT url, title, frecency_decay(frecency, frecency_ref, ?) AS frecency
+            FROM history
+            WHERE url LIKE ? OR title LIKE ?
+            ORDER BY frecency_key DESC
+            LIMIT ?
+        ''', (now, search_term, search_term, limit))
+
+    def _use_fts(self, text: str) -> bool:
+        """Whether `text` can be answered from the trigram index."""
+        return self.fts_enabled and len(text) >= FTS_MIN_QUERY
+
+    @staticmethod
+    def _fts_phrase(text: str) -> str:
+        """Quote user input as a single FTS5 phrase (substring match)."""
+        return '"' + text.replace('"', '""') + '"'
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def benchmark(rows: int = 500000, path: Optional[str] = None) -> dict:
+    """
+    Time ranking and maintenance on a synthetic history database.
+
+    Builds `rows` entries with visits spread over two years, then measures
+    the indexed top-N frecency query, FTS suggestions, the old approach of
+    rescoring every row in Python, and the batched rebase job.
+    """
+    import random
+    import tempfile
+
+    tmpdir = None
+    if path is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(tmpdir.name, 'history.db')
+
+    now = time.time()
+    rng = random.Random(42)
+    store = HistoryStore(path, flush_interval=0)
+    store.open()
+    results = {'rows': rows}
+
+    def timed(name, fn):
+        t0 = time.perf_counter()
+        value = fn()
+        results[name] = time.perf_counter() - t0
+        return value
+
+    def populate(conn):
+        data = []
+        for i in range(rows):
+            visits = rng.randint(1, 50)
+            last = now - rng.uniform(0, 2 * 365 * 86400)
+            score = visits * VISIT_POINTS
+            data.append((f'https://site{i % 5000}.example/page/{i}', f'Page {i}',
+                         visits, last, last, score, last, frecency_key(score, last)))
+        conn.executemany('''
+            INSERT INTO history (url, title, visit_count, last_visit, first_visit,
+                                 frecency, frecency_ref, frecency_key)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', data)
+
+    timed('populate_s', lambda: store._submit(populate, wait=True))
+
+    timed('top20_by_frecency_s', lambda: store.query(
+        'SELECT url FROM history ORDER BY frecency_key DESC LIMIT 20'))
+    timed('suggestions_s', lambda: store.get_suggestions('site123', limit=8))
+
+    def python_rescore():
+        # What write-time scoring needs to stay correct: touch every row
+        conn = store._reader()
+        return [(frecency_decay(score, ref, now), row_id) for row_id, score, ref
+                in conn.execute('SELECT id, frecency, frecency_ref FROM history')]
+    timed('full_python_rescore_s', python_rescore)
+
+    results['rebased_rows'] = timed(
+        'rebase_job_s', lambda: store.recompute_frecency(now + FRECENCY_REBASE_AGE))
+
+    store.close()
+    if tmpdir:
+        tmpdir.cleanup()
+    return results
+
+
+if __name__ == '__main__':
+    import sys
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    for name, value in benchmark(n).items():
+        print(f"{name:>24}: {value:.4f}" if isinstance(value, float) else f"{name:>24}: {value}")
@@ -0,0 +1,484 @@
+"""
+Tux Assistant - HTTP Response Cache
+
+One on-disk cache for everything the app downloads from web APIs
+(weather, news feeds, extension search, the update check, favicons):
+
+- Entries are keyed by URL and remember the response's validators, so a
+  stale entry is revalidated with If-None-Match / If-Modified-Since and an
+  unchanged resource costs a "304 Not Modified" instead of a download.
+- Cache-Control (max-age, no-cache, no-store) and Expires decide how long
+  an entry is fresh; callers may accept older copies with `max_age`.
+- The total size is bounded and the least recently used entries are
+  evicted first.
+- Hit / revalidation / miss counters are kept across sessions, with the
+  bytes and time they saved (``python -m tux.core.httpcache`` prints them).
+
+Bodies are stored one file each under ~/.cache/tux-assistant/http, with
+a JSON index. Safe to use from several threads.
+
+Copyright (c) 2025 Christopher Dorrell. Licensed under GPL-3.0.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+from .logger import get_logger
+
+log = get_logger('tux.httpcache')
+
+
+CACHE_VERSION = 1
+MAX_BYTES = 64 * 1024 * 1024     # Total size of stored bodies
+MAX_ENTRY_BYTES = 8 * 1024 * 1024  # Larger responses aren't stored
+SAVE_INTERVAL = 30.0             # Seconds between index writes caused by hits
+
+# Response headers kept with an entry
+STORED_HEADERS = ('etag', 'last-modified', 'content-type', 'cache-control', 'expires', 'date')
+
+STAT_EVENTS = ('hits', 'revalidated', 'misses', 'stale', 'stores', 'evictions')
+
+
+def _default_directory() -> str:
+    cache = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(cache, 'tux-assistant', 'http')
+
+
+@dataclass
+class CacheEntry:
+    """A stored response (the body lives in its own file)."""
+    url: str
+    status: int = 200
+    headers: dict[str, str] = field(default_factory=dict)
+    stored_at: float = 0.0     # Last download or successful revalidation
+    expires_at: float = 0.0    # Fresh until then, per the server
+    no_cache: bool = False     # Server wants every use revalidated
+    size: int = 0
+
+    @property
+    def etag(self) -> str:
+        return self.headers.get('etag', '')
+
+    @property
+    def last_modified(self) -> str:
+        return self.headers.get('last-modified', '')
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (time.time() if now is None else now) - self.stored_at
+
+    def is_fresh(self, max_age: Optional[float] = None, now: Optional[float] = None) -> bool:
+        """
+        Whether the entry can be used without asking the server.
+
+        `max_age` is how old a copy the caller accepts even if the server
+        gave a shorter (or no) lifetime; no-cache entries are never fresh.
+        """
+        if self.no_cache:
+            return False
+        now = time.time() if now is None else now
+        if now < self.expires_at:
+            return True
+        return max_age is not None and self.age(now) < max_age
+
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+def freshness(headers: Mapping[str, str], now: Optional[float] = None) -> tuple[float, bool, bool]:
+    """
+    (expires_at, no_cache, no_store) from a response's caching headers.
+
+    Cache-Control max-age wins over Expires; with neither, the response
+    is stale immediately (it is still stored for revalidation).
+    """
+    now = time.time() if now is None else now
+    directives = {}
+    for part in (headers.get('cache-control') or '').lower().split(','):
+        name, _, value = part.strip().partition('=')
+        if name:
+            directives[name] = value.strip('"')
+
+    no_store = 'no-store' in directives
+    no_cache = 'no-cache' in directives
+    try:
+        age = max(0.0, float(headers.get('age') or 0))
+    except ValueError:
+        age = 0.0
+
+    if 'max-age' in directives:
+        try:
+            return now + int(directives['max-age']) - age, no_cache, no_store
+        except ValueError:
+            return now, no_cache, no_store
+    expires = headers.get('expires')
+    if expires:
+        try:
+            expires_at = parsedate_to_datetime(expires).timestamp()
+            date = headers.get('date')
+            # Expires is relative to the server's clock
+            if date:
+                expires_at += now - parsedate_to_datetime(date).timestamp()
+            return expires_at, no_cache, no_store
+        except (TypeError, ValueError, OverflowError):
+            pass
+    return now, no_cache, no_store
+
+
+class HttpCache:
+    """Size-bounded LRU store of HTTP responses, persisted to disk."""
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = MAX_BYTES):
+        self.directory = directory or _default_directory()
+        self.max_bytes = max_bytes
+        self._entries: Optional[OrderedDict[str, CacheEntry]] = None  # LRU first
+        self._total = 0
+        self._stats = {name: 0 for name in STAT_EVENTS}
+        self._stats.update(bytes_saved=0, bytes_downloaded=0, seconds_saved=0.0,
+                           fetch_seconds=0.0, since=time.time())
+        self._session = {name: 0 for name in STAT_EVENTS}
+        self._dirty = False
+        self._saved_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.directory, 'index.json')
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + '.body')
+
+    def _load(self) -> OrderedDict:
+        # Callers hold self._lock
+        if self._entries is not None:
+            return self._entries
+        self._entries = OrderedDict()
+        try:
+            with open(self.index_path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return self._entries
+        except (OSError, ValueError) as e:
+            log.warning(f"Ignoring unreadable HTTP cache index: {e}")
+            return self._entries
+        if data.get('version') != CACHE_VERSION:
+            return self._entries
+
+        known = set(CacheEntry.__dataclass_fields__)
+        for key, record in data.get('entries', []):
+            try:
+                entry = CacheEntry(**{k: v for k, v in record.items() if k in known})
+            except TypeError:
+                continue
+            if os.path.exists(self._body_path(key)):
+                self._entries[key] = entry
+                self._total += entry.size
+        saved = data.get('stats', {})
+        for name, value in saved.items():
+            if name in self._stats:
+                self._stats[name] = value
+        return self._entries
+
+    def _write_index(self):
+        # Callers hold self._lock
+        data = {
+            'version': CACHE_VERSION,
+            'entries': [[key, asdict(e)] for key, e in self._entries.items()],
+            'stats': self._stats,
+        }
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = self.index_path + '.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp, self.index_path)
+        except OSError as e:
+            log.warning(f"Could not save HTTP cache index: {e}")
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+    def _touch(self):
+        # Callers hold self._lock. Hits only reorder the LRU and bump
+        # counters, so they are written out at most every SAVE_INTERVAL.
+        self._dirty = True
+        if time.monotonic() - self._saved_at >= SAVE_INTERVAL:
+            self._write_index()
+
+    def save(self):
+        """Write the index if anything changed since the last write."""
+        with self._lock:
+            if self._entries is not None and self._dirty:
+                self._write_index()
+
+    # ==================== Entries ====================
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        """The entry for key (a URL), fresh or not, marked recently used."""
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(key)
+            if entry is not None:
+                entries.move_to_end(key)
+            return entry
+
+    def body(self, key: str) -> Optional[bytes]:
+        """The stored body for key, or None if it's gone."""
+        try:
+            with open(self._body_path(key), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store(self, key: str, body: bytes, headers: Mapping[str, str],
+              status: int = 200, url: str = "") -> Optional[CacheEntry]:
+        """
+        Store a response, evicting least recently used entries to make room.
+
+        Returns None (and drops any old entry) when the response says
+        no-store or is too large to keep.
+        """
+        expires_at, no_cache, no_store = freshness(headers)
+        headers = {name: headers.get(name) for name in STORED_HEADERS if headers.get(name)}
+        if no_store or len(body) > min(MAX_ENTRY_BYTES, self.max_bytes):
+            self.remove(key)
+            return None
+
+        entry = CacheEntry(url=url or key, status=status, headers=headers, stored_at=time.time(),
+                           expires_at=expires_at, no_cache=no_cache, size=len(body))
+        path = self._body_path(key)
+        with self._lock:
+            # Written under the lock so the index and body files always agree
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                tmp = path + '.tmp'
+                with open(tmp, 'wb') as f:
+                    f.write(body)
+                os.replace(tmp, path)
+            except OSError as e:
+                log.warning(f"Could not store {key} in HTTP cache: {e}")
+                return None
+
+            entries = self._load()
+            old = entries.pop(key, None)
+            if old:
+                self._total -= old.size
+            entries[key] = entry
+            self._total += entry.size
+            self._count('stores')
+            self._evict()
+            self._write_index()
+        return entry
+
+    def refresh(self, key: str, headers: Mapping[str, str]) -> Optional[CacheEntry]:
+        """Renew an entry after a 304, taking any updated headers."""
+        with self._lock:
+            entry = self._load().get(key)
+            if entry is None:
+                return None
+            for name in STORED_HEADERS:
+                if headers.get(name):
+                    entry.headers[name] = headers.get(name)
+            renewed = {**entry.headers, 'age': headers.get('age') or '0'}
+            entry.expires_at, entry.no_cache, _no_store = freshness(renewed)
+            entry.stored_at = time.time()
+            self._touch()
+            return entry
+
+    def remove(self, key: str):
+        with self._lock:
+            entry = self._load().pop(key, None)
+            if entry is None:
+                return
+            self._total -= entry.size
+            self._dirty = True
+            try:
+                os.remove(self._body_path(key))
+            except OSError:
+                pass
+
+    def clear(self):
+        """Drop every entry (statistics are kept)."""
+        with self._lock:
+            for key in self._load():
+                try:
+                    os.remove(self._body_path(key))
+                except OSError:
+                    pass
+            self._entries.clear()
+            self._total = 0
+            self._write_index()
+
+    def _evict(self):
+        # Callers hold self._lock
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            key, entry = self._entries.popitem(last=False)
+            self._total -= entry.size
+            self._count('evictions')
+            try:
+                os.remove(self._body_path(key))
+            except OSError:
+                pass
+
+    # ==================== Statistics ====================
+
+    def _count(self, event: str):
+        # Callers hold self._lock
+        self._stats[event] += 1
+        self._session[event] += 1
+
+    def record(self, event: str, nbytes: int = 0, seconds: float = 0.0):
+        """
+        Count a cache outcome:
+
+        - 'hits': served without a request (nbytes saved)
+        - 'revalidated': a 304 instead of a download (nbytes saved)
+        - 'misses': downloaded (nbytes, taking `seconds`)
+        - 'stale': a failed request answered from the cache
+        """
+        with self._lock:
+            self._load()
+            self._count(event)
+            if event == 'misses':
+                self._stats['bytes_downloaded'] += nbytes
+                self._stats['fetch_seconds'] += seconds
+            elif event in ('hits', 'revalidated', 'stale'):
+                self._stats['bytes_saved'] += nbytes
+                if event == 'hits':
+                    # A hit saves a whole round trip; estimate it from the
+                    # average download time seen so far
+                    misses = self._stats['misses']
+                    if misses:
+                        self._stats['seconds_saved'] += self._stats['fetch_seconds'] / misses
+            self._touch()
+
+    def stats(self) -> dict:
+        """Counters since the cache was created, plus this session's and the current size."""
+        with self._lock:
+            self._load()
+            stats = dict(self._stats)
+            stats['session'] = dict(self._session)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._total
+            stats['max_bytes'] = self.max_bytes
+        requests = stats['hits'] + stats['revalidated'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['revalidated']) / requests if requests else 0.0
+        return stats
+
+
+# Singleton instance
+_cache: Optional[HttpCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> HttpCache:
+    """Get the shared HTTP response cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HttpCache()
+            atexit.register(_cache.save)
+        return _cache
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def benchmark(urls: int = 10, rounds: int = 5, latency: float = 0.05,
+              body_bytes: int = 20_000) -> dict:
+    """
+    Fetch `urls` resources `rounds` times (like widget refreshes) from a
+    local server that takes `latency` per request, without and with the
+    cache. Half the resources send max-age, half only an ETag.
+    """
+    import tempfile
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from .httpclient import HttpClient
+
+    body = b'x' * body_bytes
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            time.sleep(latency)
+            number = int(self.path.rsplit('/', 1)[-1])
+            etag = f'"v{number}"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('ETag', etag)
+            if number % 2:
+                self.send_header('Cache-Control', 'max-age=3600')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    targets = [f'http://127.0.0.1:{server.server_port}/r/{n}' for n in range(urls)]
+    report = {'requests': urls * rounds}
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            cache = HttpCache(directory)
+            client = HttpClient(cache=cache)
+            client._proxies = {}
+
+            t0 = time.perf_counter()
+            downloaded = 0
+            for _ in range(rounds):
+                for url in targets:
+                    downloaded += len(client.request(url).content)
+            report['uncached_seconds'] = time.perf_counter() - t0
+            report['uncached_bytes'] = downloaded
+
+            t0 = time.perf_counter()
+            for _ in range(rounds):
+                for url in targets:
+                    client.get(url).content
+            report['cached_seconds'] = time.perf_counter() - t0
+            report['stats'] = cache.stats()
+            client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+    return report
+
+
+if __name__ == '__main__':
+    s = get_http_cache().stats()
+    print(f"{get_http_cache().directory}: {s['entries']} entries, "
+          f"{s['bytes'] / 1e6:.1f} of {s['max_bytes'] / 1e6:.0f} MB")
+    print(f"  since {time.strftime('%Y-%m-%d', time.localtime(s['since']))}: "
+          f"{s['hits']} hits, {s['revalidated']} revalidated, {s['misses']} misses, "
+          f"{s['stale']} stale (hit rate {s['hit_rate']:.0%})")
+    print(f"  saved {s['bytes_saved'] / 1e6:.1f} MB and ~{s['seconds_saved']:.0f}s of requests, "
+          f"downloaded {s['bytes_downloaded'] / 1e6:.1f} MB")
+
+    r = benchmark()
+    b = r['stats']
+    print(f"benchmark: {r['requests']} requests")
+    print(f"  no cache: {r['uncached_seconds']:.2f}s, {r['uncached_bytes'] / 1e3:.0f} KB")
+    print(f"  cached:   {r['cached_seconds']:.2f}s, {b['bytes_downloaded'] / 1e3:.0f} KB "
+          f"({b['hits']} hits, {b['revalidated']} revalidated, {b['misses']} misses)")
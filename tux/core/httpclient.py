@@ -0,0 +1,497 @@
+"""
+Tux Assistant - Shared HTTP Client
+
+One in-process HTTP/1.1 client for the widgets and apps that talk to web
+APIs, instead of each forking `curl` or opening a fresh urllib
+connection per request:
+
+- Keep-alive connections are pooled per host and reused across requests
+  and threads, saving a TCP + TLS handshake on every call after the first.
+- Every request has a timeout; idempotent requests are retried on
+  connection errors and 429/5xx answers with exponential backoff
+  (honouring Retry-After).
+- Redirects are followed, gzip responses decoded, and the usual
+  http(s)_proxy / no_proxy environment variables respected.
+
+Responses can be read incrementally (``open``) or all at once
+(``request``, ``get_json``); ``get`` goes through the shared on-disk
+response cache (see httpcache).
+
+Copyright (c) 2025 Christopher Dorrell. Licensed under GPL-3.0.
+"""
+
+import http.client
+import json
+import random
+import ssl
+import threading
+import time
+import urllib.parse
+import urllib.request
+import zlib
+from collections import defaultdict
+from typing import Any, Optional
+
+from .httpcache import CacheEntry, HttpCache, get_http_cache
+from .logger import get_logger
+
+log = get_logger('tux.http')
+
+
+USER_AGENT = 'TuxAssistant/1.0'
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_RETRIES = 2
+BACKOFF = 0.5                  # Seconds before the first retry, doubled each time
+MAX_BACKOFF = 8.0
+MAX_REDIRECTS = 5
+MAX_IDLE_PER_HOST = 4
+IDLE_TIMEOUT = 60.0            # Pooled connections unused this long are closed
+DRAIN_LIMIT = 64 * 1024        # Unread bodies up to this size are drained to keep the connection
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+# A reused keep-alive connection the server has already closed fails
+# like this before any response arrives; such requests are simply resent
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError,
+                            BrokenPipeError, http.client.CannotSendRequest)
+
+
+class HttpError(OSError):
+    """A request failed, or answered with an error status."""
+
+    def __init__(self, message: str, status: Optional[int] = None, url: str = ""):
+        super().__init__(message)
+        self.status = status
+        self.url = url
+
+
+class HttpResponse:
+    """
+    A response whose body is read on demand.
+
+    Closing it after the body has been read completely returns the
+    connection to the pool; closing it early discards the connection.
+    """
+
+    def __init__(self, client: 'HttpClient', key: tuple, conn: http.client.HTTPConnection,
+                 response: http.client.HTTPResponse, url: str):
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+        self.url = url
+        self._client = client
+        self._key = key
+        self._conn = conn
+        self._response = response
+        self._content: Optional[bytes] = None
+        self.from_cache = False
+        encoding = (self.headers.get('Content-Encoding') or '').lower()
+        # wbits 32+MAX_WBITS accepts both gzip and zlib streams
+        self._decoder = zlib.decompressobj(32 + zlib.MAX_WBITS) if encoding in ('gzip', 'deflate') else None
+
+    @classmethod
+    def from_entry(cls, entry: CacheEntry, body: bytes) -> 'HttpResponse':
+        """A response answered from the HTTP cache."""
+        self = cls.__new__(cls)
+        self.status = entry.status
+        self.reason = http.client.responses.get(entry.status, '')
+        self.headers = http.client.HTTPMessage()
+        for name, value in entry.headers.items():
+            self.headers[name] = value
+        self.url = entry.url
+        self._response = None
+        self._content = body
+        self._decoder = None
+        self.from_cache = True
+        return self
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    def read(self, size: int = -1) -> bytes:
+        """Up to `size` bytes of the (decoded) body; all of it by default."""
+        if self._content is not None:
+            data, self._content = self._content, b''
+            return data
+        if self._response is None:
+            return b''
+        while True:
+            raw = self._response.read() if size < 0 else self._response.read(size)
+            finished = not raw or self._response.isclosed()
+            data = raw if self._decoder is None else self._decoder.decompress(raw)
+            if finished:
+                if self._decoder is not None:
+                    data += self._decoder.flush()
+                # Body complete: hand the connection back right away
+                self.close()
+                return data
+            if data:
+                return data
+
+    @property
+    def content(self) -> bytes:
+        """The whole body (read on first access)."""
+        if self._content is None:
+            self._content = self.read()
+        return self._content
+
+    def text(self, encoding: str = 'utf-8') -> str:
+        return self.content.decode(encoding, errors='replace')
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise HttpError(f"HTTP {self.status} {self.reason} for {self.url}", self.status, self.url)
+
+    def close(self):
+        response, self._response = self._response, None
+        if response is None:
+            return
+        if not response.isclosed() and response.length is not None and response.length <= DRAIN_LIMIT:
+            try:
+                response.read()
+            except (OSError, http.client.HTTPException):
+                pass
+        reusable = response.isclosed() and not response.will_close
+        if reusable:
+            self._client._release(self._key, self._conn)
+        else:
+            response.close()
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class HttpClient:
+    """Thread-safe HTTP client with a keep-alive connection pool."""
+
+    def __init__(self, user_agent: str = USER_AGENT, timeout: float = DEFAULT_TIMEOUT,
+                 retries: int = DEFAULT_RETRIES, max_idle_per_host: int = MAX_IDLE_PER_HOST,
+                 cache: Optional[HttpCache] = None):
+        self.user_agent = user_agent
+        self.cache = cache  # For get(); the shared cache if None
+        self.timeout = timeout
+        self.retries = retries
+        self.max_idle_per_host = max_idle_per_host
+        self._idle: dict[tuple, list[tuple[http.client.HTTPConnection, float]]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self._ssl_context = ssl.create_default_context()
+        self._proxies = urllib.request.getproxies()
+        self.stats = {'requests': 0, 'connections': 0, 'reused': 0, 'retries': 0}
+
+    def _count(self, name: str):
+        # Callers hold self._lock
+        self.stats[name] += 1
+
+    # ==================== Connection pool ====================
+
+    def _proxy_for(self, scheme: str, host: str) -> Optional[tuple[str, int]]:
+        proxy = self._proxies.get(scheme)
+        if not proxy or urllib.request.proxy_bypass(host):
+            return None
+        parsed = urllib.parse.urlsplit(proxy if '://' in proxy else f'http://{proxy}')
+        return parsed.hostname, parsed.port or 8080
+
+    def _acquire(self, key: tuple, timeout: float) -> tuple[http.client.HTTPConnection, bool]:
+        """An idle pooled connection for key, or a new one; (conn, reused)."""
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                conn, since = idle.pop()
+                if now - since < IDLE_TIMEOUT and conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                    self._count('reused')
+                    return conn, True
+                conn.close()
+            self._count('connections')
+
+        scheme, host, port, proxy = key
+        if proxy:
+            conn_cls = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+            kwargs = {'context': self._ssl_context} if scheme == 'https' else {}
+            conn = conn_cls(proxy[0], proxy[1], timeout=timeout, **kwargs)
+            if scheme == 'https':
+                conn.set_tunnel(host, port)
+        elif scheme == 'https':
+            conn = http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        return conn, False
+
+    def _release(self, key: tuple, conn: http.client.HTTPConnection):
+        with self._lock:
+            idle = self._idle[key]
+            if len(idle) < self.max_idle_per_host:
+                idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def close(self):
+        """Close every pooled connection."""
+        with self._lock:
+            for idle in self._idle.values():
+                for conn, _since in idle:
+                    conn.close()
+            self._idle.clear()
+
+    # ==================== Requests ====================
+
+    def _send_once(self, method: str, url: str, headers: dict, body: Optional[bytes],
+                   timeout: float) -> HttpResponse:
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise HttpError(f"Unsupported URL: {url}", url=url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        proxy = self._proxy_for(parts.scheme, parts.hostname)
+        key = (parts.scheme, parts.hostname, port, proxy)
+
+        # Plain HTTP through a proxy sends the absolute URL
+        target = url if proxy and parts.scheme == 'http' else (
+            urllib.parse.urlunsplit(('', '', parts.path or '/', parts.query, '')))
+        headers = {'Host': parts.netloc.rsplit('@', 1)[-1], **headers}
+
+        while True:
+            conn, reused = self._acquire(key, timeout)
+            try:
+                conn.request(method, target, body=body, headers=headers)
+                response = conn.getresponse()
+            except _STALE_CONNECTION_ERRORS:
+                conn.close()
+                if reused:
+                    continue  # The server dropped an idle connection; use a new one
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            return HttpResponse(self, key, conn, response, url)
+
+    def open(self, url: str, method: str = 'GET', headers: Optional[dict] = None,
+             body: Optional[bytes] = None, timeout: Optional[float] = None,
+             retries: Optional[int] = None, params: Optional[dict] = None) -> HttpResponse:
+        """
+        Send a request and return the response unread.
+
+        Follows redirects and retries idempotent requests on connection
+        errors and 429/5xx. Error statuses are returned, not raised (see
+        HttpResponse.raise_for_status). Use as a context manager.
+
+        Raises:
+            HttpError: No response could be obtained
+        """
+        url = _with_params(url, params)
+        timeout = self.timeout if timeout is None else timeout
+        retries = self.retries if retries is None else retries
+        if method.upper() not in IDEMPOTENT_METHODS:
+            retries = 0
+        send_headers = {
+            'User-Agent': self.user_agent,
+            'Accept-Encoding': 'gzip',
+            'Connection': 'keep-alive',
+        }
+        send_headers.update(headers or {})
+
+        attempt = 0
+        redirects = 0
+        while True:
+            with self._lock:
+                self._count('requests')
+            try:
+                response = self._send_once(method, url, send_headers, body, timeout)
+            except (OSError, http.client.HTTPException) as e:
+                if attempt >= retries:
+                    raise HttpError(f"Request to {url} failed: {e}", url=url) from e
+                error, retry_after = e, None
+            else:
+                location = response.headers.get('Location')
+                if response.status in REDIRECT_STATUSES and location and redirects < MAX_REDIRECTS:
+                    response.read()
+                    redirects += 1
+                    url = urllib.parse.urljoin(url, location)
+                    if response.status == 303:
+                        method, body = 'GET', None
+                    continue
+                if response.status not in RETRY_STATUSES or attempt >= retries:
+                    return response
+                error = f"HTTP {response.status}"
+                retry_after = response.headers.get('Retry-After')
+                response.read()
+
+            delay = min(MAX_BACKOFF, BACKOFF * (2 ** attempt)) * random.uniform(0.5, 1.0)
+            if retry_after and retry_after.isdigit():
+                delay = min(MAX_BACKOFF, float(retry_after))
+            attempt += 1
+            with self._lock:
+                self._count('retries')
+            log.debug(f"Retrying {url} in {delay:.1f}s ({error})")
+            time.sleep(delay)
+
+    def request(self, url: str, method: str = 'GET', **kwargs) -> HttpResponse:
+        """Like open(), with the body already read and the connection released."""
+        response = self.open(url, method, **kwargs)
+        response.content  # Reads the body and releases the connection
+        return response
+
+    def get(self, url: str, params: Optional[dict] = None, headers: Optional[dict] = None,
+            max_age: Optional[float] = None, **kwargs) -> HttpResponse:
+        """
+        GET through the HTTP cache.
+
+        A cached copy that is fresh (per the server's Cache-Control or
+        Expires, or younger than `max_age` seconds) is returned without a
+        request. A stale one is revalidated with its ETag/Last-Modified,
+        and returned as is if the server can't be reached or answers with
+        a 5xx. Successful responses are stored. `from_cache` tells whether
+        the body came from the cache.
+        """
+        cache = self.cache or get_http_cache()
+        url = _with_params(url, params)
+        entry = cache.lookup(url)
+        body = cache.body(url) if entry else None
+        if body is None:
+            entry = None
+        elif entry.is_fresh(max_age):
+            cache.record('hits', entry.size)
+            return HttpResponse.from_entry(entry, body)
+
+        send_headers = dict(headers or {})
+        if entry:
+            send_headers.update(entry.validators())
+        started = time.monotonic()
+        try:
+            response = self.request(url, headers=send_headers, **kwargs)
+        except HttpError as e:
+            if entry is None:
+                raise
+            log.debug(f"Using stale cached {url}: {e}")
+            cache.record('stale', entry.size)
+            return HttpResponse.from_entry(entry, body)
+
+        if entry and response.status == 304:
+            entry = cache.refresh(url, response.headers) or entry
+            cache.record('revalidated', entry.size)
+            return HttpResponse.from_entry(entry, body)
+        if entry and response.status >= 500:
+            cache.record('stale', entry.size)
+            return HttpResponse.from_entry(entry, body)
+        if response.status == 200:
+            cache.store(url, response.content, response.headers, url=url)
+            cache.record('misses', len(response.content), time.monotonic() - started)
+        return response
+
+    def get_json(self, url: str, params: Optional[dict] = None, cached: bool = False,
+                 max_age: Optional[float] = None, **kwargs) -> Any:
+        """
+        GET a JSON document, through the HTTP cache if `cached` (see get()).
+
+        Raises:
+            HttpError: Request failed or error status
+            ValueError: Body is not JSON
+        """
+        headers = {'Accept': 'application/json', **kwargs.pop('headers', {})}
+        if cached:
+            response = self.get(url, params=params, headers=headers, max_age=max_age, **kwargs)
+        else:
+            response = self.request(url, params=params, headers=headers, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+
+def _with_params(url: str, params: Optional[dict]) -> str:
+    if not params:
+        return url
+    return url + ('&' if '?' in url else '?') + urllib.parse.urlencode(params)
+
+
+# Singleton instance
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Get the shared HTTP client."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def benchmark(requests: int = 50, connect_delay: float = 0.02) -> dict:
+    """
+    Time `requests` sequential GETs against a local keep-alive server:
+    a new urllib connection per request vs. the pooled client.
+
+    The server waits `connect_delay` on every new connection, standing in
+    for the TCP + TLS handshake round trips to a real API host.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    body = json.dumps({'temperature': 21.5, 'items': list(range(50))}).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True  # Headers and body go out as separate writes
+
+        def setup(self):
+            time.sleep(connect_delay)
+            super().setup()
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_port}/forecast'
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+    try:
+        t0 = time.perf_counter()
+        for _ in range(requests):
+            with opener.open(url, timeout=DEFAULT_TIMEOUT) as response:
+                json.loads(response.read())
+        urllib_seconds = time.perf_counter() - t0
+
+        client = HttpClient()
+        client._proxies = {}
+        t0 = time.perf_counter()
+        for _ in range(requests):
+            client.get_json(url)
+        pooled_seconds = time.perf_counter() - t0
+        client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    return {
+        'requests': requests,
+        'urllib_seconds': urllib_seconds,
+        'pooled_seconds': pooled_seconds,
+        'connections': client.stats['connections'],
+    }
+
+
+if __name__ == '__main__':
+    r = benchmark()
+    print(f"{r['requests']} requests")
+    print(f"  new connection each: {r['urllib_seconds']:.3f}s")
+    print(f"  pooled keep-alive:   {r['pooled_seconds']:.3f}s ({r['connections']} connection(s))")
@@ -0,0 +1,250 @@
+"""
+Tux Assistant - Installed Package Snapshot
+
+The process-wide package-state service: answers "is this installed?"
+from in-memory sets instead of running `pacman -Q` / `rpm -q` /
+`dpkg -s` / `flatpak info` once per package, in every module.
+
+Each backend's (native, Flatpak, AUR) whole installed set is read with
+one command the first time it is needed, then cached until the package
+database changes. Changes are noticed by GFileMonitor (inotify) watches
+once watch() has been called from the main loop; otherwise by comparing
+the database files' mtimes on each lookup. Installs done through Tux
+Assistant also invalidate the sets directly.
+
+Copyright (c) 2025 Christopher Dorrell. Licensed under GPL-3.0.
+"""
+
+import os
+import threading
+import time
+from typing import Iterable, Optional
+
+from . import distro
+from . import commands
+from .logger import get_logger
+
+log = get_logger('tux.installed')
+
+
+# Backend names
+NATIVE = 'native'
+FLATPAK = 'flatpak'
+AUR = 'aur'             # Foreign packages on Arch (AUR or locally built)
+
+# One command lists every installed package name for each distro family
+_NATIVE_LIST_COMMANDS = {
+    distro.DistroFamily.ARCH: ['pacman', '-Qq'],
+    distro.DistroFamily.DEBIAN: ['dpkg-query', '-W', '-f', '${db:Status-Abbrev}\t${Package}\n'],
+    distro.DistroFamily.FEDORA: ['rpm', '-qa', '--qf', '%{NAME}\n'],
+    distro.DistroFamily.RHEL: ['rpm', '-qa', '--qf', '%{NAME}\n'],
+    distro.DistroFamily.OPENSUSE: ['rpm', '-qa', '--qf', '%{NAME}\n'],
+}
+
+_FLATPAK_LIST_COMMAND = ['flatpak', 'list', '--columns=application']
+_AUR_LIST_COMMAND = ['pacman', '-Qmq']
+
+_RPM_DATABASES = ['/usr/lib/sysimage/rpm/rpmdb.sqlite', '/var/lib/rpm/rpmdb.sqlite',
+                  '/var/lib/rpm/Packages']
+
+# Files and directories that change whenever a backend's installed set does
+_NATIVE_DATABASES = {
+    distro.DistroFamily.ARCH: ['/var/lib/pacman/local'],
+    distro.DistroFamily.DEBIAN: ['/var/lib/dpkg/status'],
+    distro.DistroFamily.FEDORA: _RPM_DATABASES,
+    distro.DistroFamily.RHEL: _RPM_DATABASES,
+    distro.DistroFamily.OPENSUSE: _RPM_DATABASES,
+}
+
+_FLATPAK_DATABASES = ['/var/lib/flatpak/app', '/var/lib/flatpak/runtime',
+                      '~/.local/share/flatpak/app', '~/.local/share/flatpak/runtime']
+
+
+def _parse_names(output: str) -> set:
+    return {line.strip() for line in output.splitlines() if line.strip()}
+
+
+def _parse_dpkg_query(output: str) -> set:
+    """Names from dpkg-query whose state is installed ("ii", "hi", ...)."""
+    names = set()
+    for line in output.splitlines():
+        status, _, name = line.partition('\t')
+        # Second letter is the current state; "i" = installed (not just
+        # config files left behind by a removal)
+        if len(status) >= 2 and status[1] == 'i' and name:
+            names.add(name.strip())
+    return names
+
+
+class InstalledSnapshot:
+    """Cached installed-package sets with O(1) membership checks."""
+
+    def __init__(self, family: Optional[distro.DistroFamily] = None, max_age: float = 300.0):
+        """
+        Args:
+            family: Distro family (detected if not given)
+            max_age: Seconds before a snapshot is re-read anyway, for
+                backends without a database to watch
+        """
+        self.family = family or distro.get_family()
+        self.max_age = max_age
+        self._sets: dict[str, frozenset] = {}
+        self._loaded_at: dict[str, float] = {}
+        self._stamps: dict[str, list] = {}
+        # Backends a file monitor saw change; plain set operations, so
+        # the main loop can mark them without waiting on a slow read
+        self._changed: set[str] = set()
+        self._monitors: dict[str, list] = {}
+        # One lock per backend: a slow `flatpak list` doesn't block native checks
+        self._locks = {NATIVE: threading.Lock(), FLATPAK: threading.Lock(), AUR: threading.Lock()}
+
+    # ==================== Change tracking ====================
+
+    def _databases(self, backend: str) -> list[str]:
+        if backend == FLATPAK:
+            return [os.path.expanduser(p) for p in _FLATPAK_DATABASES]
+        if self.family != distro.DistroFamily.ARCH and backend == AUR:
+            return []
+        return _NATIVE_DATABASES.get(self.family, [])
+
+    def _stamp(self, backend: str) -> list:
+        """[path, mtime_ns] of each existing database path of a backend."""
+        stamp = []
+        for path in self._databases(backend):
+            try:
+                stamp.append([path, os.stat(path).st_mtime_ns])
+            except OSError:
+                continue
+        return stamp
+
+    def _fresh(self, backend: str) -> bool:
+        # Callers hold the backend lock
+        if backend not in self._sets or backend in self._changed:
+            return False
+        if backend in self._monitors:
+            return True
+        stamp = self._stamps.get(backend)
+        if stamp:
+            return self._stamp(backend) == stamp
+        return time.monotonic() - self._loaded_at[backend] < self.max_age
+
+    def watch(self) -> bool:
+        """
+        Watch the package databases with GFileMonitor. Call from the GTK
+        main thread; change notifications arrive through its main loop.
+
+        Returns:
+            True if at least one backend is being watched
+        """
+        try:
+            import gi
+            gi.require_version('Gio', '2.0')
+            from gi.repository import Gio
+        except (ImportError, ValueError):
+            return False
+
+        for backend in self._locks:
+            if backend in self._monitors:
+                continue
+            monitors = []
+            for path in self._databases(backend):
+                if not os.path.exists(path):
+                    continue
+                try:
+                    monitor = Gio.File.new_for_path(path).monitor(Gio.FileMonitorFlags.NONE, None)
+                except Exception as e:
+                    log.debug(f"Cannot watch {path}: {e}")
+                    continue
+                monitor.connect('changed', lambda *args, b=backend: self._changed.add(b))
+                monitors.append(monitor)
+            if monitors:
+                self._monitors[backend] = monitors
+                self._changed.add(backend)  # Changes before the watch started
+        return bool(self._monitors)
+
+    # ==================== Loading ====================
+
+    def _read(self, backend: str) -> frozenset:
+        """Run the list command for a backend (no caching)."""
+        if backend == FLATPAK:
+            cmd = _FLATPAK_LIST_COMMAND
+        elif backend == AUR:
+            if self.family != distro.DistroFamily.ARCH:
+                return frozenset()
+            cmd = _AUR_LIST_COMMAND
+        else:
+            cmd = _NATIVE_LIST_COMMANDS.get(self.family)
+            if cmd is None:
+                return frozenset()
+
+        result = commands.run(cmd, timeout=30)
+        if not result.success:
+            # `pacman -Qm` exits 1 when there are no foreign packages
+            if not result.stderr.startswith('Command not found') and backend != AUR:
+                log.warning(f"Listing installed packages failed ({cmd[0]}): {result.stderr.strip()}")
+            return frozenset()
+
+        if cmd[0] == 'dpkg-query':
+            return frozenset(_parse_dpkg_query(result.stdout))
+        return frozenset(_parse_names(result.stdout))
+
+    def get(self, backend: str = NATIVE) -> frozenset:
+        """The installed set for a backend, loading it if needed."""
+        with self._locks[backend]:
+            if self._fresh(backend):
+                return self._sets[backend]
+            # Cleared before reading: a change during the read marks it again
+            self._changed.discard(backend)
+            stamp = self._stamp(backend)
+            # Held while reading, so concurrent callers share one command
+            names = self._read(backend)
+            self._sets[backend] = names
+            self._loaded_at[backend] = time.monotonic()
+            self._stamps[backend] = stamp
+            log.debug(f"Loaded {len(names)} installed {backend} packages")
+            return names
+
+    def invalidate(self, backend: Optional[str] = None):
+        """Forget cached sets (all backends by default), e.g. after installs."""
+        for name in ([backend] if backend else list(self._locks)):
+            self._changed.add(name)
+            if name == NATIVE and self.family == distro.DistroFamily.ARCH:
+                self._changed.add(AUR)  # Same database
+
+    # ==================== Queries ====================
+
+    def is_installed(self, package: str) -> bool:
+        """Check if a native package is installed."""
+        return package in self.get(NATIVE)
+
+    def is_flatpak_installed(self, app_id: str) -> bool:
+        """Check if a Flatpak app (or runtime) is installed."""
+        return app_id in self.get(FLATPAK)
+
+    def is_aur_installed(self, package: str) -> bool:
+        """Check if a package from the AUR (any foreign package) is installed."""
+        return package in self.get(AUR)
+
+    def installed_of(self, packages: Iterable[str], backend: str = NATIVE) -> set:
+        """The subset of `packages` that is installed."""
+        names = self.get(backend)
+        return {p for p in packages if p in names}
+
+    def states(self, packages: Iterable[str], backend: str = NATIVE) -> dict[str, bool]:
+        """{package: installed} for each of `packages`, from one snapshot."""
+        names = self.get(backend)
+        return {p: p in names for p in packages}
+
+
+# Singleton instance
+_snapshot: Optional[InstalledSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def get_installed_snapshot() -> InstalledSnapshot:
+    """Get the shared installed-package snapshot."""
+    global _snapshot
+    with _snapshot_lock:
+        if _snapshot is None:
+            _snapshot = InstalledSnapshot()
+        return _snapshot
@@ -0,0 +1,188 @@
+"""
+Tux Assistant - Network Discovery Cache
+
+Remembers hosts found by network scans (MAC, hostname, open ports,
+shares, when they were last seen) so a scan page can show known devices
+immediately and a rescan only has to probe hosts that are new, changed
+or stale.
+
+Stored as JSON under ~/.cache/tux-assistant, one section per network.
+
+Copyright (c) 2025 Christopher Dorrell. Licensed under GPL-3.0.
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Iterable, Optional
+
+from .logger import get_logger
+
+log = get_logger('tux.netcache')
+
+
+CACHE_VERSION = 1
+
+# Re-probe a known host once its last probe is older than this
+STALE_AFTER = 60 * 60
+# Forget hosts not seen for this long
+EXPIRE_AFTER = 30 * 24 * 60 * 60
+
+
+def _default_path() -> str:
+    cache = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(cache, 'tux-assistant', 'network-hosts.json')
+
+
+@dataclass
+class HostRecord:
+    """What we know about one host on one network."""
+    ip: str
+    hostname: str = ""
+    mac: str = ""
+    ports: list[int] = field(default_factory=list)
+    shares: list[str] = field(default_factory=list)
+    first_seen: float = 0.0
+    last_seen: float = 0.0    # Last time it answered a probe
+    last_probed: float = 0.0  # Last time we probed it (answered or not)
+
+    def is_stale(self, now: Optional[float] = None, max_age: float = STALE_AFTER) -> bool:
+        now = time.time() if now is None else now
+        return now - self.last_probed >= max_age
+
+
+class DiscoveryCache:
+    """Per-network host records persisted to a JSON file."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or _default_path()
+        self._networks: dict[str, dict[str, HostRecord]] = {}
+        # network -> {sweep kind ("quick", "full"): time of the last sweep}
+        self._sweeps: dict[str, dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            log.warning(f"Ignoring unreadable discovery cache {self.path}: {e}")
+            return
+        if data.get('version') != CACHE_VERSION:
+            return
+
+        cutoff = time.time() - EXPIRE_AFTER
+        known = set(HostRecord.__dataclass_fields__)
+        for network, section in data.get('networks', {}).items():
+            hosts = {}
+            for ip, record in section.get('hosts', {}).items():
+                try:
+                    host = HostRecord(**{k: v for k, v in record.items() if k in known})
+                except TypeError:
+                    continue
+                if host.last_seen >= cutoff:
+                    hosts[ip] = host
+            self._networks[network] = hosts
+            sweeps = section.get('last_sweeps')
+            if sweeps is None:
+                # Older caches didn't say which kind of sweep it was; the
+                # narrower one is the safe assumption
+                sweeps = {'quick': section.get('last_full_scan', 0.0)}
+            self._sweeps[network] = dict(sweeps)
+
+    def save(self):
+        """Write the cache atomically."""
+        with self._lock:
+            data = {
+                'version': CACHE_VERSION,
+                'networks': {
+                    network: {
+                        'last_sweeps': self._sweeps.get(network, {}),
+                        'hosts': {ip: asdict(h) for ip, h in hosts.items()},
+                    }
+                    for network, hosts in self._networks.items()
+                },
+            }
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            log.warning(f"Could not save discovery cache: {e}")
+
+    # ==================== Queries ====================
+
+    def hosts(self, networks: Iterable[str]) -> list[HostRecord]:
+        """Known hosts on the given networks (copies)."""
+        with self._lock:
+            return [HostRecord(**asdict(h))
+                    for network in networks
+                    for h in self._networks.get(network, {}).values()]
+
+    def last_sweep(self, networks: Iterable[str], kinds: Iterable[str]) -> float:
+        """
+        Oldest sweep time among the networks, counting a sweep of any of
+        `kinds` (0 if any network never had one).
+        """
+        kinds = list(kinds)
+        with self._lock:
+            return min((max((self._sweeps.get(n, {}).get(k, 0.0) for k in kinds), default=0.0)
+                        for n in networks), default=0.0)
+
+    def stale_or_changed(self, networks: Iterable[str], arp: dict[str, str],
+                         now: Optional[float] = None) -> list[str]:
+        """Known IPs to re-probe: stale records, or a different MAC in the ARP table."""
+        now = time.time() if now is None else now
+        result = []
+        for host in self.hosts(networks):
+            mac = arp.get(host.ip)
+            if host.is_stale(now) or (mac and host.mac and mac != host.mac):
+                result.append(host.ip)
+        return result
+
+    def unknown(self, networks: Iterable[str], ips: Iterable[str]) -> list[str]:
+        """The subset of `ips` not yet recorded on any of the networks."""
+        with self._lock:
+            known = set()
+            for network in networks:
+                known.update(self._networks.get(network, {}))
+        return [ip for ip in ips if ip not in known]
+
+    # ==================== Updates ====================
+
+    def update(self, network: str, host: HostRecord):
+        """Record a host that answered a probe."""
+        now = time.time()
+        with self._lock:
+            hosts = self._networks.setdefault(network, {})
+            old = hosts.get(host.ip)
+            host.first_seen = old.first_seen if old and old.first_seen else now
+            host.last_seen = host.last_probed = now
+            if old:
+                # Keep what this probe didn't find out
+                host.hostname = host.hostname if host.hostname and host.hostname != host.ip else old.hostname
+                host.mac = host.mac or old.mac
+                host.ports = sorted(set(host.ports) | set(old.ports))
+            hosts[host.ip] = host
+
+    def mark_missing(self, network: str, ips: Iterable[str]):
+        """Hosts that were probed but did not answer."""
+        now = time.time()
+        with self._lock:
+            hosts = self._networks.get(network, {})
+            for ip in ips:
+                if ip in hosts:
+                    hosts[ip].last_probed = now
+
+    def mark_sweep(self, network: str, kind: str):
+        """A sweep of the given kind ("quick", "full") of a whole network finished."""
+        with self._lock:
+            self._sweeps.setdefault(network, {})[kind] = time.time()
+            self._networks.setdefault(network, {})
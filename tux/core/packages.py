@@ -14,6 +14,7 @@ from pathlib import Path
 
 from . import distro
 from . import commands
+from .installed import NATIVE, get_installed_snapshot
 
 
 @dataclass
@@ -74,23 +75,7 @@ class PackageManager:
     
     def is_installed(self, package: str) -> bool:
         """Check if a package is installed."""
-        if self.family == distro.DistroFamily.ARCH:
-            result = commands.run(['pacman', '-Q', package], capture_output=True)
-            return result.success
-        
-        elif self.family == distro.DistroFamily.DEBIAN:
-            result = commands.run(['dpkg', '-s', package], capture_output=True)
-            return result.success
-        
-        elif self.family in (distro.DistroFamily.FEDORA, distro.DistroFamily.RHEL):
-            result = commands.run(['rpm', '-q', package], capture_output=True)
-            return result.success
-        
-        elif self.family == distro.DistroFamily.OPENSUSE:
-            result = commands.run(['rpm', '-q', package], capture_output=True)
-            return result.success
-        
-        return False
+        return get_installed_snapshot().is_installed(package)
     
     def search(self, query: str) -> list[tuple[str, str]]:
         """
@@ -204,6 +189,7 @@ class PackageManager:
         # Determine which packages succeeded/failed
         installed = []
         failed = []
+        get_installed_snapshot().invalidate(NATIVE)
         
         for pkg in packages:
             if self.is_installed(pkg):
@@ -284,6 +270,7 @@ class PackageManager:
         # Check results
         installed = []
         failed = []
+        get_installed_snapshot().invalidate(NATIVE)
         
         for pkg in packages:
             if self.is_installed(pkg):
@@ -367,9 +354,11 @@ class PackageManager:
                 on_complete=on_complete
             )
             thread.join()
-            return result_holder[0]
+            result = result_holder[0]
         else:
-            return commands.run(cmd, timeout=1800)  # 30 minutes
+            result = commands.run(cmd, timeout=1800)  # 30 minutes
+        get_installed_snapshot().invalidate(NATIVE)
+        return result
 
 
 # Singleton instance
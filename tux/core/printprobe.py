@@ -0,0 +1,850 @@
+"""
+Tux Assistant - Printer Probing (SNMP and IPP)
+
+Asks printers what they are without running `snmpget` or any other tool
+once per device:
+
+    SNMP    v1/v2c GetRequest for the Host Resources and Printer MIB
+            objects, all in one packet per printer. Every request goes
+            out through one shared UDP socket and replies are matched by
+            request-id, so hundreds of printers can be asked at once.
+    IPP     A minimal Get-Printer-Attributes request over HTTP (port 631)
+            asking only for make/model, state and device ID.
+
+Both run on an asyncio event loop inside the caller's worker thread, like
+core.netscan. ``FakePrinterResponder`` answers both protocols on loopback
+addresses and is used by ``benchmark()``.
+
+Copyright (c) 2025 Christopher Dorrell. Licensed under GPL-3.0.
+"""
+
+import asyncio
+import random
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Optional
+
+from .logger import get_logger
+
+log = get_logger('tux.printprobe')
+
+
+SNMP_PORT = 161
+IPP_PORT = 631
+DEFAULT_TIMEOUT = 2.0
+DEFAULT_CONCURRENCY = 64
+
+# SNMP versions as they appear on the wire
+SNMP_V1 = 0
+SNMP_V2C = 1
+
+# Objects asked for in one GetRequest
+OID_SYS_DESCR = '1.3.6.1.2.1.1.1.0'
+OID_DEVICE_DESCR = '1.3.6.1.2.1.25.3.2.1.3.1'           # hrDeviceDescr.1
+OID_DEVICE_STATUS = '1.3.6.1.2.1.25.3.2.1.5.1'          # hrDeviceStatus.1
+OID_PRINTER_STATUS = '1.3.6.1.2.1.25.3.5.1.1.1'         # hrPrinterStatus.1
+OID_SERIAL = '1.3.6.1.2.1.43.5.1.1.17.1'                # prtGeneralSerialNumber.1
+OID_DEVICE_ID = '1.3.6.1.4.1.2699.1.2.1.2.1.1.3.1'      # ppmPrinterIEEE1284DeviceId.1
+
+PRINTER_OIDS = (OID_DEVICE_DESCR, OID_DEVICE_ID, OID_PRINTER_STATUS,
+                OID_DEVICE_STATUS, OID_SERIAL, OID_SYS_DESCR)
+
+IPP_ATTRIBUTES = ('printer-make-and-model', 'printer-device-id', 'printer-state',
+                  'printer-state-reasons', 'printer-info')
+
+# hrPrinterStatus / hrDeviceStatus / IPP printer-state -> our state names
+_HR_PRINTER_STATES = {1: 'other', 2: 'unknown', 3: 'idle', 4: 'printing', 5: 'warming up'}
+_HR_DEVICE_DOWN = 5
+_IPP_PRINTER_STATES = {3: 'idle', 4: 'printing', 5: 'stopped'}
+
+
+@dataclass
+class PrinterDetails:
+    """What a printer said about itself."""
+    address: str
+    make_and_model: str = ""
+    device_id: str = ""          # IEEE 1284 device ID ("MFG:HP;MDL:...;")
+    state: str = ""              # "idle", "printing", "warming up", "stopped", "down", ...
+    state_reasons: list[str] = field(default_factory=list)
+    serial: str = ""
+    sources: list[str] = field(default_factory=list)  # "snmp", "ipp"
+
+
+# =============================================================================
+# BER encoding (just enough for SNMP GetRequest/Response)
+# =============================================================================
+
+_INTEGER = 0x02
+_OCTET_STRING = 0x04
+_NULL = 0x05
+_OID = 0x06
+_SEQUENCE = 0x30
+_GET_REQUEST = 0xA0
+_GET_RESPONSE = 0xA2
+# Application types decoded as plain integers
+_UNSIGNED_TYPES = {0x41, 0x42, 0x43, 0x46}   # Counter32, Gauge32, TimeTicks, Counter64
+_IP_ADDRESS = 0x40
+# v2c per-varbind exceptions: noSuchObject, noSuchInstance, endOfMibView
+_EXCEPTIONS = {0x80, 0x81, 0x82}
+
+# v1 error-status for a missing object
+_NO_SUCH_NAME = 2
+
+
+def _ber_length(n: int) -> bytes:
+    if n < 0x80:
+        return bytes([n])
+    body = n.to_bytes((n.bit_length() + 7) // 8, 'big')
+    return bytes([0x80 | len(body)]) + body
+
+
+def _tlv(tag: int, value: bytes) -> bytes:
+    return bytes([tag]) + _ber_length(len(value)) + value
+
+
+def _ber_int(n: int) -> bytes:
+    return _tlv(_INTEGER, n.to_bytes(max(1, (n.bit_length() + 8) // 8), 'big', signed=True))
+
+
+def _ber_oid(oid: str) -> bytes:
+    parts = [int(p) for p in oid.split('.')]
+    body = bytearray([parts[0] * 40 + parts[1]])
+    for part in parts[2:]:
+        chunk = [part & 0x7F]
+        part >>= 7
+        while part:
+            chunk.append(0x80 | (part & 0x7F))
+            part >>= 7
+        body.extend(reversed(chunk))
+    return _tlv(_OID, bytes(body))
+
+
+def _ber_value(value: Any) -> bytes:
+    if value is None:
+        return _tlv(_NULL, b'')
+    if isinstance(value, int):
+        return _ber_int(value)
+    if isinstance(value, str):
+        value = value.encode()
+    return _tlv(_OCTET_STRING, value)
+
+
+def _read_tlv(data: bytes, pos: int) -> tuple[int, bytes, int]:
+    """(tag, value, next position) of the element at pos."""
+    if pos + 2 > len(data):
+        raise ValueError("truncated BER element")
+    tag = data[pos]
+    length = data[pos + 1]
+    pos += 2
+    if length & 0x80:
+        size = length & 0x7F
+        if not 0 < size <= 4:
+            raise ValueError("bad BER length")
+        length = int.from_bytes(data[pos:pos + size], 'big')
+        pos += size
+    if pos + length > len(data):
+        raise ValueError("truncated BER element")
+    return tag, data[pos:pos + length], pos + length
+
+
+def _read_sequence(data: bytes) -> list[tuple[int, bytes]]:
+    items = []
+    pos = 0
+    while pos < len(data):
+        tag, value, pos = _read_tlv(data, pos)
+        items.append((tag, value))
+    return items
+
+
+def _decode_oid(data: bytes) -> str:
+    if not data:
+        raise ValueError("empty OID")
+    parts = [data[0] // 40, data[0] % 40]
+    n = 0
+    for byte in data[1:]:
+        n = (n << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            parts.append(n)
+            n = 0
+    return '.'.join(map(str, parts))
+
+
+def _decode_value(tag: int, data: bytes) -> Any:
+    """Python value of a varbind; None for NULL and v2c exceptions."""
+    if tag == _INTEGER:
+        return int.from_bytes(data, 'big', signed=True)
+    if tag in _UNSIGNED_TYPES:
+        return int.from_bytes(data, 'big')
+    if tag == _OCTET_STRING:
+        return data.decode('utf-8', errors='replace').strip('\x00').strip()
+    if tag == _OID:
+        return _decode_oid(data)
+    if tag == _IP_ADDRESS:
+        return '.'.join(map(str, data))
+    return None
+
+
+def encode_snmp_get(request_id: int, oids: Iterable[str], community: str = 'public',
+                    version: int = SNMP_V2C) -> bytes:
+    """An SNMP GetRequest message for several objects."""
+    varbinds = b''.join(_tlv(_SEQUENCE, _ber_oid(oid) + _ber_value(None)) for oid in oids)
+    pdu = _tlv(_GET_REQUEST, _ber_int(request_id) + _ber_int(0) + _ber_int(0)
+               + _tlv(_SEQUENCE, varbinds))
+    return _tlv(_SEQUENCE, _ber_int(version) + _ber_value(community) + pdu)
+
+
+def decode_snmp_message(data: bytes) -> tuple[int, str, int, int, int, int, list[tuple[str, Any]]]:
+    """
+    Parse an SNMP message.
+
+    Returns:
+        (version, community, pdu tag, request-id, error-status,
+        error-index, [(oid, value), ...])
+
+    Raises:
+        ValueError: The packet isn't an SNMP v1/v2c message
+    """
+    tag, message, _ = _read_tlv(data, 0)
+    if tag != _SEQUENCE:
+        raise ValueError("not an SNMP message")
+    items = _read_sequence(message)
+    if len(items) != 3 or items[0][0] != _INTEGER or items[1][0] != _OCTET_STRING:
+        raise ValueError("not an SNMP v1/v2c message")
+    version = _decode_value(*items[0])
+    community = items[1][1].decode('latin-1')
+    pdu_tag, pdu = items[2]
+    fields = _read_sequence(pdu)
+    if len(fields) != 4:
+        raise ValueError("malformed SNMP PDU")
+    request_id, error_status, error_index = (_decode_value(*f) for f in fields[:3])
+    varbinds = []
+    for vb_tag, vb in _read_sequence(fields[3][1]):
+        pair = _read_sequence(vb)
+        if vb_tag != _SEQUENCE or len(pair) != 2 or pair[0][0] != _OID:
+            raise ValueError("malformed varbind")
+        varbinds.append((_decode_oid(pair[0][1]), _decode_value(*pair[1])))
+    return version, community, pdu_tag, request_id, error_status, error_index, varbinds
+
+
+def _encode_snmp_response(version: int, community: str, request_id: int,
+                          varbinds: list[tuple[str, Any]], error_status: int = 0,
+                          error_index: int = 0) -> bytes:
+    """A GetResponse; a value of ... encodes as v2c noSuchObject."""
+    body = b''
+    for oid, value in varbinds:
+        encoded = _tlv(0x80, b'') if value is ... else _ber_value(value)
+        body += _tlv(_SEQUENCE, _ber_oid(oid) + encoded)
+    pdu = _tlv(_GET_RESPONSE, _ber_int(request_id) + _ber_int(error_status)
+               + _ber_int(error_index) + _tlv(_SEQUENCE, body))
+    return _tlv(_SEQUENCE, _ber_int(version) + _ber_value(community) + pdu)
+
+
+# =============================================================================
+# SNMP client
+# =============================================================================
+
+class _SnmpProtocol(asyncio.DatagramProtocol):
+    """Routes responses on the shared socket to the waiting request."""
+
+    def __init__(self):
+        self.pending: dict[int, tuple[str, asyncio.Future]] = {}
+
+    def datagram_received(self, data, addr):
+        try:
+            _v, _c, tag, request_id, error_status, error_index, varbinds = decode_snmp_message(data)
+        except ValueError:
+            return
+        entry = self.pending.get(request_id)
+        if tag != _GET_RESPONSE or entry is None:
+            return
+        host, future = entry
+        if addr[0] == host and not future.done():
+            future.set_result((error_status, error_index, varbinds))
+
+    def error_received(self, exc):
+        # ICMP errors aren't tied to a request; the request just times out
+        log.debug(f"SNMP socket error: {exc}")
+
+
+class SnmpClient:
+    """
+    SNMP GET for many hosts over one UDP socket.
+
+    Use as ``async with SnmpClient() as snmp: await snmp.get(ip, oids)``.
+    """
+
+    def __init__(self, community: str = 'public', port: int = SNMP_PORT,
+                 timeout: float = DEFAULT_TIMEOUT, retries: int = 1):
+        self.community = community
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self._transport = None
+        self._protocol: Optional[_SnmpProtocol] = None
+        self._next_id = random.randrange(1, 1 << 30)
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        self._transport, self._protocol = await loop.create_datagram_endpoint(
+            _SnmpProtocol, local_addr=('0.0.0.0', 0))
+        return self
+
+    async def __aexit__(self, *exc):
+        self._transport.close()
+
+    def _request_id(self) -> int:
+        self._next_id = self._next_id % 0x7FFFFFFF + 1
+        return self._next_id
+
+    async def get(self, host: str, oids: Iterable[str], version: int = SNMP_V2C) -> dict[str, Any]:
+        """
+        Values of the objects a host has, in one round trip.
+
+        Missing objects are left out. A v1 agent rejects the whole request
+        if one object is missing, so that object is dropped and the rest
+        asked for again.
+
+        Returns:
+            {oid: value}; empty if the host did not answer
+        """
+        oids = list(oids)
+        attempts = self.retries + 1
+        while attempts and oids:
+            request_id = self._request_id()
+            future = asyncio.get_running_loop().create_future()
+            self._protocol.pending[request_id] = (host, future)
+            try:
+                self._transport.sendto(
+                    encode_snmp_get(request_id, oids, self.community, version), (host, self.port))
+                error_status, error_index, varbinds = await asyncio.wait_for(future, self.timeout)
+            except asyncio.TimeoutError:
+                attempts -= 1
+                continue
+            except OSError as e:
+                log.debug(f"SNMP request to {host} failed: {e}")
+                return {}
+            finally:
+                self._protocol.pending.pop(request_id, None)
+
+            if error_status == _NO_SUCH_NAME and 0 < error_index <= len(oids):
+                del oids[error_index - 1]
+                continue
+            if error_status:
+                return {}
+            return {oid: value for oid, value in varbinds if value is not None}
+        return {}
+
+    async def get_any_version(self, host: str, oids: Iterable[str]) -> dict[str, Any]:
+        """
+        Like get(), sending v2c and v1 requests together.
+
+        Agents silently drop versions they don't speak, so trying one
+        after the other would cost a full timeout on v1-only printers.
+        """
+        oids = list(oids)
+        tasks = [asyncio.ensure_future(self.get(host, oids, version))
+                 for version in (SNMP_V2C, SNMP_V1)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                values = await next_done
+                if values:
+                    return values
+            return {}
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+# =============================================================================
+# IPP client
+# =============================================================================
+
+# Delimiter and value tags (RFC 8010)
+_IPP_OPERATION_ATTRIBUTES = 0x01
+_IPP_PRINTER_ATTRIBUTES = 0x04
+_IPP_END_OF_ATTRIBUTES = 0x03
+_IPP_INTEGER = 0x21
+_IPP_BOOLEAN = 0x22
+_IPP_ENUM = 0x23
+_IPP_TEXT = 0x41
+_IPP_KEYWORD = 0x44
+_IPP_URI = 0x45
+_IPP_CHARSET = 0x47
+_IPP_LANGUAGE = 0x48
+_IPP_GET_PRINTER_ATTRIBUTES = 0x000B
+
+
+def _ipp_attribute(tag: int, name: str, value: Any) -> bytes:
+    if isinstance(value, int):
+        value = struct.pack('>i', value)
+    elif isinstance(value, str):
+        value = value.encode()
+    name = name.encode()
+    return struct.pack('>BH', tag, len(name)) + name + struct.pack('>H', len(value)) + value
+
+
+def encode_ipp_request(printer_uri: str, request_id: int = 1,
+                       attributes: Iterable[str] = IPP_ATTRIBUTES) -> bytes:
+    """An IPP/2.0 Get-Printer-Attributes request body."""
+    body = struct.pack('>BBHi', 2, 0, _IPP_GET_PRINTER_ATTRIBUTES, request_id)
+    body += bytes([_IPP_OPERATION_ATTRIBUTES])
+    body += _ipp_attribute(_IPP_CHARSET, 'attributes-charset', 'utf-8')
+    body += _ipp_attribute(_IPP_LANGUAGE, 'attributes-natural-language', 'en')
+    body += _ipp_attribute(_IPP_URI, 'printer-uri', printer_uri)
+    for n, name in enumerate(attributes):
+        # Additional values of a multi-valued attribute have an empty name
+        body += _ipp_attribute(_IPP_KEYWORD, '' if n else 'requested-attributes', name)
+    return body + bytes([_IPP_END_OF_ATTRIBUTES])
+
+
+def decode_ipp_message(data: bytes) -> tuple[int, int, dict[str, list]]:
+    """
+    Parse an IPP request or response.
+
+    Returns:
+        (operation-id or status-code, request-id, {attribute name: [values]})
+        with the attributes of all groups merged
+
+    Raises:
+        ValueError: Malformed message
+    """
+    if len(data) < 9:
+        raise ValueError("truncated IPP message")
+    _major, _minor, code, request_id = struct.unpack('>BBHi', data[:8])
+    attributes: dict[str, list] = {}
+    pos = 8
+    name = ''
+    while pos < len(data):
+        tag = data[pos]
+        pos += 1
+        if tag == _IPP_END_OF_ATTRIBUTES:
+            break
+        if tag < 0x10:
+            continue  # Start of another attribute group
+        if pos + 2 > len(data):
+            raise ValueError("truncated IPP attribute")
+        (name_len,) = struct.unpack('>H', data[pos:pos + 2])
+        pos += 2
+        if name_len:
+            name = data[pos:pos + name_len].decode('utf-8', errors='replace')
+        pos += name_len
+        if pos + 2 > len(data):
+            raise ValueError("truncated IPP attribute")
+        (value_len,) = struct.unpack('>H', data[pos:pos + 2])
+        pos += 2
+        raw = data[pos:pos + value_len]
+        if len(raw) != value_len:
+            raise ValueError("truncated IPP value")
+        pos += value_len
+
+        if tag in (_IPP_INTEGER, _IPP_ENUM) and value_len == 4:
+            value = struct.unpack('>i', raw)[0]
+        elif tag == _IPP_BOOLEAN and value_len == 1:
+            value = bool(raw[0])
+        elif 0x40 <= tag <= 0x4F:
+            value = raw.decode('utf-8', errors='replace')
+        else:
+            value = raw
+        attributes.setdefault(name, []).append(value)
+    return code, request_id, attributes
+
+
+def _http_body(response: bytes) -> bytes:
+    """Body of an HTTP/1.1 response (plain or chunked); raises ValueError on errors."""
+    head, sep, body = response.partition(b'\r\n\r\n')
+    if not sep:
+        raise ValueError("incomplete HTTP response")
+    lines = head.decode('latin-1').split('\r\n')
+    status = lines[0].split()
+    if len(status) < 2 or status[1] != '200':
+        raise ValueError(f"HTTP status {' '.join(status[1:]) or '?'}")
+    headers = {}
+    for line in lines[1:]:
+        key, _, value = line.partition(':')
+        headers[key.strip().lower()] = value.strip().lower()
+    if headers.get('transfer-encoding') != 'chunked':
+        return body
+    data = b''
+    while body:
+        size_line, _, body = body.partition(b'\r\n')
+        size = int(size_line.split(b';')[0] or b'0', 16)
+        if not size:
+            break
+        data += body[:size]
+        body = body[size + 2:]
+    return data
+
+
+async def ipp_get_printer_attributes(host: str, port: int = IPP_PORT, path: str = '/ipp/print',
+                                     timeout: float = DEFAULT_TIMEOUT,
+                                     attributes: Iterable[str] = IPP_ATTRIBUTES) -> dict[str, list]:
+    """
+    Get-Printer-Attributes over plain HTTP.
+
+    Returns:
+        {attribute name: [values]}; empty if the host didn't answer or
+        isn't an IPP printer
+    """
+    uri = f"ipp://{host}:{port}{path}"
+    body = encode_ipp_request(uri, random.randrange(1, 1 << 30), attributes)
+    request = (f"POST {path} HTTP/1.1\r\n"
+               f"Host: {host}:{port}\r\n"
+               "Content-Type: application/ipp\r\n"
+               f"Content-Length: {len(body)}\r\n"
+               "Connection: close\r\n\r\n").encode() + body
+
+    async def exchange():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            writer.write(request)
+            await writer.drain()
+            # Printers often send the HTTP header and the IPP body in
+            # separate segments; the request asked for Connection: close,
+            # so read until the printer hangs up
+            return await reader.read()
+        finally:
+            writer.close()
+
+    try:
+        response = await asyncio.wait_for(exchange(), timeout)
+        status, _request_id, values = decode_ipp_message(_http_body(response))
+    except (OSError, asyncio.TimeoutError, ValueError) as e:
+        log.debug(f"IPP query of {host}:{port} failed: {e}")
+        return {}
+    # 0x0000-0x00FF are successful-ok variants
+    return values if status < 0x0100 else {}
+
+
+# =============================================================================
+# Combined probe
+# =============================================================================
+
+def _details_from(address: str, snmp: dict[str, Any], ipp: dict[str, list]) -> Optional[PrinterDetails]:
+    """Merge SNMP and IPP answers; None if neither protocol answered."""
+    if not snmp and not ipp:
+        return None
+    details = PrinterDetails(address)
+
+    def first(name):
+        values = ipp.get(name)
+        return values[0] if values else None
+
+    if ipp:
+        details.sources.append('ipp')
+        details.make_and_model = first('printer-make-and-model') or first('printer-info') or ""
+        details.device_id = first('printer-device-id') or ""
+        details.state = _IPP_PRINTER_STATES.get(first('printer-state'), "")
+        details.state_reasons = [r for r in ipp.get('printer-state-reasons', []) if r != 'none']
+    if snmp:
+        details.sources.append('snmp')
+        details.make_and_model = (details.make_and_model or snmp.get(OID_DEVICE_DESCR)
+                                  or snmp.get(OID_SYS_DESCR) or "")
+        details.device_id = details.device_id or snmp.get(OID_DEVICE_ID) or ""
+        details.serial = snmp.get(OID_SERIAL) or ""
+        if not details.state:
+            if snmp.get(OID_DEVICE_STATUS) == _HR_DEVICE_DOWN:
+                details.state = 'down'
+            else:
+                details.state = _HR_PRINTER_STATES.get(snmp.get(OID_PRINTER_STATUS), "")
+    for name in ('make_and_model', 'device_id', 'serial'):
+        if not isinstance(getattr(details, name), str):
+            setattr(details, name, "")
+    return details
+
+
+async def probe_printer(address: str, snmp: Optional[SnmpClient] = None, ipp: bool = True,
+                        ipp_port: int = IPP_PORT, timeout: float = DEFAULT_TIMEOUT) -> Optional[PrinterDetails]:
+    """Ask one printer over SNMP and IPP at the same time."""
+    async def no_answer():
+        return {}
+
+    snmp_values, ipp_values = await asyncio.gather(
+        snmp.get_any_version(address, PRINTER_OIDS) if snmp else no_answer(),
+        ipp_get_printer_attributes(address, ipp_port, timeout=timeout) if ipp else no_answer(),
+    )
+    return _details_from(address, snmp_values, ipp_values)
+
+
+def query_printers(
+    addresses: Iterable[str],
+    on_result: Optional[Callable[[PrinterDetails], None]] = None,
+    snmp: bool = True,
+    ipp: bool = True,
+    community: str = 'public',
+    timeout: float = DEFAULT_TIMEOUT,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    snmp_port: int = SNMP_PORT,
+    ipp_port: int = IPP_PORT,
+) -> dict[str, PrinterDetails]:
+    """
+    Ask many printers for make/model and state at once.
+
+    Blocks the calling (worker) thread until every printer has answered
+    or timed out, which takes about one timeout however many there are.
+
+    Args:
+        addresses: Printer IPs
+        on_result: Called with each printer's details as they arrive
+        snmp, ipp: Protocols to use
+
+    Returns:
+        {address: details} for every printer that answered
+    """
+    addresses = list(dict.fromkeys(addresses))
+    found: dict[str, PrinterDetails] = {}
+    if not addresses:
+        return found
+
+    async def run():
+        limit = asyncio.Semaphore(concurrency)
+
+        async def one(address, client):
+            async with limit:
+                details = await probe_printer(address, client, ipp, ipp_port, timeout)
+            if details:
+                found[address] = details
+                if on_result:
+                    on_result(details)
+
+        if snmp:
+            async with SnmpClient(community, snmp_port, timeout) as client:
+                await asyncio.gather(*(one(a, client) for a in addresses))
+        else:
+            await asyncio.gather(*(one(a, None) for a in addresses))
+
+    asyncio.run(run())
+    return found
+
+
+# =============================================================================
+# Fake printer responder
+# =============================================================================
+
+class _FakeSnmpAgent(asyncio.DatagramProtocol):
+    def __init__(self, responder: 'FakePrinterResponder'):
+        self.responder = responder
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        try:
+            version, community, tag, request_id, _s, _i, varbinds = decode_snmp_message(data)
+        except ValueError:
+            return
+        if tag != _GET_REQUEST or version not in self.responder.snmp_versions:
+            return  # Real agents drop versions they don't speak
+        values = self.responder.snmp_values(self.transport.get_extra_info('sockname')[0])
+        answer = []
+        error_status = error_index = 0
+        for n, (oid, _value) in enumerate(varbinds, 1):
+            if oid in values:
+                answer.append((oid, values[oid]))
+            elif version == SNMP_V1:
+                error_status, error_index = _NO_SUCH_NAME, n
+                answer = varbinds
+                break
+            else:
+                answer.append((oid, ...))
+        reply = _encode_snmp_response(version, community, request_id, answer, error_status, error_index)
+        delay = self.responder.delay
+        if delay:
+            asyncio.get_running_loop().call_later(delay, self.transport.sendto, reply, addr)
+        else:
+            self.transport.sendto(reply, addr)
+
+
+class FakePrinterResponder:
+    """
+    Pretend printers on loopback addresses, answering SNMP and IPP.
+
+    Each address in 127.0.0.0/8 acts as one printer; all of them listen
+    on the same two (unprivileged) ports, which the client must be
+    pointed at. Runs its own event loop in a daemon thread:
+
+        with FakePrinterResponder(count=20) as fake:
+            query_printers(fake.addresses, snmp_port=fake.snmp_port,
+                           ipp_port=fake.ipp_port)
+    """
+
+    def __init__(self, count: int = 1, first_address: str = '127.0.0.2',
+                 make_and_model: str = "HP LaserJet Pro M404", delay: float = 0.0,
+                 snmp_versions: tuple = (SNMP_V1, SNMP_V2C), snmp_port: int = 0, ipp_port: int = 0):
+        """
+        Args:
+            count: Number of printers
+            delay: Seconds each printer waits before answering, to mimic
+                slow embedded network stacks
+            snmp_versions: SNMP versions the agents answer
+            snmp_port, ipp_port: Ports to listen on (0 picks free ones)
+        """
+        base = [int(p) for p in first_address.split('.')]
+        self.addresses = [f"127.{base[1]}.{base[2] + (base[3] + n) // 256}.{(base[3] + n) % 256}"
+                          for n in range(count)]
+        self.make_and_model = make_and_model
+        self.delay = delay
+        self.snmp_versions = snmp_versions
+        self.snmp_port = snmp_port
+        self.ipp_port = ipp_port
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._servers: list = []
+        self._thread: Optional[threading.Thread] = None
+
+    def _serial(self, address: str) -> str:
+        return f"FAKE{address.replace('.', '')}"
+
+    def _device_id(self) -> str:
+        make, _, model = self.make_and_model.partition(' ')
+        return f"MFG:{make};MDL:{model};CMD:PCL,PJL,URF;CLS:PRINTER;"
+
+    def snmp_values(self, address: str) -> dict[str, Any]:
+        return {
+            OID_SYS_DESCR: f"{self.make_and_model}; embedded web server",
+            OID_DEVICE_DESCR: self.make_and_model,
+            OID_DEVICE_STATUS: 2,        # running
+            OID_PRINTER_STATUS: 3,       # idle
+            OID_SERIAL: self._serial(address),
+            OID_DEVICE_ID: self._device_id(),
+        }
+
+    def ipp_response(self, request_id: int) -> bytes:
+        body = struct.pack('>BBHi', 2, 0, 0x0000, request_id)
+        body += bytes([_IPP_OPERATION_ATTRIBUTES])
+        body += _ipp_attribute(_IPP_CHARSET, 'attributes-charset', 'utf-8')
+        body += _ipp_attribute(_IPP_LANGUAGE, 'attributes-natural-language', 'en')
+        body += bytes([_IPP_PRINTER_ATTRIBUTES])
+        body += _ipp_attribute(_IPP_TEXT, 'printer-make-and-model', self.make_and_model)
+        body += _ipp_attribute(_IPP_TEXT, 'printer-device-id', self._device_id())
+        body += _ipp_attribute(_IPP_ENUM, 'printer-state', 3)
+        body += _ipp_attribute(_IPP_KEYWORD, 'printer-state-reasons', 'none')
+        return body + bytes([_IPP_END_OF_ATTRIBUTES])
+
+    async def _handle_ipp(self, reader, writer):
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+            length = 0
+            for line in head.decode('latin-1').split('\r\n'):
+                key, _, value = line.partition(':')
+                if key.strip().lower() == 'content-length':
+                    length = int(value)
+            _op, request_id, _attrs = decode_ipp_message(await reader.readexactly(length))
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            body = self.ipp_response(request_id)
+            # Header and body in separate writes, like CUPS and printer
+            # web servers, so clients that stop at the first segment fail
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/ipp\r\n"
+                         + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode())
+            await writer.drain()
+            await asyncio.sleep(0.01)
+            writer.write(body)
+            await writer.drain()
+        except (OSError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _start_servers(self):
+        loop = asyncio.get_running_loop()
+        for address in self.addresses:
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda: _FakeSnmpAgent(self), local_addr=(address, self.snmp_port))
+            self.snmp_port = transport.get_extra_info('sockname')[1]
+            server = await asyncio.start_server(self._handle_ipp, address, self.ipp_port)
+            self.ipp_port = server.sockets[0].getsockname()[1]
+            self._servers += [transport, server]
+
+    def start(self) -> 'FakePrinterResponder':
+        """Start answering; returns once every address is listening."""
+        self._loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        failure = []
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._loop.run_until_complete(self._start_servers())
+            except OSError as e:
+                failure.append(e)
+            ready.set()
+            if not failure:
+                self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name='fake-printers', daemon=True)
+        self._thread.start()
+        ready.wait()
+        if failure:
+            self.stop()
+            raise failure[0]
+        return self
+
+    def stop(self):
+        """Close every socket and stop the event loop."""
+        if self._loop is None:
+            return
+
+        def shutdown():
+            for server in self._servers:
+                server.close()
+            self._loop.stop()
+
+        if self._loop.is_running():
+            self._loop.call_soon_threadsafe(shutdown)
+            self._thread.join(timeout=5)
+        else:
+            for server in self._servers:
+                server.close()
+        self._loop.close()
+        self._loop = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def benchmark(printers: int = 50, delay: float = 0.05) -> dict:
+    """
+    Query fake printers all at once and one after another.
+
+    Each fake printer answers after `delay` seconds, roughly what a
+    printer's embedded network stack takes.
+    """
+    with FakePrinterResponder(count=printers, delay=delay) as fake:
+        ports = {'snmp_port': fake.snmp_port, 'ipp_port': fake.ipp_port}
+
+        t0 = time.perf_counter()
+        found = query_printers(fake.addresses, **ports)
+        concurrent = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for address in fake.addresses:
+            query_printers([address], **ports)
+        serial = time.perf_counter() - t0
+
+    complete = sum(1 for d in found.values() if d.make_and_model and d.serial and d.state)
+    # SNMP alone fills in make, serial and state, so count IPP separately
+    ipp = sum(1 for d in found.values() if 'ipp' in d.sources)
+    return {
+        'printers': printers,
+        'answered': len(found),
+        'complete': complete,
+        'ipp': ipp,
+        'concurrent_seconds': concurrent,
+        'serial_seconds': serial,
+    }
+
+
+if __name__ == '__main__':
+    r = benchmark()
+    print(f"{r['answered']}/{r['printers']} printers answered ({r['complete']} with make, serial and state, "
+          f"{r['ipp']} over IPP)")
+    print(f"concurrent: {r['concurrent_seconds']:.2f}s   one at a time: {r['serial_seconds']:.2f}s")
@@ -0,0 +1,330 @@
+"""
+Tux Assistant - Startup Profiling
+
+Wall-clock timing of startup phases and module imports, enabled with
+``tux-assistant.py --profile-startup[=DIR]``.
+
+Phases are recorded with the ``profiled`` decorator or the ``span``
+context manager; both cost a single check when profiling is off. While
+enabled, an import hook times every module import. When the first frame
+has been drawn, ``finish()`` writes two files:
+
+    startup-<time>.json        Phases, imports and marks (milliseconds
+                               since the Python process started)
+    startup-<time>.trace.json  Chrome trace events, open in
+                               chrome://tracing or https://ui.perfetto.dev
+
+This module imports nothing from the tux package: tux-assistant.py loads
+it straight from its file and enables it before `import tux`, so the
+imports done by tux/__init__.py and tux/core/__init__.py are timed too.
+
+Copyright (c) 2025 Christopher Dorrell. Licensed under GPL-3.0.
+"""
+
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+log = logging.getLogger('tux.profiling')
+
+
+# Environment variable set by tux-assistant.py; "1" or an output directory
+ENV_VAR = 'TUX_PROFILE_STARTUP'
+
+# Number of imports listed in the "slowest_imports" summary
+SLOWEST_IMPORTS = 25
+
+
+def _default_output_dir() -> str:
+    cache = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(cache, 'tux-assistant', 'profiles')
+
+
+def _process_age() -> Optional[float]:
+    """Seconds since this process started (Linux /proc), or None."""
+    try:
+        with open('/proc/self/stat') as f:
+            # Field 22 (starttime) counts clock ticks since boot; skip the
+            # command name, which may contain spaces
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - int(fields[19]) / os.sysconf('SC_CLK_TCK'))
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class _Span:
+    __slots__ = ('name', 'cat', 'start', 'end', 'child_time', 'tid', 'args')
+
+    def __init__(self, name: str, cat: str, start: float, tid: int, args: dict):
+        self.name = name
+        self.cat = cat
+        self.start = start
+        self.end = start
+        self.child_time = 0.0
+        self.tid = tid
+        self.args = args
+
+
+class StartupProfiler:
+    """Collects timed spans and instant marks for one startup."""
+
+    def __init__(self, output_dir: Optional[str] = None):
+        self.output_dir = output_dir or _default_output_dir()
+        now = time.perf_counter()
+        age = _process_age()
+        # Time zero is process start when known, else when profiling began
+        self.origin = now - age if age is not None else now
+        self.enabled_at = now
+        self.spans: list[_Span] = []
+        self.marks: list[tuple[str, float, int]] = []
+        self.thread_names: dict[int, str] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.finished = False
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+            thread = threading.current_thread()
+            self.thread_names[threading.get_ident()] = thread.name
+        return stack
+
+    def begin(self, name: str, cat: str, **args) -> _Span:
+        item = _Span(name, cat, time.perf_counter(), threading.get_ident(), args)
+        self._stack().append(item)
+        return item
+
+    def end(self, item: _Span):
+        item.end = time.perf_counter()
+        stack = self._stack()
+        if stack and stack[-1] is item:
+            stack.pop()
+            if stack:
+                stack[-1].child_time += item.end - item.start
+        with self._lock:
+            self.spans.append(item)
+
+    def mark(self, name: str):
+        with self._lock:
+            self.marks.append((name, time.perf_counter(), threading.get_ident()))
+
+    # ==================== Output ====================
+
+    def _ms(self, t: float) -> float:
+        return round((t - self.origin) * 1000, 3)
+
+    def report(self) -> dict:
+        """Machine-readable summary of everything recorded."""
+        spans = sorted(self.spans, key=lambda s: s.start)
+        phases = []
+        imports = []
+        for s in spans:
+            entry = {
+                'name': s.name,
+                'category': s.cat,
+                'start_ms': self._ms(s.start),
+                'duration_ms': round((s.end - s.start) * 1000, 3),
+                'self_ms': round((s.end - s.start - s.child_time) * 1000, 3),
+                'thread': self.thread_names.get(s.tid, str(s.tid)),
+            }
+            if s.args:
+                entry['args'] = s.args
+            (imports if s.cat == 'import' else phases).append(entry)
+
+        marks = {name: self._ms(t) for name, t, _tid in self.marks}
+        return {
+            'pid': os.getpid(),
+            'argv': sys.argv,
+            'python': sys.version.split()[0],
+            'profiler_enabled_ms': self._ms(self.enabled_at),
+            'first_frame_ms': marks.get('first-frame'),
+            'marks': marks,
+            'phases': phases,
+            'imports': imports,
+            'import_total_ms': round(sum(i['self_ms'] for i in imports), 3),
+            'slowest_imports': sorted(imports, key=lambda i: -i['self_ms'])[:SLOWEST_IMPORTS],
+        }
+
+    def trace_events(self) -> dict:
+        """The same data in Chrome trace-event format."""
+        pid = os.getpid()
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': pid,
+                   'args': {'name': 'Tux Assistant startup'}}]
+        for tid, name in self.thread_names.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                           'args': {'name': name}})
+        for s in self.spans:
+            event = {
+                'name': s.name, 'cat': s.cat, 'ph': 'X', 'pid': pid, 'tid': s.tid,
+                'ts': round((s.start - self.origin) * 1e6, 1),
+                'dur': round((s.end - s.start) * 1e6, 1),
+            }
+            if s.args:
+                event['args'] = s.args
+            events.append(event)
+        for name, t, tid in self.marks:
+            events.append({'name': name, 'cat': 'mark', 'ph': 'i', 's': 'g',
+                           'pid': pid, 'tid': tid,
+                           'ts': round((t - self.origin) * 1e6, 1)})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write(self) -> tuple[str, str]:
+        """Write the JSON report and Chrome trace; returns their paths."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        report_path = os.path.join(self.output_dir, f'startup-{stamp}.json')
+        trace_path = os.path.join(self.output_dir, f'startup-{stamp}.trace.json')
+        with open(report_path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+        with open(trace_path, 'w') as f:
+            json.dump(self.trace_events(), f)
+        return report_path, trace_path
+
+
+class _TimedLoader:
+    """Loader proxy that records how long a module takes to execute."""
+
+    def __init__(self, loader, fullname: str, profiler: StartupProfiler):
+        self._loader = loader
+        self._fullname = fullname
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        item = self._profiler.begin(self._fullname, 'import')
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler.end(item)
+
+
+class _ImportTimer:
+    """Meta path finder that wraps other finders' loaders with _TimedLoader."""
+
+    def __init__(self, profiler: StartupProfiler):
+        self._profiler = profiler
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, 'busy', False):
+            return None
+        self._local.busy = True
+        try:
+            spec = None
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+        finally:
+            self._local.busy = False
+
+        if spec is None or not hasattr(spec.loader, 'exec_module'):
+            return spec
+        spec.loader = _TimedLoader(spec.loader, fullname, self._profiler)
+        return spec
+
+
+# =============================================================================
+# Module-level API
+# =============================================================================
+
+_profiler: Optional[StartupProfiler] = None
+_import_timer: Optional[_ImportTimer] = None
+
+
+def enable(output_dir: Optional[str] = None) -> StartupProfiler:
+    """Start profiling (and timing imports) for this process."""
+    global _profiler, _import_timer
+    if _profiler is None:
+        _profiler = StartupProfiler(output_dir)
+        _import_timer = _ImportTimer(_profiler)
+        sys.meta_path.insert(0, _import_timer)
+    return _profiler
+
+
+def enable_from_environment() -> bool:
+    """Enable profiling if tux-assistant.py asked for it via ENV_VAR."""
+    value = os.environ.pop(ENV_VAR, '')  # Don't leak into child processes
+    if not value:
+        return False
+    enable(None if value == '1' else value)
+    return True
+
+
+def is_enabled() -> bool:
+    return _profiler is not None and not _profiler.finished
+
+
+@contextmanager
+def span(name: str, cat: str = 'phase', **args):
+    """Time a block as a named phase (no-op unless profiling)."""
+    if _profiler is None or _profiler.finished:
+        yield
+        return
+    item = _profiler.begin(name, cat, **args)
+    try:
+        yield
+    finally:
+        _profiler.end(item)
+
+
+def profiled(name: Optional[str] = None, cat: str = 'phase') -> Callable:
+    """Decorator timing every call of a function as a phase."""
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _profiler is None or _profiler.finished:
+                return func(*args, **kwargs)
+            item = _profiler.begin(label, cat)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _profiler.end(item)
+        return wrapper
+    return decorator
+
+
+def mark(name: str):
+    """Record an instant event (e.g. "first-frame")."""
+    if _profiler is not None and not _profiler.finished:
+        _profiler.mark(name)
+
+
+def finish() -> Optional[tuple[str, str]]:
+    """
+    Stop profiling and write the report files.
+
+    Returns:
+        (report path, trace path), or None if profiling was off or the
+        files could not be written
+    """
+    global _import_timer
+    if _profiler is None or _profiler.finished:
+        return None
+    _profiler.finished = True
+    if _import_timer in sys.meta_path:
+        sys.meta_path.remove(_import_timer)
+    _import_timer = None
+    try:
+        return _profiler.write()
+    except OSError as e:
+        log.error(f"Could not write startup profile: {e}")
+        return None
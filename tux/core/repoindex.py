@@ -0,0 +1,303 @@
+"""
+Tux Assistant - Repository Package Index
+
+Answers "is this package in the configured repositories?" from one bulk
+query per package manager instead of forking `apt-cache show` /
+`pacman -Si` / `dnf info` / `zypper info` once per package.
+
+The name list is cached under ~/.cache/tux-assistant together with a
+signature of the repository databases it came from (their paths, sizes
+and mtimes). It stays valid until a sync, repo change or install
+touches those files, so after the first build a whole wishlist resolves
+with a few stat() calls and set lookups - even across restarts.
+
+Copyright (c) 2025 Christopher Dorrell. Licensed under GPL-3.0.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+from typing import Iterable, Optional
+
+from . import commands
+from .distro import DistroFamily
+from .logger import get_logger
+
+log = get_logger('tux.repoindex')
+
+
+CACHE_VERSION = 1
+BUILD_TIMEOUT = 180
+# Without repo databases to watch, a built index is trusted this long
+UNWATCHED_MAX_AGE = 60 * 60
+
+_DNF_LIST = ['dnf', '-q', 'repoquery', '--available', '--qf', '%{name}\n']
+
+# One command lists every package name the repositories offer
+_LIST_COMMANDS = {
+    DistroFamily.ARCH: ['pacman', '-Slq'],
+    DistroFamily.DEBIAN: ['apt-cache', 'pkgnames'],
+    DistroFamily.FEDORA: _DNF_LIST,
+    DistroFamily.RHEL: _DNF_LIST,
+    DistroFamily.OPENSUSE: ['zypper', '--non-interactive', '--no-refresh', '-x',
+                            'search', '-t', 'package'],
+}
+
+_DNF_DATABASES = [
+    '/etc/yum.repos.d/*.repo',
+    '/var/cache/libdnf5/*/repodata/repomd.xml',
+    '/var/cache/dnf/*/repodata/repomd.xml',
+]
+
+# Files whose changes mean the list above may have changed: repo syncs,
+# added/removed repos and (for lists that include installed packages)
+# the installed database
+_DATABASES = {
+    DistroFamily.ARCH: ['/etc/pacman.conf', '/var/lib/pacman/sync/*.db'],
+    DistroFamily.DEBIAN: ['/var/lib/apt/lists/*_Packages*', '/var/lib/dpkg/status'],
+    DistroFamily.FEDORA: _DNF_DATABASES,
+    DistroFamily.RHEL: _DNF_DATABASES,
+    DistroFamily.OPENSUSE: ['/etc/zypp/repos.d/*.repo', '/var/cache/zypp/solv/*/solv'],
+}
+
+
+def _default_path(family: DistroFamily) -> str:
+    cache = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(cache, 'tux-assistant', f'repo-index-{family.value}.json')
+
+
+def _parse_names(output: str) -> set:
+    return {line.strip() for line in output.splitlines() if line.strip()}
+
+
+def _parse_zypper_xml(output: str) -> set:
+    """Names from `zypper -x search` (<solvable name="..."/> elements)."""
+    try:
+        root = ET.fromstring(output)
+    except ET.ParseError as e:
+        log.warning(f"Unreadable zypper search output: {e}")
+        return set()
+    return {s.get('name') for s in root.iter('solvable') if s.get('name')}
+
+
+class RepoIndex:
+    """Every package name available from one distro family's repositories."""
+
+    def __init__(self, family: DistroFamily, path: Optional[str] = None,
+                 databases: Optional[list[str]] = None):
+        """
+        Args:
+            family: Distro family whose package manager is queried
+            path: Cache file (default ~/.cache/tux-assistant/repo-index-<family>.json)
+            databases: Glob patterns of the files the index depends on
+        """
+        self.family = family
+        self.path = path or _default_path(family)
+        self.databases = _DATABASES.get(family, []) if databases is None else databases
+        self._names: Optional[frozenset] = None
+        self._signature: Optional[list] = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def supported(self) -> bool:
+        return self.family in _LIST_COMMANDS
+
+    # ==================== Validity ====================
+
+    def signature(self) -> list:
+        """[path, size, mtime_ns] of every repo database file that exists."""
+        entries = []
+        for pattern in self.databases:
+            for path in sorted(glob.glob(pattern)):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append([path, st.st_size, st.st_mtime_ns])
+        return entries
+
+    def _valid(self, signature: list, stored: Optional[list], built_at: float) -> bool:
+        if stored != signature:
+            return False
+        # Nothing to watch: fall back to a plain age limit
+        return bool(signature) or time.time() - built_at < UNWATCHED_MAX_AGE
+
+    # ==================== Loading ====================
+
+    def _load(self) -> Optional[dict]:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            log.warning(f"Ignoring unreadable repo index {self.path}: {e}")
+            return None
+        if data.get('version') != CACHE_VERSION:
+            return None
+        return data
+
+    def _save(self):
+        data = {
+            'version': CACHE_VERSION,
+            'built_at': self._built_at,
+            'signature': self._signature,
+            'names': sorted(self._names),
+        }
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            log.warning(f"Could not save repo index: {e}")
+
+    def _build(self) -> Optional[frozenset]:
+        """Run the bulk list command (no caching); None if it failed."""
+        cmd = _LIST_COMMANDS[self.family]
+        started = time.monotonic()
+        result = commands.run(cmd, timeout=BUILD_TIMEOUT)
+        if not result.success:
+            if not result.stderr.startswith('Command not found'):
+                log.warning(f"Listing repository packages failed ({cmd[0]}): {result.stderr.strip()}")
+            return None
+
+        if cmd[0] == 'zypper':
+            names = _parse_zypper_xml(result.stdout)
+        else:
+            names = _parse_names(result.stdout)
+        if not names:
+            return None
+        log.debug(f"Indexed {len(names)} {self.family.value} repo packages "
+                  f"in {time.monotonic() - started:.1f}s")
+        return frozenset(names)
+
+    def names(self) -> Optional[frozenset]:
+        """
+        Every available package name, or None if the package manager
+        can't be queried (callers then fall back to per-package checks).
+        """
+        if not self.supported:
+            return None
+        with self._lock:
+            # Held while building, so concurrent callers share one command
+            signature = self.signature()
+            if self._names is not None and self._valid(signature, self._signature, self._built_at):
+                return self._names
+
+            data = self._load()
+            if data and self._valid(signature, data.get('signature'), data.get('built_at', 0.0)):
+                self._names = frozenset(data.get('names', ()))
+                self._signature = signature
+                self._built_at = data.get('built_at', 0.0)
+                return self._names
+
+            names = self._build()
+            if names is None:
+                return None
+            # Re-read: the command itself may touch the databases (e.g.
+            # dnf refreshing expired metadata)
+            self._names = names
+            self._signature = self.signature()
+            self._built_at = time.time()
+            self._save()
+            return self._names
+
+    def invalidate(self):
+        """Force a rebuild on the next lookup, even if the databases look unchanged."""
+        with self._lock:
+            self._names = None
+            self._signature = None
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                log.warning(f"Could not remove repo index: {e}")
+
+    # ==================== Queries ====================
+
+    def available_of(self, packages: Iterable[str]) -> Optional[set]:
+        """The subset of `packages` the repositories offer; None if unknown."""
+        names = self.names()
+        if names is None:
+            return None
+        return {p for p in packages if p in names}
+
+
+# Singleton instances, one per family
+_indexes: dict[DistroFamily, RepoIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_repo_index(family: DistroFamily) -> RepoIndex:
+    """Get the shared repository index for a distro family."""
+    with _indexes_lock:
+        index = _indexes.get(family)
+        if index is None:
+            index = _indexes[family] = RepoIndex(family)
+        return index
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def benchmark(family: Optional[DistroFamily] = None, sample: int = 25) -> dict:
+    """
+    Resolve `sample` package names against this system's repositories:
+    one per-package query each (the old way) vs. a cold index build vs.
+    a warm lookup from the on-disk index.
+    """
+    import tempfile
+    from .distro import get_family
+
+    family = family or get_family()
+    per_package = {
+        DistroFamily.ARCH: ['pacman', '-Si'],
+        DistroFamily.DEBIAN: ['apt-cache', 'show'],
+        DistroFamily.FEDORA: ['dnf', 'info'],
+        DistroFamily.RHEL: ['dnf', 'info'],
+        DistroFamily.OPENSUSE: ['zypper', 'info'],
+    }.get(family)
+    if per_package is None:
+        raise RuntimeError(f"No package manager to benchmark for {family.value}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = RepoIndex(family, path=os.path.join(tmp, 'index.json'))
+        t0 = time.perf_counter()
+        names = index.names() or frozenset()
+        build_seconds = time.perf_counter() - t0
+
+        packages = sorted(names)[::max(1, len(names) // sample)][:sample]
+        t0 = time.perf_counter()
+        for package in packages:
+            commands.run(per_package + [package], timeout=30)
+        per_package_seconds = time.perf_counter() - t0
+
+        warm = RepoIndex(family, path=index.path)
+        t0 = time.perf_counter()
+        warm.available_of(packages)
+        warm_seconds = time.perf_counter() - t0
+
+    return {
+        'family': family.value,
+        'names': len(names),
+        'packages': len(packages),
+        'per_package_seconds': per_package_seconds,
+        'build_seconds': build_seconds,
+        'warm_seconds': warm_seconds,
+    }
+
+
+if __name__ == '__main__':
+    r = benchmark()
+    print(f"{r['family']}: {r['names']} repo packages, {r['packages']} looked up")
+    print(f"  one query per package: {r['per_package_seconds']:.3f}s")
+    print(f"  bulk index build:      {r['build_seconds']:.3f}s")
+    print(f"  warm index lookup:     {r['warm_seconds'] * 1000:.1f}ms")
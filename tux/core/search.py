@@ -0,0 +1,192 @@
+"""
+Tux Assistant - Search Index
+
+Small in-memory full-text index used by the main search bar.
+
+Documents are tokenized once when the index is built. Queries match
+tokens exactly, by prefix (binary search over the sorted vocabulary) or
+with a small edit distance for typos, and results are ranked by how well
+and where (title, keywords, description) each query word matched.
+
+Copyright (c) 2025 Christopher Dorrell. Licensed under GPL-3.0.
+"""
+
+import bisect
+import re
+from collections import defaultdict
+from typing import Any, Optional
+
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Score multipliers per kind of token match
+MATCH_EXACT = 1.0
+MATCH_PREFIX = 0.75
+MATCH_TYPO = 0.45
+
+# Default field weights
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'keywords': 2.0,
+    'description': 1.0,
+}
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase alphanumeric tokens of `text`."""
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def _within_distance(a: str, b: str, limit: int) -> bool:
+    """True if the Damerau-Levenshtein distance of a and b is <= limit."""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        row_min = cur[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if (prev2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+            row_min = min(row_min, cur[j])
+        if row_min > limit:
+            return False
+        prev2, prev = prev, cur
+    return prev[-1] <= limit
+
+
+def typo_limit(token: str) -> int:
+    """Edits tolerated for a query token of this length."""
+    return 1 if len(token) >= 4 else 0
+
+
+def _deletes(word: str, limit: int) -> set:
+    """`word` plus every string made by deleting up to `limit` characters."""
+    variants = {word}
+    frontier = {word}
+    for _ in range(limit):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+
+class SearchIndex:
+    """Token index with prefix and typo-tolerant matching."""
+
+    def __init__(self, weights: Optional[dict] = None):
+        self.weights = dict(weights or FIELD_WEIGHTS)
+        self._docs: list[Any] = []
+        # token -> {doc_number: best field weight}
+        self._postings: dict[str, dict[int, float]] = defaultdict(dict)
+        self._vocab: list[str] = []
+        self._deletes: dict[str, set] = defaultdict(set)
+        self._frozen = False
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, payload: Any, **fields: str):
+        """
+        Add a document.
+
+        Args:
+            payload: Returned from search() when the document matches
+            **fields: Text per field name (title=..., keywords=..., ...)
+        """
+        number = len(self._docs)
+        self._docs.append(payload)
+        for field_name, text in fields.items():
+            weight = self.weights.get(field_name, 1.0)
+            for token in tokenize(text):
+                posting = self._postings[token]
+                if posting.get(number, 0.0) < weight:
+                    posting[number] = weight
+        self._frozen = False
+
+    def build(self):
+        """Prepare lookup tables now instead of on the first search."""
+        if not self._frozen:
+            self._freeze()
+
+    def _freeze(self):
+        """Build the sorted vocabulary and the typo lookup table.
+
+        Typos use a symmetric-delete table (as in SymSpell): every word,
+        and every prefix of 4+ letters, is stored under the strings made
+        by deleting one character. A query token looks up its own deletes,
+        so finding near-misses costs a few dict lookups instead of an
+        edit-distance scan over the vocabulary.
+        """
+        self._vocab = sorted(self._postings)
+        self._deletes = defaultdict(set)
+        for word in self._vocab:
+            for end in range(min(4, len(word)), len(word) + 1):
+                stem = word[:end]
+                for variant in _deletes(stem, typo_limit(stem)):
+                    self._deletes[variant].add((word, stem))
+        self._frozen = True
+
+    def _candidates(self, token: str) -> dict[str, float]:
+        """Vocabulary tokens matching a query token, with match quality."""
+        found: dict[str, float] = {}
+        if token in self._postings:
+            found[token] = MATCH_EXACT
+
+        # Prefix matches: contiguous range in the sorted vocabulary
+        start = bisect.bisect_left(self._vocab, token)
+        for word in self._vocab[start:]:
+            if not word.startswith(token):
+                break
+            if word != token:
+                # Closer to a full word = better
+                found[word] = max(found.get(word, 0.0),
+                                  MATCH_PREFIX * (0.5 + 0.5 * len(token) / len(word)))
+
+        # Typo matches, only when nothing matched as typed
+        limit = typo_limit(token)
+        if limit and not found:
+            # Deleting from the query as well covers substitutions,
+            # insertions and transpositions
+            for variant in _deletes(token, limit):
+                for word, stem in self._deletes.get(variant, ()):
+                    if not _within_distance(token, stem, limit):
+                        continue
+                    quality = MATCH_TYPO if stem == word else MATCH_TYPO * MATCH_PREFIX
+                    if quality > found.get(word, 0.0):
+                        found[word] = quality
+        return found
+
+    def search(self, query: str, limit: int = 10) -> list[Any]:
+        """
+        Find documents matching every word of `query`, best first.
+
+        Returns:
+            Payloads of matching documents
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        self.build()
+
+        scores: Optional[dict[int, float]] = None
+        for token in dict.fromkeys(tokens):
+            token_scores: dict[int, float] = {}
+            for word, quality in self._candidates(token).items():
+                for number, weight in self._postings[word].items():
+                    score = quality * weight
+                    if score > token_scores.get(number, 0.0):
+                        token_scores[number] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                # Every query word must match
+                scores = {n: s + token_scores[n] for n, s in scores.items() if n in token_scores}
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [self._docs[number] for number, _score in ranked[:limit]]
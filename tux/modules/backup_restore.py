@@ -12,6 +12,7 @@ gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 
 import os
+import shutil
 import subprocess
 import threading
 import json
@@ -219,20 +220,12 @@ def _find_network_mounts(destinations: List[BackupLocation], seen_mounts: set):
 
 def check_timeshift_installed() -> bool:
     """Check if Timeshift is installed."""
-    try:
-        result = subprocess.run(['which', 'timeshift'], capture_output=True)
-        return result.returncode == 0
-    except Exception:
-        return False
+    return shutil.which('timeshift') is not None
 
 
 def check_rsync_installed() -> bool:
     """Check if rsync is installed."""
-    try:
-        result = subprocess.run(['which', 'rsync'], capture_output=True)
-        return result.returncode == 0
-    except Exception:
-        return False
+    return shutil.which('rsync') is not None
 
 
 def get_timeshift_snapshots() -> List[dict]:
@@ -43,6 +43,7 @@ except Exception:
             HAS_WEBKIT = False
 
 from ..core import get_distro, get_desktop, DesktopEnv, DistroFamily
+from ..core.httpclient import get_http_client
 from .registry import register_module, ModuleCategory
 
 
@@ -3178,6 +3179,7 @@ class ExtensionManager:
 # =============================================================================
 
 EXTENSIONS_API_URL = "https://extensions.gnome.org/extension-query/"
+EXTENSIONS_SEARCH_MAX_AGE = 60 * 60
 EXTENSION_INFO_URL = "https://extensions.gnome.org/extension-info/"
 
 
@@ -3297,14 +3299,10 @@ def search_extensions_api(query: str, shell_version: str = None) -> list:
         if shell_version:
             params['shell_version'] = shell_version
         
-        url = EXTENSIONS_API_URL + "?" + urllib.parse.urlencode(params)
-        
-        req = urllib.request.Request(url)
-        req.add_header('User-Agent', 'TuxAssistant/1.0')
-        
-        with urllib.request.urlopen(req, timeout=15) as response:
-            data = json.loads(response.read().decode())
-            return data.get('extensions', [])
+        # Repeated searches within the hour come from the HTTP cache
+        data = get_http_client().get_json(EXTENSIONS_API_URL, params=params, timeout=15,
+                                          cached=True, max_age=EXTENSIONS_SEARCH_MAX_AGE)
+        return data.get('extensions', [])
     except Exception as e:
         print(f"Search error: {e}")
         return []
@@ -15,8 +15,7 @@ import json
 import shutil
 import stat
 from pathlib import Path
-from dataclasses import dataclass
-from typing import Optional, List
+from typing import Callable, Optional, List
 from datetime import datetime
 
 import gi
@@ -25,6 +24,8 @@ gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, Gio, GLib, Gdk
 
 from ..core import get_distro, DistroFamily
+from ..core.gitscan import get_repo_discovery
+from ..core.gitstatus import GitProject, get_git_status_engine
 from .registry import register_module, ModuleCategory
 
 
@@ -42,23 +43,13 @@ SCAN_DIRECTORIES = [
     '~/workspace',
 ]
 
+# How many folder levels below each scan directory to look for repos
+SCAN_MAX_DEPTH = 3
+
 # Developer Kit manifest filename
 DEV_KIT_MANIFEST = 'developer_kit.json'
 
 
-@dataclass
-class GitProject:
-    """Information about a git project."""
-    path: str
-    name: str
-    remote_url: str
-    branch: str
-    has_changes: bool
-    ahead: int  # commits ahead of remote
-    behind: int  # commits behind remote
-    last_commit: str
-    
-
 def check_ssh_keys_exist() -> tuple[bool, str, str, str]:
     """Check if SSH keys exist. Returns (exists, key_type, private_path, public_path)."""
     ssh_dir = os.path.expanduser("~/.ssh")
@@ -98,87 +89,16 @@ def is_git_repo(path: str) -> bool:
     return os.path.isdir(git_dir)
 
 
-def get_git_info(path: str) -> Optional[GitProject]:
-    """Get detailed git information for a repository."""
+def get_git_info(path: str, refresh: bool = False) -> Optional[GitProject]:
+    """Get detailed git information for a repository (cached until it changes)."""
     if not is_git_repo(path):
         return None
-    
-    try:
-        # Get remote URL
-        remote_result = subprocess.run(
-            ['git', '-C', path, 'remote', 'get-url', 'origin'],
-            capture_output=True, text=True
-        )
-        remote_url = remote_result.stdout.strip() if remote_result.returncode == 0 else ""
-        
-        # Get current branch
-        branch_result = subprocess.run(
-            ['git', '-C', path, 'branch', '--show-current'],
-            capture_output=True, text=True
-        )
-        branch = branch_result.stdout.strip() or "detached"
-        
-        # Check for uncommitted changes
-        status_result = subprocess.run(
-            ['git', '-C', path, 'status', '--porcelain'],
-            capture_output=True, text=True
-        )
-        has_changes = bool(status_result.stdout.strip())
-        
-        # Get ahead/behind count (if remote tracking exists)
-        ahead, behind = 0, 0
-        try:
-            rev_result = subprocess.run(
-                ['git', '-C', path, 'rev-list', '--left-right', '--count', f'HEAD...origin/{branch}'],
-                capture_output=True, text=True, timeout=5
-            )
-            if rev_result.returncode == 0:
-                parts = rev_result.stdout.strip().split()
-                if len(parts) == 2:
-                    ahead, behind = int(parts[0]), int(parts[1])
-        except Exception:
-            pass
-        
-        # Get last commit message
-        log_result = subprocess.run(
-            ['git', '-C', path, 'log', '-1', '--format=%s'],
-            capture_output=True, text=True
-        )
-        last_commit = log_result.stdout.strip()[:50] if log_result.returncode == 0 else ""
-        
-        return GitProject(
-            path=path,
-            name=os.path.basename(path),
-            remote_url=remote_url,
-            branch=branch,
-            has_changes=has_changes,
-            ahead=ahead,
-            behind=behind,
-            last_commit=last_commit
-        )
-    except Exception as e:
-        return None
+    return get_git_status_engine().status(path, refresh=refresh)
 
 
 def scan_for_git_repos() -> List[str]:
-    """Scan common directories for git repositories."""
-    found_repos = []
-    
-    for scan_dir in SCAN_DIRECTORIES:
-        expanded = os.path.expanduser(scan_dir)
-        if not os.path.isdir(expanded):
-            continue
-        
-        # Check immediate subdirectories
-        try:
-            for item in os.listdir(expanded):
-                item_path = os.path.join(expanded, item)
-                if os.path.isdir(item_path) and is_git_repo(item_path):
-                    found_repos.append(item_path)
-        except PermissionError:
-            continue
-    
-    return sorted(set(found_repos))
+    """Scan common directories (and their subfolders) for git repositories."""
+    return get_repo_discovery(SCAN_MAX_DEPTH).scan(SCAN_DIRECTORIES)
 
 
 def get_scanned_directories_status() -> List[tuple[str, bool]]:
@@ -231,6 +151,8 @@ class DeveloperToolsPage(Adw.NavigationPage):
         self.distro = get_distro()
         self.projects: List[str] = []
         self.project_rows: dict = {}  # path -> row widget
+        self._project_list_generation = 0  # Discards outdated background refreshes
+        self._project_list_waiters: list = []  # on_done callbacks of pending refreshes
         
         self.build_ui()
         self._load_projects()
@@ -3394,21 +3316,44 @@ Replace X.X.X with your version number."""
         self.projects = load_saved_projects()
         self._refresh_project_list()
     
-    def _refresh_project_list(self):
-        """Refresh the project list display."""
+    def _refresh_project_list(self, on_done: Optional[Callable[[], None]] = None):
+        """
+        Refresh the project list display (statuses are read in the background).
+        
+        on_done is called once the list is shown; if another refresh starts
+        first, that happens when the newest one is shown.
+        """
+        self._project_list_generation += 1
+        generation = self._project_list_generation
+        projects = list(self.projects)
+        if on_done:
+            self._project_list_waiters.append(on_done)
+        
+        def collect():
+            # Filter to only valid repos
+            valid_projects = [p for p in projects if is_git_repo(p)]
+            infos = get_git_status_engine().status_many(valid_projects)
+            GLib.idle_add(self._show_project_list, generation, projects, valid_projects, infos)
+        
+        threading.Thread(target=collect, daemon=True).start()
+        return False
+    
+    def _show_project_list(self, generation: int, projects: List[str], valid_projects: List[str],
+                           infos: dict):
+        """Replace the project rows with freshly collected statuses."""
+        if generation != self._project_list_generation:
+            return False  # A newer refresh is on its way
+        
         # Clear existing project rows
         for path, row in list(self.project_rows.items()):
             self.projects_group.remove(row)
         self.project_rows.clear()
         
-        # Filter to only valid repos
-        valid_projects = [p for p in self.projects if is_git_repo(p)]
-        
         if valid_projects:
             self.empty_state_box.set_visible(False)
             
             for path in valid_projects:
-                row = self._create_project_row(path)
+                row = self._create_project_row(path, infos.get(path))
                 if row:
                     self.projects_group.add(row)
                     self.project_rows[path] = row
@@ -3417,13 +3362,17 @@ Replace X.X.X with your version number."""
             self.empty_state_box.set_visible(True)
         
         # Save cleaned up list
-        if valid_projects != self.projects:
+        if self.projects == projects and valid_projects != self.projects:
             self.projects = valid_projects
             save_projects(self.projects)
+        
+        waiters, self._project_list_waiters = self._project_list_waiters, []
+        for on_done in waiters:
+            on_done()
+        return False
     
-    def _create_project_row(self, path: str) -> Optional[Adw.ExpanderRow]:
+    def _create_project_row(self, path: str, info: Optional[GitProject]) -> Optional[Adw.ExpanderRow]:
         """Create an expander row for a git project."""
-        info = get_git_info(path)
         if not info:
             return None
         
@@ -3552,11 +3501,8 @@ Replace X.X.X with your version number."""
         """Scan for git projects."""
         button.set_sensitive(False)
         
-        def scan_thread():
-            found = scan_for_git_repos()
-            GLib.idle_add(self._on_scan_complete, found, button)
-        
-        threading.Thread(target=scan_thread, daemon=True).start()
+        get_repo_discovery(SCAN_MAX_DEPTH).scan_in_background(
+            SCAN_DIRECTORIES, lambda found: GLib.idle_add(self._on_scan_complete, found, button))
     
     def _on_scan_complete(self, found: List[str], button):
         """Handle scan completion."""
@@ -3621,15 +3567,10 @@ Replace X.X.X with your version number."""
     def _on_refresh_projects(self, button):
         """Refresh all project statuses."""
         button.set_sensitive(False)
-        
-        def refresh_thread():
-            GLib.idle_add(self._on_refresh_complete, button)
-        
-        threading.Thread(target=refresh_thread, daemon=True).start()
+        self._refresh_project_list(on_done=lambda: self._on_refresh_complete(button))
     
     def _on_refresh_complete(self, button):
         """Handle refresh completion."""
-        self._refresh_project_list()
         button.set_sensitive(True)
         self.window.show_toast("Projects refreshed")
     
@@ -3713,7 +3654,7 @@ read'''
             self.window.show_toast("SSH keys required - set up keys first")
             return
         
-        info = get_git_info(path)
+        info = get_git_info(path, refresh=True)
         if not info:
             self.window.show_toast("Could not read project info")
             return
@@ -4050,8 +3991,9 @@ read'''
             # Export project list (just the remote URLs, not local paths)
             if self.projects:
                 project_remotes = []
+                infos = get_git_status_engine().status_many(self.projects)
                 for path in self.projects:
-                    info = get_git_info(path)
+                    info = infos[path]
                     if info and info.remote_url:
                         project_remotes.append({
                             'name': info.name,
@@ -12,6 +12,7 @@ gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 
 import os
+import shutil
 import subprocess
 import threading
 from gi.repository import Gtk, Adw, GLib
@@ -19,6 +20,7 @@ from typing import Optional, Tuple
 from dataclasses import dataclass
 
 from ..core import get_distro, DistroFamily
+from ..core.installed import get_installed_snapshot
 
 from .registry import register_module, ModuleCategory
 
@@ -176,35 +178,16 @@ CONTROLLER_PACKAGES = {
 
 def check_app_installed(app: GamingApp) -> bool:
     """Check if an app is installed."""
-    try:
-        result = subprocess.run(
-            ['which', app.check_command],
-            capture_output=True
-        )
-        if result.returncode == 0:
-            return True
-        
-        # Also check flatpak
-        if app.flatpak:
-            result = subprocess.run(
-                ['flatpak', 'list', '--app', '--columns=application'],
-                capture_output=True, text=True
-            )
-            if app.flatpak in result.stdout:
-                return True
-        
-        return False
-    except Exception:
-        return False
+    if shutil.which(app.check_command):
+        return True
+    
+    # Also check flatpak
+    return bool(app.flatpak) and get_installed_snapshot().is_flatpak_installed(app.flatpak)
 
 
 def check_flatpak_available() -> bool:
     """Check if flatpak is installed."""
-    try:
-        result = subprocess.run(['which', 'flatpak'], capture_output=True)
-        return result.returncode == 0
-    except Exception:
-        return False
+    return shutil.which('flatpak') is not None
 
 
 def check_32bit_support(family: DistroFamily) -> Tuple[bool, str]:
@@ -17,7 +17,7 @@ from dataclasses import dataclass
 from typing import Optional, Callable
 from enum import Enum
 
-from ..modules.registry import register_module, ModuleCategory
+from ..modules.registry import register_module, ModuleCategory, ModuleRegistry, SearchEntry
 from ..core.distro import get_distro, DistroFamily
 
 
@@ -847,7 +847,7 @@ class HelpLearningPage(Adw.NavigationPage):
         for mod in modules:
             if mod.id == module_id:
                 try:
-                    page = mod.page_class(self.window)
+                    page = mod.get_page_class()(self.window)
                     self.window.navigation_view.push(page)
                 except Exception as e:
                     print(f"[Help] Error loading module '{module_id}': {e}")
@@ -1244,3 +1244,41 @@ class AllTasksPage(Adw.NavigationPage):
     def _on_task(self, task: QuickTask):
         """Handle task selection."""
         self.help_page._on_quick_task(None, task)
+
+
+# =============================================================================
+# Search Integration
+# =============================================================================
+
+def _open_help_topic(window, page_factory):
+    """Open the Help page, then a tutorial/troubleshooter on top of it."""
+    help_page = HelpLearningPage(window)
+    window.navigation_view.push(help_page)
+    window.navigation_view.push(page_factory(window, help_page))
+
+
+def get_search_entries() -> list[SearchEntry]:
+    """Tutorials and troubleshooting topics for the main search bar."""
+    entries = []
+    for tutorial in TUTORIALS:
+        entries.append(SearchEntry(
+            title=tutorial.title,
+            description=tutorial.description,
+            keywords=" ".join(step.get("title", "") for step in tutorial.steps),
+            icon=tutorial.icon,
+            open_func=lambda w, t=tutorial: _open_help_topic(
+                w, lambda win, hp: TutorialPage(win, t, hp)),
+        ))
+    for item in TROUBLESHOOT_ITEMS:
+        entries.append(SearchEntry(
+            title=item.title,
+            description=item.description,
+            keywords="troubleshoot fix " + " ".join(c.get("name", "") for c in item.checks),
+            icon=item.icon,
+            open_func=lambda w, i=item: _open_help_topic(
+                w, lambda win, hp: TroubleshooterPage(win, i, hp)),
+        ))
+    return entries
+
+
+ModuleRegistry.register_search_provider("help_learning", get_search_entries)
@@ -0,0 +1,188 @@
+"""
+Module Manifest - Lightweight description of the built-in modules
+
+The main page only needs each module's id, name, icon, category and
+order to draw its rows. Listing them here lets the registry show every
+module without importing its (often several thousand line) page code;
+the real module is imported the first time it is opened, or ahead of
+time from an idle callback.
+
+When adding or changing a built-in module, keep its entry here in sync
+with its @register_module decorator. Module files that are not listed
+are still imported at startup, so drop-in modules keep working.
+
+Run ``python3 tux/modules/manifest.py`` for a ``-X importtime`` startup
+report comparing eager and lazy loading.
+
+Copyright (c) 2025 Christopher Dorrell. Licensed under GPL-3.0.
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+
+# (id, name, description, icon, category name, order, python module, keywords)
+MODULE_MANIFEST = [
+    # Setup and Configuration
+    ("repo_management", "Repository Management",
+     "Configure package repositories and sources",
+     "tux-drive-multidisk-symbolic", "SETUP", 1, "repo_management",
+     ("repository", "repo", "ppa", "copr", "packman", "multilib")),
+    ("setup_tools", "Setup Tools",
+     "Complete system setup, codecs, drivers, and apps",
+     "tux-system-run-symbolic", "SETUP", 2, "setup_tools",
+     ("codecs", "drivers", "nvidia", "setup")),
+    ("software_center", "Software Center",
+     "Browse and install applications by category",
+     "tux-system-software-install-symbolic", "SETUP", 3, "software_center",
+     ("install", "apps", "software", "packages", "flatpak", "snap")),
+    ("gaming", "Gaming",
+     "Steam, Lutris, and gaming utilities",
+     "tux-applications-games-symbolic", "SETUP", 50, "gaming",
+     ("steam", "lutris", "proton", "wine", "games", "play")),
+    ("desktop_enhancements", "Desktop Enhancements",
+     "Themes, extensions, widgets, and tweaks",
+     "tux-preferences-desktop-theme-symbolic", "SETUP", 51, "desktop_enhancements",
+     ("theme", "icon", "font", "wallpaper", "gnome", "kde", "extensions")),
+
+    # Network and Sharing
+    ("networking_simple", "Networking",
+     "WiFi, file sharing, hotspot, and speed test",
+     "tux-network-wireless-symbolic", "NETWORK", 12, "networking",
+     ("wifi", "network", "internet", "connection", "vpn", "samba")),
+    ("networking_advanced", "Advanced Networking",
+     "VPN, Active Directory, firewall, and advanced sharing",
+     "tux-network-server-symbolic", "NETWORK", 31, "networking",
+     ("vpn", "firewall", "active", "directory", "domain")),
+
+    # System and Maintenance
+    ("help_learning", "Help and Learning",
+     "Tutorials, troubleshooting, and guided help",
+     "tux-help-browser-symbolic", "SYSTEM", 2, "help_learning",
+     ("help", "tutorial", "learn", "troubleshoot", "guide")),
+    ("hardware_manager", "Hardware Manager",
+     "Printers, Bluetooth, displays, audio",
+     "tux-computer-symbolic", "SYSTEM", 11, "hardware_manager",
+     ("printer", "bluetooth", "drivers", "sound", "audio")),
+    ("printer_wizard", "Printer Wizard",
+     "Detect and set up printers",
+     "tux-printer-symbolic", "SYSTEM", 12, "printer_wizard",
+     ("printer", "cups", "scanner", "print")),
+    ("system_maintenance", "System Maintenance",
+     "Cleanup, updates, startup apps, storage",
+     "tux-applications-system-symbolic", "SYSTEM", 20, "system_maintenance",
+     ("update", "clean", "cache", "startup", "services")),
+    ("backup_restore", "Backup &amp; Restore",
+     "File backup and system snapshots",
+     "tux-drive-harddisk-symbolic", "SYSTEM", 21, "backup_restore",
+     ("backup", "restore", "timeshift", "snapshot")),
+
+    # Server and Cloud
+    ("media_server", "Media Server",
+     "Plex, Jellyfin, Emby setup and drive configuration",
+     "tux-video-display-symbolic", "SERVER", 50, "media_server",
+     ("plex", "jellyfin", "media", "server", "dvd")),
+    ("nextcloud_setup", "Nextcloud Server",
+     "Set up your own personal cloud server",
+     "tux-network-server-symbolic", "SERVER", 51, "nextcloud_setup",
+     ("nextcloud", "cloud", "server", "sync")),
+
+    # Developer Tools
+    ("developer_tools", "Developer Tools",
+     "Git manager, SSH keys, and development utilities",
+     "tux-utilities-terminal-symbolic", "DEVELOPER", 40, "developer_tools",
+     ("git", "ssh", "code", "programming", "aur", "deb", "rpm")),
+]
+
+# Search providers of manifest modules: module id -> (python module,
+# function returning its SearchEntry list). The first search index build
+# imports them, so their content is searchable before the module is
+# opened or imported ahead of time.
+SEARCH_PROVIDERS = {
+    "software_center": ("software_center", "get_search_entries"),
+    "help_learning": ("help_learning", "get_search_entries"),
+}
+
+# Module files that register no page (helpers and disabled modules).
+# They are imported by the modules that use them, never at startup.
+HELPER_MODULES = {
+    "package_sources",
+    "iso_creator",
+    "placeholders",
+    "tux_tunes",
+}
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+_IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+_BENCH_SNIPPETS = {
+    'eager': ("import tux.app\n"
+              "from tux.modules import ModuleRegistry\n"
+              "ModuleRegistry.discover_modules(lazy=False)\n"),
+    'lazy': ("import tux.app\n"
+             "from tux.modules import ModuleRegistry\n"
+             "ModuleRegistry.discover_modules()\n"),
+}
+
+
+def _importtime(code: str, cwd: str) -> list[tuple[str, int, int]]:
+    """Run `code` under -X importtime; (module, self_us, cumulative_us) rows."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=cwd, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        tail = result.stderr.strip().splitlines()[-1:] or ['']
+        raise RuntimeError(f"startup import failed: {tail[0]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            rows.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return rows
+
+
+def benchmark(runs: int = 5, top: int = 10) -> dict:
+    """
+    Compare app startup imports with eager and lazy module loading.
+
+    Each run is a fresh interpreter, so the numbers are cold-import times
+    (with a warm OS file cache). Returns the median total import time per
+    mode and the slowest tux.* imports of the last eager run.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    report = {}
+    for mode, code in _BENCH_SNIPPETS.items():
+        totals = []
+        for _ in range(runs):
+            rows = _importtime(code, root)
+            totals.append(sum(self_us for _name, self_us, _cum in rows))
+        totals.sort()
+        report[mode] = {
+            'median_ms': totals[len(totals) // 2] / 1000,
+            'modules': len(rows),
+            'tux_modules': sum(1 for name, _s, _c in rows if name.startswith('tux.modules.')),
+        }
+        if mode == 'eager':
+            tux_rows = [r for r in rows if r[0].startswith('tux.')]
+            report['slowest'] = sorted(tux_rows, key=lambda r: -r[1])[:top]
+    return report
+
+
+if __name__ == '__main__':
+    r = benchmark()
+    for mode in ('eager', 'lazy'):
+        m = r[mode]
+        print(f"{mode:>5}: {m['median_ms']:8.1f} ms  ({m['modules']} imports, "
+              f"{m['tux_modules']} tux.modules.*)")
+    saved = r['eager']['median_ms'] - r['lazy']['median_ms']
+    print(f"saved: {saved:8.1f} ms at startup")
+    print("\nSlowest tux imports when loading eagerly (self time):")
+    for name, self_us, cum_us in r['slowest']:
+        print(f"  {self_us / 1000:7.1f} ms  (cumulative {cum_us / 1000:7.1f} ms)  {name}")
@@ -19,12 +19,16 @@ import subprocess
 import threading
 import json
 import tempfile
+import time
+import ipaddress
 from gi.repository import Gtk, Adw, GLib, Gio, Gdk
 from dataclasses import dataclass
 from typing import Optional
 from enum import Enum
 
 from ..core import get_distro, get_desktop, DistroFamily
+from ..core import netscan
+from ..core.netcache import DiscoveryCache, HostRecord
 from .registry import register_module, ModuleCategory
 from ..ui.fun_facts import RotatingFunFactWidget
 
@@ -129,25 +133,60 @@ class ScanType(Enum):
 class NetworkScanner:
     """Scans the local network for hosts and services."""
     
+    # Probes in flight at once and seconds per probe (see core.netscan)
+    SCAN_CONCURRENCY = netscan.DEFAULT_CONCURRENCY
+    PROBE_TIMEOUT = 0.75
+    # Parallel smbclient / reverse DNS lookups in the share phase
+    SHARE_WORKERS = 16
+    
+    # Delta rescans need a full sweep at least this recent (seconds)
+    FULL_RESCAN_AFTER = 24 * 60 * 60
+    
     def __init__(self):
         self.distro = get_distro()
+        self._cache = None
     
     def get_network_range(self) -> str:
         """Get the local network range (e.g., 192.168.1.0/24)."""
+        ranges = self.get_network_ranges()
+        return ranges[0]
+    
+    def get_network_ranges(self) -> list[str]:
+        """Get every local network range, using the real interface prefixes."""
+        networks = [str(network) for _ip, network in netscan.local_networks()]
+        if networks:
+            return networks
+        # Fallback: assume a /24 around the address used for the default route
         ip = get_local_ip()
         parts = ip.split('.')
-        return f"{parts[0]}.{parts[1]}.{parts[2]}.0/24"
+        return [f"{parts[0]}.{parts[1]}.{parts[2]}.0/24"]
     
     def resolve_hostname(self, ip: str) -> str:
         """Resolve IP to hostname via reverse DNS."""
-        import socket
-        try:
-            hostname, _, _ = socket.gethostbyaddr(ip)
-            return hostname
-        except Exception:
-            return ""
+        return netscan.resolve_hostname(ip)
+    
+    @property
+    def cache(self) -> DiscoveryCache:
+        """Hosts found by earlier scans (loaded on first use)."""
+        if self._cache is None:
+            self._cache = DiscoveryCache()
+        return self._cache
+    
+    def get_cached_hosts(self, scan_type: ScanType, networks: Optional[list[str]] = None) -> list[NetworkHost]:
+        """Hosts remembered from earlier scans, for showing before a rescan."""
+        networks = networks or self.get_network_ranges()
+        hosts = []
+        for record in self.cache.hosts(networks):
+            if record.last_seen < record.last_probed:
+                continue  # Didn't answer last time
+            if scan_type == ScanType.QUICK and 445 not in record.ports and not record.shares:
+                continue
+            hosts.append(NetworkHost(ip=record.ip, hostname=record.hostname or record.ip,
+                                     mac=record.mac or None, services=list(record.shares)))
+        return hosts
     
-    def scan_for_shares(self, scan_type: ScanType, callback, progress_callback=None) -> list[NetworkHost]:
+    def scan_for_shares(self, scan_type: ScanType, callback, progress_callback=None,
+                        incremental: bool = False) -> list[NetworkHost]:
         """
         Scan the network for hosts with shares.
         
@@ -155,30 +194,109 @@ class NetworkScanner:
             scan_type: QUICK (SMB only) or FULL (all hosts)
             callback: Function to call with status updates (str)
             progress_callback: Function for detailed progress (current, total, found, phase)
+            incremental: Only re-probe new, changed and stale hosts when a
+                recent sweep covering scan_type is cached (see _rescan_known_hosts)
         
         Returns:
             List of NetworkHost objects
         """
-        import shutil
+        networks = self.get_network_ranges()
         
-        network = self.get_network_range()
-        hosts = []
+        # A full sweep also covers what a quick one looks for, not the other way round
+        kinds = [ScanType.FULL.value]
+        if scan_type == ScanType.QUICK:
+            kinds.append(ScanType.QUICK.value)
+        if incremental and time.time() - self.cache.last_sweep(networks, kinds) < self.FULL_RESCAN_AFTER:
+            return self._rescan_known_hosts(networks, scan_type, callback, progress_callback)
         
         if scan_type == ScanType.QUICK:
             # Quick scan: Only find hosts with SMB (port 445) open
-            hosts = self._scan_smb_hosts(network, callback, progress_callback)
+            hosts = self._scan_smb_hosts(networks, callback, progress_callback)
         else:
             # Full scan: Find all hosts, then check for shares
-            hosts = self._scan_all_hosts(network, callback, progress_callback)
+            hosts = self._scan_all_hosts(networks, callback, progress_callback)
+        
+        self._check_hosts(hosts, callback, progress_callback)
+        
+        # Remember what we found; known hosts that didn't answer are marked
+        ports = [445] if scan_type == ScanType.QUICK else []
+        found = {h.ip for h in hosts}
+        for network in networks:
+            missing = [r.ip for r in self.cache.hosts([network]) if r.ip not in found
+                       and (scan_type == ScanType.FULL or 445 in r.ports or r.shares)]
+            self.cache.mark_missing(network, missing)
+            self.cache.mark_sweep(network, scan_type.value)
+        self._record_hosts(networks, hosts, ports)
+        self.cache.save()
+        return hosts
+    
+    def _rescan_known_hosts(self, networks: list[str], scan_type: ScanType,
+                            callback, progress_callback=None) -> list[NetworkHost]:
+        """
+        Delta rescan: probe only hosts that are new, changed or stale.
         
-        # For each host, resolve hostname and detect shares
-        callback(f"Checking {len(hosts)} host(s) for shares...")
+        New hosts are noticed through the kernel ARP table and mDNS
+        announcements (_smb._tcp), a changed MAC address marks a known IP
+        as changed, and records older than STALE_AFTER are re-probed.
+        Everything else is taken from the cache as is.
+        """
+        callback("Checking for changes since the last scan...")
+        
+        # mDNS browsing takes a few seconds; run it while we read the ARP table
+        mdns_holder = {}
+        mdns_thread = threading.Thread(
+            target=lambda: mdns_holder.update(netscan.browse_mdns('_smb._tcp')), daemon=True)
+        mdns_thread.start()
+        arp = netscan.read_arp_table()
+        mdns_thread.join()
+        
+        in_range = lambda ip: self._network_of(ip, networks) is not None
+        signal_ips = [ip for ip in list(arp) + list(mdns_holder) if in_range(ip)]
+        recheck = self.cache.stale_or_changed(networks, arp)
+        if scan_type == ScanType.QUICK:
+            # Don't let an SMB check mark hosts without SMB as gone
+            smb_hosts = {h.ip for h in self.get_cached_hosts(ScanType.QUICK, networks)}
+            recheck = [ip for ip in recheck if ip in smb_hosts]
+        candidates = list(dict.fromkeys(recheck + self.cache.unknown(networks, signal_ips)))
+        
+        if scan_type == ScanType.QUICK:
+            probe = netscan.port_probe([445], self.PROBE_TIMEOUT)
+            ports = [445]
+        else:
+            probe = netscan.liveness_probe(self.PROBE_TIMEOUT)
+            ports = []
+        
+        fresh = [h for h in self.get_cached_hosts(scan_type, networks) if h.ip not in candidates]
+        hosts = []
+        
+        def on_found(ip, _result):
+            hosts.append(NetworkHost(ip=ip, hostname=mdns_holder.get(ip) or ip, mac=arp.get(ip)))
+            callback(f"Found: {ip}")
         
-        for i, host in enumerate(hosts):
-            callback(f"Checking {host.ip}...")
+        def on_progress(done, total):
             if progress_callback:
-                progress_callback(i + 1, len(hosts), len([h for h in hosts if h.services]), "shares")
-            
+                progress_callback(done, total, len(fresh) + len(hosts), "rescan")
+        
+        if candidates:
+            callback(f"Re-checking {len(candidates)} new or changed address(es)...")
+            netscan.scan_addresses(candidates, probe, on_found, on_progress,
+                                   concurrency=self.SCAN_CONCURRENCY)
+        
+        self._check_hosts(hosts, callback, progress_callback)
+        
+        found = {h.ip for h in hosts}
+        for network in networks:
+            self.cache.mark_missing(network, [ip for ip in candidates
+                                              if ip not in found and self._network_of(ip, [network])])
+        self._record_hosts(networks, hosts, ports)
+        self.cache.save()
+        return fresh + hosts
+    
+    def _check_hosts(self, hosts: list[NetworkHost], callback, progress_callback=None):
+        """Resolve hostnames and list shares for hosts, in parallel."""
+        callback(f"Checking {len(hosts)} host(s) for shares...")
+        
+        def check_host(host: NetworkHost) -> NetworkHost:
             # Resolve hostname if not already known
             if not host.hostname or host.hostname == host.ip:
                 resolved = self.resolve_hostname(host.ip)
@@ -186,12 +304,45 @@ class NetworkScanner:
                     host.hostname = resolved
             
             # Detect SMB shares
-            shares = self._get_share_list(host.ip)
-            host.services = shares
+            host.services = self._get_share_list(host.ip)
+            return host
         
-        return hosts
-    
-    def _scan_smb_hosts(self, network: str, callback, progress_callback=None) -> list[NetworkHost]:
+        checked = 0
+        with_shares = 0
+        
+        def on_checked(host, _result):
+            nonlocal checked, with_shares
+            checked += 1
+            if host.services:
+                with_shares += 1
+                callback(f"Shares on {host.hostname or host.ip}: {', '.join(host.services)}")
+            if progress_callback:
+                progress_callback(checked, len(hosts), with_shares, "shares")
+        
+        netscan.map_concurrent(check_host, hosts, on_checked, workers=self.SHARE_WORKERS)
+    
+    def _record_hosts(self, networks: list[str], hosts: list[NetworkHost], ports: list[int]):
+        """Store hosts that answered in the discovery cache."""
+        for host in hosts:
+            network = self._network_of(host.ip, networks)
+            if network:
+                self.cache.update(network, HostRecord(
+                    ip=host.ip, hostname=host.hostname, mac=host.mac or "",
+                    ports=list(ports), shares=list(host.services)))
+    
+    @staticmethod
+    def _network_of(ip: str, networks: list[str]) -> Optional[str]:
+        """The network (of `networks`) containing ip, if any."""
+        try:
+            address = ipaddress.IPv4Address(ip)
+        except ValueError:
+            return None
+        for network in networks:
+            if address in ipaddress.IPv4Network(network, strict=False):
+                return network
+        return None
+    
+    def _scan_smb_hosts(self, networks: list[str], callback, progress_callback=None) -> list[NetworkHost]:
         """Quick scan: Find only hosts with SMB port open."""
         import shutil
         
@@ -204,7 +355,7 @@ class NetworkScanner:
             try:
                 # Scan only port 445 (SMB), only show open ports
                 result = subprocess.run(
-                    ['nmap', '-p', '445', '--open', '-oG', '-', network],
+                    ['nmap', '-p', '445', '--open', '-oG', '-', *networks],
                     capture_output=True, text=True, timeout=30
                 )
                 
@@ -228,18 +379,22 @@ class NetworkScanner:
             except Exception as e:
                 callback(f"Error: {e}")
         else:
-            # Fallback: Check common IPs for SMB
+            # Fallback: probe port 445 on every address, many at once
             callback("Quick scan: Checking for SMB shares (no nmap)...")
-            base = '.'.join(network.split('.')[:3])
-            total_ips = 254
+            addresses = [ip for network in networks for ip in netscan.host_addresses(network)]
             
-            for i in range(1, 255):
-                ip = f"{base}.{i}"
+            def on_found(ip, _ports):
+                hosts.append(NetworkHost(ip=ip, hostname=ip))
+                callback(f"Found SMB host: {ip}")
+            
+            def on_progress(done, total):
                 if progress_callback:
-                    progress_callback(i, total_ips, len(hosts), "smb_scan")
-                if self._check_smb_port(ip):
-                    hosts.append(NetworkHost(ip=ip, hostname=ip))
-                    callback(f"Found SMB host: {ip}")
+                    progress_callback(done, total, len(hosts), "smb_scan")
+            
+            netscan.scan_addresses(
+                addresses, netscan.port_probe([445], self.PROBE_TIMEOUT),
+                on_found, on_progress, concurrency=self.SCAN_CONCURRENCY,
+            )
         
         return hosts
     
@@ -256,7 +411,7 @@ class NetworkScanner:
         finally:
             sock.close()
     
-    def _scan_all_hosts(self, network: str, callback, progress_callback=None) -> list[NetworkHost]:
+    def _scan_all_hosts(self, networks: list[str], callback, progress_callback=None) -> list[NetworkHost]:
         """Full scan: Find all hosts on network."""
         import shutil
         
@@ -269,7 +424,7 @@ class NetworkScanner:
                 progress_callback(0, 1, 0, "nmap")  # nmap doesn't give per-IP progress
             try:
                 result = subprocess.run(
-                    ['nmap', '-sn', network, '-oG', '-'],
+                    ['nmap', '-sn', *networks, '-oG', '-'],
                     capture_output=True, text=True, timeout=60
                 )
                 
@@ -292,12 +447,12 @@ class NetworkScanner:
             except Exception as e:
                 callback(f"Error: {e}")
         
-        # Fallback to ARP table + ping sweep (no root needed)
+        # Fallback to ARP table + concurrent ping sweep (no root needed)
         # arp-scan requires sudo which breaks our pkexec model
         else:
-            callback("Full scan: Using ping sweep (this may take a while)...")
-            base = '.'.join(network.split('.')[:3])
-            total_ips = 254
+            callback("Full scan: Using ping sweep...")
+            addresses = [ip for network in networks for ip in netscan.host_addresses(network)]
+            in_range = set(addresses)
             
             # First, try to read existing ARP cache for quick wins
             try:
@@ -310,30 +465,28 @@ class NetworkScanner:
                     if len(parts) >= 3 and parts[0].count('.') == 3:
                         ip = parts[0]
                         mac = parts[2] if parts[2] != '(incomplete)' else ""
-                        if mac:
+                        if mac and ip in in_range:
                             hosts.append(NetworkHost(ip=ip, hostname=ip, mac=mac))
                             callback(f"Found (ARP cache): {ip}")
             except Exception:
                 pass
             
-            # Then ping sweep for anything not in cache
+            # Then sweep everything not in the cache, many addresses at once
             found_ips = {h.ip for h in hosts}
-            for i in range(1, 255):
-                ip = f"{base}.{i}"
+            
+            def on_found(ip, _alive):
+                hosts.append(NetworkHost(ip=ip, hostname=ip))
+                callback(f"Found: {ip}")
+            
+            def on_progress(done, total):
                 if progress_callback:
-                    progress_callback(i, total_ips, len(hosts), "ping_sweep")
-                if ip in found_ips:
-                    continue
-                try:
-                    result = subprocess.run(
-                        ['ping', '-c', '1', '-W', '1', ip],
-                        capture_output=True, timeout=2
-                    )
-                    if result.returncode == 0:
-                        hosts.append(NetworkHost(ip=ip, hostname=ip))
-                        callback(f"Found: {ip}")
-                except Exception:
-                    pass
+                    progress_callback(done, total, len(hosts), "ping_sweep")
+            
+            netscan.scan_addresses(
+                [ip for ip in addresses if ip not in found_ips],
+                netscan.liveness_probe(self.PROBE_TIMEOUT),
+                on_found, on_progress, concurrency=self.SCAN_CONCURRENCY,
+            )
         
         return hosts
     
@@ -2984,6 +3137,9 @@ class NetworkScanPage(Adw.NavigationPage):
         self.scanner = scanner
         self.scan_type = scan_type
         self.hosts = []
+        self.result_rows = []
+        self.scanning = False
+        self.incremental = True  # Reuse cached hosts; "Rescan Everything" turns this off
         
         self.build_ui()
         GLib.timeout_add(100, self.start_scan)
@@ -3001,6 +3157,14 @@ class NetworkScanPage(Adw.NavigationPage):
         header.set_show_start_title_buttons(False)
         toolbar_view.add_top_bar(header)
         
+        # Full rescan (ignores the discovery cache)
+        self.rescan_btn = Gtk.Button()
+        self.rescan_btn.set_icon_name("tux-view-refresh-symbolic")
+        self.rescan_btn.set_tooltip_text("Rescan Everything")
+        self.rescan_btn.set_sensitive(False)
+        self.rescan_btn.connect("clicked", self._on_rescan_clicked)
+        header.pack_end(self.rescan_btn)
+        
         scrolled = Gtk.ScrolledWindow()
         scrolled.set_vexpand(True)
         toolbar_view.set_content(scrolled)
@@ -3056,7 +3220,7 @@ class NetworkScanPage(Adw.NavigationPage):
         
         # Stats row: Elapsed | Addresses checked | Devices found | ETA
         self.stats_label = Gtk.Label()
-        self.stats_label.set_markup("<small>Elapsed: 0:00 | Checked: 0 of 254 | Found: 0 devices</small>")
+        self.stats_label.set_markup("<small>Elapsed: 0:00 | Checked: 0 | Found: 0 devices</small>")
         self.stats_label.add_css_class("dim-label")
         self.stats_label.set_margin_top(5)
         progress_box.append(self.stats_label)
@@ -3085,22 +3249,53 @@ class NetworkScanPage(Adw.NavigationPage):
     
     def start_scan(self):
         """Start the network scan."""
+        self.scanning = True
+        self.rescan_btn.set_sensitive(False)
         thread = threading.Thread(target=self._do_scan, daemon=True)
         thread.start()
         return False
     
     def _do_scan(self):
         """Run the scan."""
-        import time
-        
         def update_status(msg):
             GLib.idle_add(self._update_status, msg)
         
         def update_progress(current, total, found, phase):
             GLib.idle_add(self._update_progress, current, total, found, phase)
         
-        self.hosts = self.scanner.scan_for_shares(self.scan_type, update_status, update_progress)
-        GLib.idle_add(self._show_results)
+        # Show what earlier scans found right away, then look for changes
+        if self.incremental:
+            known = self.scanner.get_cached_hosts(self.scan_type)
+            if known:
+                GLib.idle_add(self._show_cached, known)
+        
+        hosts = self.scanner.scan_for_shares(self.scan_type, update_status, update_progress,
+                                             incremental=self.incremental)
+        GLib.idle_add(self._show_results, hosts)
+    
+    def _show_cached(self, hosts):
+        """Show hosts remembered from earlier scans while the rescan runs."""
+        self.hosts = hosts
+        self._populate_results("Known Devices (checking for changes...)")
+        self.patience_label.set_visible(False)
+    
+    def _on_rescan_clicked(self, button):
+        """Forget cached results and sweep the whole network again."""
+        if self.scanning:
+            return
+        import time
+        self.incremental = False
+        self.scan_start_time = time.time()
+        self.progress_times = []
+        self.spinner.set_visible(True)
+        self.spinner.start()
+        self.progress_bar.set_fraction(0)
+        self.progress_bar.set_visible(True)
+        self.stats_label.set_visible(True)
+        self.patience_label.set_visible(True)
+        self.status_label.set_label("Starting scan...")
+        self._clear_results()
+        self.start_scan()
     
     def _update_status(self, message):
         """Update status label."""
@@ -3157,6 +3352,8 @@ class NetworkScanPage(Adw.NavigationPage):
             phase_text = f"Checked: {current} of {total}"
         elif phase == "shares":
             phase_text = f"Checking shares: {current} of {total}"
+        elif phase == "rescan":
+            phase_text = f"Re-checked: {current} of {total}"
         else:
             phase_text = f"Checked: {current} of {total}"
         
@@ -3164,8 +3361,12 @@ class NetworkScanPage(Adw.NavigationPage):
         stats = f"<small>Elapsed: {elapsed_str} | {phase_text} | Found: {found} device(s){eta_str}</small>"
         self.stats_label.set_markup(stats)
     
-    def _show_results(self):
+    def _show_results(self, hosts):
         """Show scan results."""
+        self.hosts = hosts
+        self.scanning = False
+        self.rescan_btn.set_sensitive(True)
+        self._clear_results()
         self.spinner.stop()
         self.spinner.set_visible(False)
         self.patience_label.set_visible(False)
@@ -3192,10 +3393,23 @@ class NetworkScanPage(Adw.NavigationPage):
         else:
             self.status_label.set_label(f"Found {len(self.hosts)} device(s) ({hosts_with_shares} with shares)")
         
+        self._populate_results("Devices Found")
+    
+    def _clear_results(self):
+        """Remove all host rows."""
+        for row in self.result_rows:
+            self.results_group.remove(row)
+        self.result_rows = []
+        self.results_group.set_visible(False)
+    
+    def _populate_results(self, title: str):
+        """Fill the results group with a row per host."""
+        self._clear_results()
+        
         # Sort: hosts with shares first, then by hostname
         self.hosts.sort(key=lambda h: (0 if h.services else 1, h.hostname.lower()))
         
-        self.results_group.set_title("Devices Found")
+        self.results_group.set_title(title)
         self.results_group.set_visible(True)
         
         for host in self.hosts:
@@ -3249,6 +3463,7 @@ class NetworkScanPage(Adw.NavigationPage):
             row.add_suffix(browse_btn)
             
             self.results_group.add(row)
+            self.result_rows.append(row)
     
     def _on_browse_host(self, button, ip):
         """Browse a host's shares."""
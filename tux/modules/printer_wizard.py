@@ -13,16 +13,21 @@ import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 
+import asyncio
+import ipaddress
 import os
 import re
+import shutil
 import subprocess
 import threading
 from gi.repository import Gtk, Adw, GLib, Gio
-from typing import Optional, List, Tuple
-from dataclasses import dataclass
+from typing import Callable, Iterable, Optional, List, Tuple
+from dataclasses import dataclass, replace
 from enum import Enum
+from urllib.parse import unquote
 
 from ..core import get_distro, DistroFamily
+from ..core import netscan, printprobe
 
 from .registry import register_module, ModuleCategory
 
@@ -64,6 +69,7 @@ class DiscoveredPrinter:
     is_configured: bool               # Already set up in CUPS?
     device_id: str                    # IEEE 1284 device ID if available
     location: str                     # Network location or USB port
+    status: str = ""                  # State reported by the printer ("idle", "stopped", ...)
     
     @property
     def display_name(self) -> str:
@@ -211,36 +217,197 @@ def parse_device_id(device_id: str) -> Tuple[str, str]:
     return make, model
 
 
-def discover_usb_printers() -> List[DiscoveredPrinter]:
-    """Discover USB-connected printers."""
-    printers = []
-    
-    # Find lpinfo command (may be in /usr/sbin on some distros)
+# Discovery tuning
+PRINTER_PORTS = (9100, 631, 515)   # Raw/JetDirect, IPP, LPD - in order of preference
+SWEEP_TIMEOUT = 1.5                # Seconds per connection while sweeping a network
+PROBE_TIMEOUT = 3.0                # Seconds per port when probing one address
+SWEEP_MAX_NETWORKS = 2             # Local networks swept for printer ports
+LPINFO_NETWORK_TIMEOUT = 30        # CUPS waits on its own SNMP/DNS-SD backends
+AVAHI_TIMEOUT = 15
+
+NETWORK_SCHEMES = ('socket://', 'ipp://', 'ipps://', 'lpd://', 'dnssd://')
+
+# When several methods find the same device, keep the URI with the earliest
+# scheme here: dnssd URIs survive address changes, raw addresses come last
+_URI_PREFERENCE = ('usb', 'dnssd', 'ipps', 'ipp', 'socket', 'lpd')
+
+
+def _uri_rank(uri: str) -> int:
+    scheme = uri.split('://', 1)[0]
+    return _URI_PREFERENCE.index(scheme) if scheme in _URI_PREFERENCE else len(_URI_PREFERENCE)
+
+
+def _uri_host(uri: str) -> str:
+    """Host part of a device URI ("ipp://10.0.0.5:631/ipp/print" -> "10.0.0.5")."""
+    if '://' not in uri:
+        return ""
+    return uri.split('://', 1)[1].split('/')[0].split(':')[0]
+
+
+def _is_address(text: str) -> bool:
+    try:
+        ipaddress.ip_address(text)
+        return True
+    except ValueError:
+        return False
+
+
+def _avahi_unescape(text: str) -> str:
+    """Undo avahi-browse -p escaping ("HP\\032LaserJet" -> "HP LaserJet")."""
+    text = re.sub(r'\\(\d{3})', lambda m: chr(int(m.group(1))), text)
+    return re.sub(r'\\(.)', r'\1', text)
+
+
+def _split_make_model(name: str) -> Tuple[str, str]:
+    """Guess make and model from a service name like "HP LaserJet Pro"."""
+    parts = name.split(' ', 1)
+    return parts[0], parts[1] if len(parts) > 1 else ""
+
+
+def _merge_printer(into: DiscoveredPrinter, other: DiscoveredPrinter) -> bool:
+    """Fold what `other` knows into `into`; True if anything changed."""
+    changed = False
+    if _uri_rank(other.uri) < _uri_rank(into.uri):
+        into.uri = other.uri
+        changed = True
+    if other.model and not into.model:
+        into.make = other.make or into.make
+        into.model = other.model
+        into.name = other.name
+        changed = True
+    if other.device_id and not into.device_id:
+        into.device_id = other.device_id
+        changed = True
+    if other.status and other.status != into.status:
+        into.status = other.status
+        changed = True
+    if _is_address(other.location) and not _is_address(into.location):
+        into.location = other.location
+        changed = True
+    brand = detect_brand(into.make, into.model, into.uri)
+    if brand != into.brand:
+        into.brand = brand
+        changed = True
+    return changed
+
+
+class _PrinterGroup:
+    """One physical device and every URI it was found under."""
+    __slots__ = ('printer', 'uris')
+
+    def __init__(self, printer: DiscoveredPrinter):
+        self.printer = printer
+        self.uris = {printer.uri}
+
+
+class PrinterCollector:
+    """
+    Merges printers reported by several discovery methods running at once.
+
+    Methods often see the same device (CUPS' dnssd backend, avahi and the
+    port sweep all find a networked IPP printer), so every report carries
+    identity keys - host addresses, mDNS service names, USB URIs - and
+    reports sharing a key become one printer. Thread-safe.
+    """
+
+    def __init__(self, configured_uris: Iterable[str] = (),
+                 on_change: Optional[Callable[[List[DiscoveredPrinter]], None]] = None):
+        """
+        Args:
+            configured_uris: URIs already set up in CUPS
+            on_change: Called with a fresh list of merged printers whenever
+                one is added or learns something new (from the reporting
+                method's thread)
+        """
+        self._configured = set(configured_uris)
+        self._on_change = on_change
+        self._groups: List[_PrinterGroup] = []
+        self._by_key: dict = {}
+        self._lock = threading.Lock()
+
+    def add(self, printer: DiscoveredPrinter, keys: Iterable[Tuple[str, str]]):
+        """Report a printer found under the given (kind, value) identity keys."""
+        keys = [(kind, value.lower()) for kind, value in keys if value]
+        with self._lock:
+            matches = []
+            for key in keys:
+                group = self._by_key.get(key)
+                if group is not None and group not in matches:
+                    matches.append(group)
+
+            if matches:
+                group = matches[0]
+                changed = _merge_printer(group.printer, printer)
+                group.uris.add(printer.uri)
+                # This report links devices that looked separate until now
+                for other in matches[1:]:
+                    _merge_printer(group.printer, other.printer)
+                    group.uris |= other.uris
+                    self._groups.remove(other)
+                    for key, owner in self._by_key.items():
+                        if owner is other:
+                            self._by_key[key] = group
+                    changed = True
+            else:
+                group = _PrinterGroup(printer)
+                self._groups.append(group)
+                changed = True
+
+            for key in keys:
+                self._by_key[key] = group
+
+            configured = not group.uris.isdisjoint(self._configured)
+            if configured != group.printer.is_configured:
+                group.printer.is_configured = configured
+                changed = True
+
+            snapshot = self._snapshot() if changed else None
+
+        if snapshot is not None and self._on_change:
+            self._on_change(snapshot)
+
+    def _snapshot(self) -> List[DiscoveredPrinter]:
+        # Copies, so the UI never sees a printer being merged
+        return [replace(group.printer) for group in self._groups]
+
+    def printers(self) -> List[DiscoveredPrinter]:
+        """The merged printers found so far."""
+        with self._lock:
+            return self._snapshot()
+
+
+PrinterFound = Callable[[DiscoveredPrinter, List[Tuple[str, str]]], None]
+
+
+def _lpinfo_devices(args: List[str], timeout: Optional[int] = None) -> List[Tuple[str, str]]:
+    """(backend type, URI) pairs from `lpinfo -v`, filtered by extra args."""
     lpinfo_cmd = find_lpinfo()
     if not lpinfo_cmd:
-        return printers
+        return []
+
+    result = subprocess.run(
+        [lpinfo_cmd, *args, '-v'],
+        capture_output=True, text=True,
+        timeout=timeout
+    )
+    if result.returncode != 0:
+        return []
+
+    devices = []
+    for line in result.stdout.strip().split('\n'):
+        # Format: "direct usb://HP/LaserJet%201018?serial=..."
+        parts = line.split(None, 1)
+        if len(parts) == 2:
+            devices.append((parts[0], parts[1]))
+    return devices
+
+
+def _discover_usb(found: PrinterFound):
+    """Method 1: USB devices from CUPS (only the usb backend, so it's quick)."""
+    lpinfo_cmd = find_lpinfo()
     
     try:
-        # Use lpinfo to find USB devices
-        result = subprocess.run(
-            [lpinfo_cmd, '-v'],
-            capture_output=True, text=True
-        )
-        
-        if result.returncode != 0:
-            return printers
-        
-        for line in result.stdout.strip().split('\n'):
-            if not line:
-                continue
-            
-            # Format: "direct usb://HP/LaserJet%201018?serial=..."
-            parts = line.split(None, 1)
-            if len(parts) < 2:
-                continue
-            
-            backend_type, uri = parts
-            
+        for backend_type, uri in _lpinfo_devices(['--include-schemes', 'usb']):
             # Only USB devices
             if not uri.startswith('usb://'):
                 continue
@@ -279,349 +446,255 @@ def discover_usb_printers() -> List[DiscoveredPrinter]:
             
             brand = detect_brand(make, model, uri)
             
-            printers.append(DiscoveredPrinter(
+            found(DiscoveredPrinter(
                 uri=uri,
                 name=f"{make} {model}".strip() or "USB Printer",
                 make=make,
                 model=model,
                 connection_type=PrinterConnectionType.USB,
                 brand=brand,
-                is_configured=False,  # Will check later
+                is_configured=False,
                 device_id=device_id,
                 location="USB"
-            ))
+            ), [('usb', uri)])
     
+    except subprocess.TimeoutExpired:
+        print("USB printer discovery timed out")
     except Exception as e:
         print(f"Error discovering USB printers: {e}")
-    
-    return printers
 
 
-def discover_network_printers() -> List[DiscoveredPrinter]:
-    """Discover network printers via various methods."""
-    printers = []
-    seen_uris = set()
+def _discover_lpinfo_network(found: PrinterFound):
+    """Method 2: CUPS network backends (snmp, dnssd, ...)."""
+    try:
+        devices = _lpinfo_devices(['--exclude-schemes', 'usb'], LPINFO_NETWORK_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        print("Network printer discovery timed out")
+        return
+    except Exception as e:
+        print(f"Error with lpinfo network discovery: {e}")
+        return
     
-    # Find lpinfo command (may be in /usr/sbin on some distros)
-    lpinfo_cmd = find_lpinfo()
+    for backend_type, uri in devices:
+        if not uri.startswith(NETWORK_SCHEMES):
+            continue
+        
+        make = ""
+        model = ""
+        location = _uri_host(uri)
+        keys = [('uri', uri)]
+        
+        # dnssd URIs carry the mDNS service name, often "MAKE MODEL":
+        # dnssd://HP%20LaserJet%20Pro._ipp._tcp.local/?uuid=...
+        if uri.startswith('dnssd://'):
+            service = unquote(uri[len('dnssd://'):].split('._', 1)[0])
+            make, model = _split_make_model(service)
+            keys.append(('service', service))
+        else:
+            keys.append(('host', location))
+        
+        brand = detect_brand(make, model, uri)
+        
+        found(DiscoveredPrinter(
+            uri=uri,
+            name=f"{make} {model}".strip() or f"Network Printer ({location})",
+            make=make,
+            model=model,
+            connection_type=PrinterConnectionType.NETWORK,
+            brand=brand,
+            is_configured=False,
+            device_id="",
+            location=location
+        ), keys)
+
+
+def _discover_avahi(found: PrinterFound):
+    """Method 3: IPP printers announced over mDNS (if avahi-browse is available)."""
+    if not shutil.which('avahi-browse'):
+        return
     
-    # Method 1: CUPS lpinfo network discovery (increased timeout)
-    if lpinfo_cmd:
-        try:
-            result = subprocess.run(
-                [lpinfo_cmd, '-v'],
-                capture_output=True, text=True,
-                timeout=30  # Increased from 10 to 30 seconds
-            )
-            
-            if result.returncode == 0:
-                for line in result.stdout.strip().split('\n'):
-                    if not line:
-                        continue
-                    
-                    parts = line.split(None, 1)
-                    if len(parts) < 2:
-                        continue
-                    
-                    backend_type, uri = parts
-                    
-                    # Network protocols
-                    if any(uri.startswith(proto) for proto in ['socket://', 'ipp://', 'ipps://', 'lpd://', 'dnssd://']):
-                        if uri in seen_uris:
-                            continue
-                        seen_uris.add(uri)
-                        
-                        # Parse network URI for make/model
-                        make = ""
-                        model = ""
-                        location = ""
-                        
-                        # Extract hostname/IP
-                        if '://' in uri:
-                            location = uri.split('://')[1].split('/')[0].split(':')[0]
-                        
-                        # dnssd URIs often have make/model encoded
-                        if uri.startswith('dnssd://'):
-                            # dnssd://MAKE%20MODEL._ipp._tcp.local/...
-                            name_part = uri.replace('dnssd://', '').split('.')[0]
-                            name_part = name_part.replace('%20', ' ')
-                            parts = name_part.split(' ', 1)
-                            if len(parts) >= 1:
-                                make = parts[0]
-                            if len(parts) >= 2:
-                                model = parts[1]
-                        
-                        brand = detect_brand(make, model, uri)
-                        
-                        printers.append(DiscoveredPrinter(
-                            uri=uri,
-                            name=f"{make} {model}".strip() or f"Network Printer ({location})",
-                            make=make,
-                            model=model,
-                            connection_type=PrinterConnectionType.NETWORK,
-                            brand=brand,
-                            is_configured=False,
-                            device_id="",
-                            location=location
-                        ))
-        
-        except subprocess.TimeoutExpired:
-            print("Network printer discovery timed out")
-        except Exception as e:
-            print(f"Error with lpinfo network discovery: {e}")
-    
-    # Method 2: Avahi/mDNS discovery (if available)
     try:
-        result = subprocess.run(['which', 'avahi-browse'], capture_output=True)
-        if result.returncode == 0:
-            # Quick browse for IPP printers (increased timeout)
-            result = subprocess.run(
-                ['avahi-browse', '-t', '-r', '-p', '_ipp._tcp'],
-                capture_output=True, text=True,
-                timeout=15  # Increased from 5 to 15 seconds
-            )
-            
-            if result.returncode == 0:
-                for line in result.stdout.strip().split('\n'):
-                    if not line or not line.startswith('='):
-                        continue
-                    
-                    # Parse avahi-browse parseable output
-                    # =;interface;protocol;name;type;domain;hostname;address;port;txt
-                    parts = line.split(';')
-                    if len(parts) >= 8:
-                        name = parts[3]
-                        hostname = parts[6]
-                        address = parts[7]
-                        port = parts[8] if len(parts) > 8 else "631"
-                        
-                        uri = f"ipp://{address}:{port}/ipp/print"
-                        
-                        if uri not in seen_uris:
-                            seen_uris.add(uri)
-                            
-                            # Try to parse make/model from name
-                            make = ""
-                            model = ""
-                            name_parts = name.split(' ', 1)
-                            if len(name_parts) >= 1:
-                                make = name_parts[0]
-                            if len(name_parts) >= 2:
-                                model = name_parts[1]
-                            
-                            brand = detect_brand(make, model, uri)
-                            
-                            printers.append(DiscoveredPrinter(
-                                uri=uri,
-                                name=name or f"Network Printer ({address})",
-                                make=make,
-                                model=model,
-                                connection_type=PrinterConnectionType.NETWORK,
-                                brand=brand,
-                                is_configured=False,
-                                device_id="",
-                                location=address
-                            ))
-    
+        result = subprocess.run(
+            ['avahi-browse', '-t', '-r', '-p', '_ipp._tcp'],
+            capture_output=True, text=True,
+            timeout=AVAHI_TIMEOUT
+        )
     except subprocess.TimeoutExpired:
         print("Avahi discovery timed out")
+        return
     except Exception as e:
         print(f"Error with Avahi discovery: {e}")
+        return
     
-    # Method 3: SNMP discovery for older printers (if snmpwalk available)
-    try:
-        result = subprocess.run(['which', 'snmpwalk'], capture_output=True)
-        if result.returncode == 0:
-            # Get local network range
-            local_ips = _get_local_network_ranges()
-            
-            for network in local_ips[:2]:  # Limit to first 2 networks to avoid long scans
-                try:
-                    # Use nmap for SNMP printer discovery if available
-                    nmap_result = subprocess.run(['which', 'nmap'], capture_output=True)
-                    if nmap_result.returncode == 0:
-                        # Quick scan for port 9100 (raw printing) and 631 (IPP)
-                        scan_result = subprocess.run(
-                            ['nmap', '-p', '9100,631', '--open', '-oG', '-', network],
-                            capture_output=True, text=True,
-                            timeout=30
-                        )
-                        
-                        if scan_result.returncode == 0:
-                            for line in scan_result.stdout.split('\n'):
-                                if 'open' in line and 'Host:' in line:
-                                    # Extract IP: "Host: 192.168.1.50 ()"
-                                    parts = line.split()
-                                    for i, part in enumerate(parts):
-                                        if part == 'Host:' and i + 1 < len(parts):
-                                            ip = parts[i + 1]
-                                            if ip and ip not in seen_uris:
-                                                # Determine which port is open
-                                                if '9100/open' in line:
-                                                    uri = f"socket://{ip}:9100"
-                                                else:
-                                                    uri = f"ipp://{ip}:631/ipp/print"
-                                                
-                                                if uri not in seen_uris:
-                                                    seen_uris.add(uri)
-                                                    printers.append(DiscoveredPrinter(
-                                                        uri=uri,
-                                                        name=f"Network Printer ({ip})",
-                                                        make="",
-                                                        model="",
-                                                        connection_type=PrinterConnectionType.NETWORK,
-                                                        brand=PrinterBrand.GENERIC,
-                                                        is_configured=False,
-                                                        device_id="",
-                                                        location=ip
-                                                    ))
-                except subprocess.TimeoutExpired:
-                    print(f"Network scan timed out for {network}")
-                except Exception as e:
-                    print(f"Error scanning network {network}: {e}")
-    except Exception as e:
-        print(f"Error with SNMP/nmap discovery: {e}")
+    if result.returncode != 0:
+        return
     
-    return printers
+    for line in result.stdout.strip().split('\n'):
+        # Parse avahi-browse parseable output
+        # =;interface;protocol;name;type;domain;hostname;address;port;txt
+        parts = line.split(';')
+        if len(parts) < 8 or parts[0] != '=' or parts[2] != 'IPv4':
+            continue
+        
+        name = _avahi_unescape(parts[3])
+        hostname = parts[6]
+        address = parts[7]
+        port = parts[8] if len(parts) > 8 and parts[8] else "631"
+        
+        uri = f"ipp://{address}:{port}/ipp/print"
+        make, model = _split_make_model(name)
+        
+        found(DiscoveredPrinter(
+            uri=uri,
+            name=name or f"Network Printer ({address})",
+            make=make,
+            model=model,
+            connection_type=PrinterConnectionType.NETWORK,
+            brand=detect_brand(make, model, uri),
+            is_configured=False,
+            device_id="",
+            location=address
+        ), [('service', name), ('host', address), ('host', hostname)])
+
+
+def _make_model_from_description(desc: str) -> Tuple[str, str]:
+    """Split a description like "HP LaserJet Pro MFP" into make and model."""
+    desc_lower = desc.lower()
+    if 'hp' in desc_lower or 'hewlett' in desc_lower:
+        return "HP", desc.replace('HP', '').replace('Hewlett-Packard', '').strip()
+    elif 'brother' in desc_lower:
+        return "Brother", desc.replace('Brother', '').strip()
+    elif 'canon' in desc_lower:
+        return "Canon", desc.replace('Canon', '').strip()
+    elif 'epson' in desc_lower:
+        return "Epson", desc.replace('Epson', '').replace('EPSON', '').strip()
+    # Use full description as model
+    return "", desc
+
+
+def _printer_from_ports(ip_address: str, ports: List[int],
+                        details: Optional[printprobe.PrinterDetails] = None) -> DiscoveredPrinter:
+    """A network printer at an address, using the best of its open printer ports."""
+    port = next(p for p in PRINTER_PORTS if p in ports)
+    if port == 9100:
+        uri = f"socket://{ip_address}:{port}"
+    elif port == 631:
+        uri = f"ipp://{ip_address}:{port}/ipp/print"
+    else:
+        uri = f"lpd://{ip_address}/lp"
+    
+    # What the printer said about itself over SNMP/IPP, if anything
+    make = model = device_id = status = ""
+    if details:
+        device_id = details.device_id
+        status = details.state
+        make, model = parse_device_id(device_id) if device_id else ("", "")
+        if not model and details.make_and_model:
+            make, model = _make_model_from_description(details.make_and_model)
+    
+    return DiscoveredPrinter(
+        uri=uri,
+        name=f"{make} {model}".strip() or f"Network Printer ({ip_address})",
+        make=make,
+        model=model,
+        connection_type=PrinterConnectionType.NETWORK,
+        brand=detect_brand(make, model, uri),
+        is_configured=False,
+        device_id=device_id,
+        location=ip_address,
+        status=status
+    )
 
 
-def _get_local_network_ranges() -> List[str]:
-    """Get local network CIDR ranges for scanning."""
-    networks = []
-    
+def _discover_port_sweep(found: PrinterFound):
+    """Method 4: sweep the local networks for open printer ports."""
     try:
-        # Use ip command to get network info
-        result = subprocess.run(
-            ['ip', '-4', 'addr', 'show'],
-            capture_output=True, text=True
-        )
+        local = netscan.local_networks()[:SWEEP_MAX_NETWORKS]
+        own = {ip for ip, _network in local}
+        addresses = [ip for _ip, network in local
+                     for ip in netscan.host_addresses(network) if ip not in own]
+        hits = {}
         
-        if result.returncode == 0:
-            for line in result.stdout.split('\n'):
-                if 'inet ' in line and '127.0.0.1' not in line:
-                    # Extract CIDR: "inet 192.168.1.100/24 brd..."
-                    parts = line.strip().split()
-                    for i, part in enumerate(parts):
-                        if part == 'inet' and i + 1 < len(parts):
-                            cidr = parts[i + 1]
-                            # Convert to network range (e.g., 192.168.1.0/24)
-                            if '/' in cidr:
-                                ip, mask = cidr.split('/')
-                                ip_parts = ip.split('.')
-                                if len(ip_parts) == 4:
-                                    # Simple /24 assumption for scanning
-                                    network = f"{ip_parts[0]}.{ip_parts[1]}.{ip_parts[2]}.0/24"
-                                    if network not in networks:
-                                        networks.append(network)
+        def on_hit(ip, ports):
+            hits[ip] = ports
+            found(_printer_from_ports(ip, ports), [('host', ip)])
+        
+        netscan.scan_addresses(addresses, netscan.port_probe(PRINTER_PORTS, SWEEP_TIMEOUT), on_hit)
+        
+        # Then ask every printer found what it is, all at once
+        def on_details(details):
+            keys = [('host', details.address), ('serial', details.serial)]
+            found(_printer_from_ports(details.address, hits[details.address], details), keys)
+        
+        printprobe.query_printers(list(hits), on_details)
     except Exception as e:
-        print(f"Error getting network ranges: {e}")
-    
-    return networks
+        print(f"Error sweeping network for printers: {e}")
 
 
-def probe_printer_at_ip(ip_address: str) -> Optional[DiscoveredPrinter]:
-    """Probe a specific IP address for a printer.
-    
-    Tries common printer ports and protocols to detect a printer.
-    Returns a DiscoveredPrinter if found, None otherwise.
+def discover_printers(on_change: Optional[Callable[[List[DiscoveredPrinter]], None]] = None,
+                      usb: bool = True, network: bool = True) -> List[DiscoveredPrinter]:
     """
-    import socket
-    
-    # Ports to check: 9100 (raw/JetDirect), 631 (IPP), 515 (LPD)
-    ports_to_check = [
-        (9100, 'socket', 'Raw/JetDirect'),
-        (631, 'ipp', 'IPP'),
-        (515, 'lpd', 'LPD'),
-    ]
-    
-    for port, protocol, desc in ports_to_check:
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(3)  # 3 second timeout per port
-            result = sock.connect_ex((ip_address, port))
-            sock.close()
-            
-            if result == 0:  # Port is open
-                # Build URI based on protocol
-                if protocol == 'socket':
-                    uri = f"socket://{ip_address}:{port}"
-                elif protocol == 'ipp':
-                    uri = f"ipp://{ip_address}:{port}/ipp/print"
-                elif protocol == 'lpd':
-                    uri = f"lpd://{ip_address}/lp"
-                else:
-                    continue
-                
-                # Try to get more info via SNMP if available
-                make, model = _snmp_get_printer_info(ip_address)
-                brand = detect_brand(make, model, uri)
-                
-                return DiscoveredPrinter(
-                    uri=uri,
-                    name=f"{make} {model}".strip() or f"Printer at {ip_address}",
-                    make=make,
-                    model=model,
-                    connection_type=PrinterConnectionType.NETWORK,
-                    brand=brand,
-                    is_configured=False,
-                    device_id="",
-                    location=ip_address
-                )
-        except Exception:
-            continue
+    Discover printers with every available method at once.
+    
+    USB listing, CUPS' network backends, mDNS browsing and a port sweep
+    run in parallel, so a scan takes as long as the slowest method rather
+    than all of them added up. Results are merged per device as they
+    arrive (see PrinterCollector).
+    
+    Args:
+        on_change: Called from a worker thread with the merged list each
+            time a printer is found or updated
+        usb: Include USB printers
+        network: Include network printers
+    """
+    methods = []
+    if usb:
+        methods.append(_discover_usb)
+    if network:
+        methods += [_discover_lpinfo_network, _discover_avahi, _discover_port_sweep]
     
-    return None
+    collector = PrinterCollector(get_configured_printers(), on_change)
+    netscan.map_concurrent(lambda method: method(collector.add), methods)
+    return collector.printers()
+
+
+def discover_usb_printers() -> List[DiscoveredPrinter]:
+    """Discover USB-connected printers."""
+    return discover_printers(network=False)
+
+
+def discover_network_printers() -> List[DiscoveredPrinter]:
+    """Discover network printers via various methods."""
+    return discover_printers(usb=False)
 
 
-def _snmp_get_printer_info(ip_address: str) -> Tuple[str, str]:
-    """Try to get printer make/model via SNMP.
+def probe_printer_at_ip(ip_address: str) -> Optional[DiscoveredPrinter]:
+    """Probe a specific IP address for a printer.
     
-    Returns (make, model) tuple, empty strings if not available.
+    Checks the common printer ports (9100 raw/JetDirect, 631 IPP, 515 LPD)
+    and asks for make/model over SNMP and IPP, all at once.
+    Returns a DiscoveredPrinter if found, None otherwise.
     """
-    make = ""
-    model = ""
+    async def probe():
+        async with printprobe.SnmpClient(timeout=PROBE_TIMEOUT, retries=0) as snmp:
+            details = asyncio.ensure_future(
+                printprobe.probe_printer(ip_address, snmp, timeout=PROBE_TIMEOUT))
+            ports = await netscan.open_ports(ip_address, PRINTER_PORTS, PROBE_TIMEOUT)
+            if not ports:
+                # Not a printer; don't wait for SNMP to time out
+                details.cancel()
+                return ports, None
+            return ports, await details
     
     try:
-        # Check if snmpget is available
-        result = subprocess.run(['which', 'snmpget'], capture_output=True)
-        if result.returncode != 0:
-            return make, model
-        
-        # Standard Printer MIB OIDs
-        # hrDeviceDescr.1 - Device description
-        oid = "1.3.6.1.2.1.25.3.2.1.3.1"
-        
-        result = subprocess.run(
-            ['snmpget', '-v1', '-c', 'public', '-t', '2', ip_address, oid],
-            capture_output=True, text=True,
-            timeout=5
-        )
-        
-        if result.returncode == 0 and 'STRING:' in result.stdout:
-            # Parse: "SNMPv2-SMI::...hrDeviceDescr.1 = STRING: HP LaserJet Pro MFP"
-            desc = result.stdout.split('STRING:')[-1].strip().strip('"')
-            
-            # Try to extract make and model
-            desc_lower = desc.lower()
-            if 'hp' in desc_lower or 'hewlett' in desc_lower:
-                make = "HP"
-                model = desc.replace('HP', '').replace('Hewlett-Packard', '').strip()
-            elif 'brother' in desc_lower:
-                make = "Brother"
-                model = desc.replace('Brother', '').strip()
-            elif 'canon' in desc_lower:
-                make = "Canon"
-                model = desc.replace('Canon', '').strip()
-            elif 'epson' in desc_lower:
-                make = "Epson"
-                model = desc.replace('Epson', '').replace('EPSON', '').strip()
-            else:
-                # Use full description as model
-                model = desc
-    except Exception:
-        pass
+        ports, details = asyncio.run(probe())
+    except OSError as e:
+        print(f"Error probing {ip_address}: {e}")
+        return None
     
-    return make, model
+    if not ports:
+        return None
+    return _printer_from_ports(ip_address, ports, details)
 
 
 def get_configured_printers() -> List[str]:
@@ -647,19 +720,10 @@ def get_configured_printers() -> List[str]:
     return configured
 
 
-def discover_all_printers() -> List[DiscoveredPrinter]:
-    """Discover all printers (USB and network)."""
-    usb_printers = discover_usb_printers()
-    network_printers = discover_network_printers()
-    
-    all_printers = usb_printers + network_printers
-    
-    # Mark configured printers
-    configured_uris = get_configured_printers()
-    for printer in all_printers:
-        printer.is_configured = printer.uri in configured_uris
-    
-    return all_printers
+def discover_all_printers(on_change: Optional[Callable[[List[DiscoveredPrinter]], None]] = None
+                          ) -> List[DiscoveredPrinter]:
+    """Discover all printers (USB and network), see discover_printers()."""
+    return discover_printers(on_change)
 
 
 # =============================================================================
@@ -2102,9 +2166,24 @@ class PrinterWizardPage(Adw.NavigationPage):
         self.printer_rows.clear()
         
         # Show scanning indicator
+        self._add_scanning_row("Scanning for printers...", "Checking USB and network connections")
+        
+        # Start discovery in background; printers are listed as soon as
+        # any method finds them, the final list arrives when all are done
+        def on_change(printers):
+            GLib.idle_add(self._update_printers, printers, False)
+        
+        def discover():
+            printers = discover_all_printers(on_change)
+            GLib.idle_add(self._update_printers, printers)
+        
+        threading.Thread(target=discover, daemon=True).start()
+    
+    def _add_scanning_row(self, title: str, subtitle: str):
+        """Add a row with a spinner to the printers list."""
         scanning_row = Adw.ActionRow()
-        scanning_row.set_title("Scanning for printers...")
-        scanning_row.set_subtitle("Checking USB and network connections")
+        scanning_row.set_title(title)
+        scanning_row.set_subtitle(subtitle)
         
         spinner = Gtk.Spinner()
         spinner.start()
@@ -2112,18 +2191,15 @@ class PrinterWizardPage(Adw.NavigationPage):
         
         self.printers_group.add(scanning_row)
         self.printer_rows.append(scanning_row)
-        
-        # Start discovery in background
-        def discover():
-            printers = discover_all_printers()
-            GLib.idle_add(self._update_printers, printers)
-        
-        threading.Thread(target=discover, daemon=True).start()
     
-    def _update_printers(self, printers: List[DiscoveredPrinter]):
-        """Update the printers list."""
-        self.is_scanning = False
-        self.refresh_btn.set_sensitive(True)
+    def _update_printers(self, printers: List[DiscoveredPrinter], finished: bool = True):
+        """Update the printers list (partial results while still scanning)."""
+        if finished:
+            self.is_scanning = False
+            self.refresh_btn.set_sensitive(True)
+        elif not printers:
+            # Keep the scanning row until something turns up
+            return
         self.discovered_printers = printers
         
         # Clear existing rows
@@ -2171,6 +2247,9 @@ class PrinterWizardPage(Adw.NavigationPage):
                 row = self._create_printer_row(printer)
                 self.printers_group.add(row)
                 self.printer_rows.append(row)
+        
+        if not finished:
+            self._add_scanning_row("Still scanning...", "More printers may appear")
     
     def _create_printer_row(self, printer: DiscoveredPrinter) -> Adw.ActionRow:
         """Create a row for a discovered printer."""
@@ -2183,6 +2262,8 @@ class PrinterWizardPage(Adw.NavigationPage):
             subtitle_parts.append(printer.brand.value.upper())
         if printer.location:
             subtitle_parts.append(printer.location)
+        if printer.status and printer.status != "idle":
+            subtitle_parts.append(printer.status.capitalize())
         if printer.is_configured:
             subtitle_parts.append("✓ Configured")
         
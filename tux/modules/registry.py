@@ -15,9 +15,12 @@ from gi.repository import Gtk, Gio
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Optional, Callable, Type
+import functools
 import importlib
 import os
 
+from ..core import profiling
+
 
 # =============================================================================
 # Icon Utilities - Cross-DE, Cross-Distro Icon Loading
@@ -153,6 +156,17 @@ class ModuleInfo:
     # Optional: Callable that returns dynamic description based on system state
     description_func: Optional[Callable] = None
     
+    # Manifest entries: python module (in tux.modules) that defines the page,
+    # imported on first use, and extra search keywords
+    module: Optional[str] = None
+    keywords: tuple = ()
+    
+    def get_page_class(self) -> Optional[Type]:
+        """Get the page class, importing the module if it isn't loaded yet."""
+        if self.page_class is None and self.module:
+            ModuleRegistry.load_module(self.module)
+        return self.page_class
+    
     def get_description(self, **kwargs) -> str:
         """Get description, optionally dynamic based on system state."""
         if self.description_func:
@@ -160,6 +174,17 @@ class ModuleInfo:
         return self.description
 
 
+@dataclass
+class SearchEntry:
+    """Searchable content inside a module (an app, a help topic, ...)."""
+    title: str
+    description: str = ""
+    keywords: str = ""
+    icon: str = ""
+    # Called with the main window to open the entry; None opens the module page
+    open_func: Optional[Callable] = None
+
+
 class ModuleRegistry:
     """
     Central registry for all toolkit modules.
@@ -170,18 +195,33 @@ class ModuleRegistry:
     
     _instance = None
     _modules: dict[str, ModuleInfo] = {}
+    _search_providers: dict[str, Callable[[], list[SearchEntry]]] = {}
+    _generation: int = 0
+    _loaded: set[str] = set()  # Python modules imported so far
+    _failed: set[str] = set()  # Python modules whose import raised
+    _manifest_providers: set[str] = set()  # Module IDs with a manifest search provider
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance._modules = {}
+            cls._instance._search_providers = {}
         return cls._instance
     
     @classmethod
     def register(cls, module_info: ModuleInfo):
         """Register a module with the registry."""
         registry = cls()
+        existing = registry._modules.get(module_info.id)
+        if existing is not None and existing.module and existing.page_class is None:
+            # The real module for a manifest entry was imported: fill in the
+            # page in place, so rows already holding the entry can open it
+            existing.page_class = module_info.page_class
+            existing.enabled = module_info.enabled
+            existing.description_func = module_info.description_func
+            return
         registry._modules[module_info.id] = module_info
+        cls._generation += 1
     
     @classmethod
     def unregister(cls, module_id: str):
@@ -189,6 +229,38 @@ class ModuleRegistry:
         registry = cls()
         if module_id in registry._modules:
             del registry._modules[module_id]
+            registry._search_providers.pop(module_id, None)
+            cls._manifest_providers.discard(module_id)
+            cls._generation += 1
+    
+    @classmethod
+    def generation(cls) -> int:
+        """Counter bumped on every registry change (for cache invalidation)."""
+        return cls._generation
+    
+    @classmethod
+    def register_search_provider(cls, module_id: str,
+                                 provider: Callable[[], list[SearchEntry]]):
+        """
+        Register a function returning searchable content for a module.
+        
+        Providers are called when the search index is (re)built, possibly
+        from a background thread, so they must not touch GTK widgets.
+        """
+        registry = cls()
+        registry._search_providers[module_id] = provider
+        if module_id in cls._manifest_providers:
+            # The module behind a manifest provider was imported; it
+            # returns the same entries, so indexes built so far stay valid
+            cls._manifest_providers.discard(module_id)
+            return
+        cls._generation += 1
+    
+    @classmethod
+    def get_search_providers(cls) -> dict[str, Callable[[], list[SearchEntry]]]:
+        """Get registered search providers by module ID."""
+        registry = cls()
+        return dict(registry._search_providers)
     
     @classmethod
     def get_module(cls, module_id: str) -> Optional[ModuleInfo]:
@@ -228,22 +300,109 @@ class ModuleRegistry:
         return [c for c in ModuleCategory if c in categories]
     
     @classmethod
-    def discover_modules(cls):
+    def _manifest_search_entries(cls, module_name: str, function: str) -> list[SearchEntry]:
+        """Import a manifest module and call its search provider."""
+        if not cls.load_module(module_name):
+            return []
+        module = importlib.import_module(f'.{module_name}', package='tux.modules')
+        return getattr(module, function)()
+    
+    @classmethod
+    def load_manifest(cls):
+        """Register the built-in modules from the manifest without importing them."""
+        from .manifest import MODULE_MANIFEST, SEARCH_PROVIDERS
+        
+        registry = cls()
+        for (module_id, name, description, icon, category,
+             order, module, keywords) in MODULE_MANIFEST:
+            if module_id in registry._modules:
+                continue
+            cls.register(ModuleInfo(
+                id=module_id,
+                name=name,
+                description=description,
+                icon=icon,
+                category=ModuleCategory[category],
+                order=order,
+                module=module,
+                keywords=tuple(keywords),
+            ))
+        
+        for module_id, (module, function) in SEARCH_PROVIDERS.items():
+            if module_id in registry._modules and module_id not in registry._search_providers:
+                cls.register_search_provider(
+                    module_id, functools.partial(cls._manifest_search_entries, module, function))
+                cls._manifest_providers.add(module_id)
+    
+    @classmethod
+    def load_module(cls, module_name: str) -> bool:
+        """
+        Import a module from the modules directory (once).
+        
+        Returns:
+            True if the module is loaded
+        """
+        if module_name in cls._loaded:
+            return True
+        try:
+            # Import the module - it registers itself
+            with profiling.span(f"module {module_name}", "module"):
+                importlib.import_module(f'.{module_name}', package='tux.modules')
+        except Exception as e:
+            import traceback
+            print(f"Warning: Failed to load module '{module_name}': {e}")
+            traceback.print_exc()
+            cls._failed.add(module_name)
+            return False
+        cls._failed.discard(module_name)
+        cls._loaded.add(module_name)
+        return True
+    
+    @classmethod
+    def get_pending_modules(cls) -> list[str]:
+        """
+        Python modules of registered entries that are not imported yet, in
+        display order. Modules that failed to import are left out.
+        """
+        registry = cls()
+        pending = []
+        for info in sorted(registry._modules.values(),
+                           key=lambda m: (list(ModuleCategory).index(m.category), m.order)):
+            if (info.module and info.page_class is None
+                    and info.module not in cls._loaded and info.module not in cls._failed):
+                if info.module not in pending:
+                    pending.append(info.module)
+        return pending
+    
+    @classmethod
+    @profiling.profiled("ModuleRegistry.discover_modules")
+    def discover_modules(cls, lazy: bool = True):
         """
-        Discover and import all modules in the modules directory.
+        Discover all modules in the modules directory.
+        
+        Modules listed in the manifest are registered from it and imported
+        on first use (see ModuleInfo.get_page_class). Anything else in the
+        directory is imported now and should register itself on import.
         
-        Each module should have a register() function or register
-        itself on import.
+        Args:
+            lazy: If False, import every module immediately
         """
+        from .manifest import MODULE_MANIFEST, HELPER_MODULES
+        
+        cls.load_manifest()
+        deferred = set(HELPER_MODULES)
+        if lazy:
+            deferred.update(entry[6] for entry in MODULE_MANIFEST)
+        
         modules_dir = os.path.dirname(os.path.abspath(__file__))
         
-        for item in os.listdir(modules_dir):
+        for item in sorted(os.listdir(modules_dir)):
             # Skip private files and non-Python files
             if item.startswith('_') or item.startswith('.'):
                 continue
             
             # Skip the registry itself and __pycache__
-            if item in ('registry.py', '__pycache__', '__init__.py'):
+            if item in ('registry.py', 'manifest.py', '__pycache__', '__init__.py'):
                 continue
             
             # Handle both .py files and directories
@@ -254,13 +413,8 @@ class ModuleRegistry:
             else:
                 continue
             
-            try:
-                # Import the module - it should register itself
-                importlib.import_module(f'.{module_name}', package='tux.modules')
-            except Exception as e:
-                import traceback
-                print(f"Warning: Failed to load module '{module_name}': {e}")
-                traceback.print_exc()
+            if module_name not in deferred:
+                cls.load_module(module_name)
 
 
 # Convenience decorator for registering modules
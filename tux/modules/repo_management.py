@@ -14,6 +14,7 @@ Copyright (c) 2025 Christopher Dorrell. Licensed under GPL-3.0.
 """
 
 import os
+import shutil
 import subprocess
 import threading
 
@@ -23,6 +24,7 @@ gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, GLib
 
 from ..core import get_distro, DistroFamily
+from ..core.installed import get_installed_snapshot
 from .registry import register_module, ModuleCategory
 
 
@@ -60,14 +62,9 @@ def check_ubuntu_universe() -> bool:
 
 def check_rpmfusion() -> tuple:
     """Check if RPM Fusion repos are enabled. Returns (free_enabled, nonfree_enabled)."""
-    try:
-        result = subprocess.run(['rpm', '-qa'], capture_output=True, text=True, timeout=10)
-        packages = result.stdout.lower()
-        free = 'rpmfusion-free-release' in packages
-        nonfree = 'rpmfusion-nonfree-release' in packages
-        return (free, nonfree)
-    except Exception:
-        return (False, False)
+    installed = get_installed_snapshot().installed_of(
+        ['rpmfusion-free-release', 'rpmfusion-nonfree-release'])
+    return ('rpmfusion-free-release' in installed, 'rpmfusion-nonfree-release' in installed)
 
 
 def check_packman() -> bool:
@@ -108,12 +105,8 @@ def detect_aur_helper() -> str:
     """Detect which AUR helper is installed."""
     helpers = ['yay', 'paru', 'pikaur', 'trizen', 'aurman']
     for helper in helpers:
-        try:
-            result = subprocess.run(['which', helper], capture_output=True, timeout=5)
-            if result.returncode == 0:
-                return helper
-        except Exception:
-            continue
+        if shutil.which(helper):
+            return helper
     return ""
 
 
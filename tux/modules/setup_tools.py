@@ -24,6 +24,8 @@ from ..core import (
     DistroFamily, DesktopEnv,
     run_sudo, run_with_callback, CommandResult
 )
+from ..core.installed import get_installed_snapshot, NATIVE
+from ..core.repoindex import get_repo_index
 
 from .package_sources import (
     get_alternative_source, get_source_type_description,
@@ -123,6 +125,14 @@ def get_fedora_version() -> str:
         return '40'
 
 
+def _repo_names(family: str) -> Optional[frozenset]:
+    """Every package name in the family's repos, or None if not indexable."""
+    try:
+        return get_repo_index(DistroFamily(family)).names()
+    except ValueError:
+        return None
+
+
 def check_package_available(package: str, family: str) -> bool:
     """Check if a single package is available in the system's repos."""
     cache_key = f"{family}:{package}"
@@ -130,6 +140,13 @@ def check_package_available(package: str, family: str) -> bool:
     if cache_key in _package_availability_cache:
         return _package_availability_cache[cache_key]
     
+    names = _repo_names(family)
+    if names is not None:
+        available = package in names
+        _package_availability_cache[cache_key] = available
+        return available
+    
+    # No bulk index (package manager missing or failing) - ask per package
     available = False
     try:
         if family == 'debian':
@@ -168,50 +185,47 @@ def check_package_available(package: str, family: str) -> bool:
 
 def check_package_installed(package: str, family: str) -> bool:
     """Check if a single package is installed on the system."""
-    try:
-        if family == 'debian':
-            result = subprocess.run(
-                ['dpkg', '-s', package],
-                capture_output=True, text=True, timeout=10
-            )
-            return result.returncode == 0 and 'Status: install ok installed' in result.stdout
-        elif family == 'arch':
-            result = subprocess.run(
-                ['pacman', '-Q', package],
-                capture_output=True, text=True, timeout=10
-            )
-            return result.returncode == 0
-        elif family == 'fedora':
-            result = subprocess.run(
-                ['rpm', '-q', package],
-                capture_output=True, text=True, timeout=10
-            )
-            if result.returncode == 0:
-                return True
-            # Fallback: check if binary exists (handles package name variations)
-            if package in ['ffmpeg', 'ffmpeg-free', 'ffmpeg-libs']:
-                return os.path.exists('/usr/bin/ffmpeg')
-            return False
-        elif family == 'opensuse':
-            result = subprocess.run(
-                ['rpm', '-q', package],
-                capture_output=True, text=True, timeout=10
-            )
-            if result.returncode == 0:
-                return True
-            # Fallback for common packages
-            if package in ['ffmpeg']:
-                return os.path.exists('/usr/bin/ffmpeg')
-            return False
-        else:
-            return False
-    except Exception:
-        return False
+    return get_installed_snapshot().is_installed(package) or _installed_by_binary(package, family)
+
+
+def _installed_by_binary(package: str, family: str) -> bool:
+    """Fallback: check if the binary exists (handles package name variations)."""
+    if family == 'fedora' and package in ['ffmpeg', 'ffmpeg-free', 'ffmpeg-libs']:
+        return os.path.exists('/usr/bin/ffmpeg')
+    if family == 'opensuse' and package in ['ffmpeg']:
+        return os.path.exists('/usr/bin/ffmpeg')
+    return False
 
 
 def filter_available_packages(packages: list[str], family: str) -> list[str]:
     """Filter a package list to only include packages that are actually available."""
-    return [pkg for pkg in packages if check_package_available(pkg, family)]
+    names = _repo_names(family)
+    if names is None:
+        return [pkg for pkg in packages if check_package_available(pkg, family)]
+    return [pkg for pkg in packages if pkg in names]
+
+
+def resolve_packages(packages: list[str], family: str) -> tuple[list[str], list[str], list[str]]:
+    """
+    Sort a wishlist into (available, unavailable, installed) in one pass.
+    
+    Installed packages count as available too. Uses the installed-package
+    snapshot and the repo index, falling back to per-package availability
+    checks only if the index can't be built.
+    """
+    installed_state = get_installed_snapshot().states(packages)
+    available = []
+    unavailable = []
+    installed = []
+    for pkg in packages:
+        if installed_state[pkg] or _installed_by_binary(pkg, family):
+            available.append(pkg)
+            installed.append(pkg)
+        elif check_package_available(pkg, family):
+            available.append(pkg)
+        else:
+            unavailable.append(pkg)
+    return available, unavailable, installed
 
 
 def get_available_packages_for_task(task: 'SetupTask', family: DistroFamily) -> list[str]:
@@ -221,10 +235,19 @@ def get_available_packages_for_task(task: 'SetupTask', family: DistroFamily) ->
     return filter_available_packages(wishlist, family_str)
 
 
-def clear_package_cache():
-    """Clear the package availability cache (useful after enabling new repos)."""
+def clear_package_cache(repos_changed: bool = False):
+    """
+    Forget cached package state after installing packages or enabling repos.
+    
+    Installed state is always re-read. The repo index re-checks its
+    database mtimes on the next lookup anyway; `repos_changed` forces a
+    rebuild for repo changes that haven't touched them yet.
+    """
     global _package_availability_cache
     _package_availability_cache = {}
+    get_installed_snapshot().invalidate(NATIVE)
+    if repos_changed:
+        get_repo_index(get_distro().family).invalidate()
 
 
 # =============================================================================
@@ -999,25 +1022,11 @@ class TaskDetailPage(Adw.NavigationPage):
         def check_packages():
             wishlist = self.task.get_packages_for_distro(self.distro_family)
             family_str = self.distro_family.value if hasattr(self.distro_family, 'value') else str(self.distro_family)
-            total = len(wishlist)
             
-            available = []
-            unavailable = []
-            installed = []
-            for i, pkg in enumerate(wishlist, 1):
-                # Update progress on UI thread
-                GLib.idle_add(self._update_check_progress, i, total, pkg)
-                
-                if check_package_installed(pkg, family_str):
-                    # Package is already installed - always show as available AND installed
-                    available.append(pkg)
-                    installed.append(pkg)
-                elif check_package_available(pkg, family_str):
-                    # Package not installed but available in repos
-                    available.append(pkg)
-                else:
-                    # Package neither installed nor available
-                    unavailable.append(pkg)
+            # One lookup pass over the whole wishlist; only slow the first
+            # time the repo index is built
+            GLib.idle_add(self._update_check_progress, len(wishlist))
+            available, unavailable, installed = resolve_packages(wishlist, family_str)
             
             # Update UI on main thread
             GLib.idle_add(self._update_packages_ui, available, unavailable, installed)
@@ -1025,10 +1034,10 @@ class TaskDetailPage(Adw.NavigationPage):
         thread = threading.Thread(target=check_packages, daemon=True)
         thread.start()
     
-    def _update_check_progress(self, current: int, total: int, pkg_name: str):
+    def _update_check_progress(self, total: int):
         """Update the spinner row with progress info."""
         if self.spinner_row:
-            self.spinner_row.set_title(f"Checking package {current}/{total}: {pkg_name}")
+            self.spinner_row.set_title(f"Checking {total} packages...")
         return False
     
     def _update_packages_ui(self, available: list, unavailable: list, installed: list = None):
@@ -1288,7 +1297,7 @@ class TaskDetailPage(Adw.NavigationPage):
                 self.window.show_toast("RPM Fusion enabled! Refreshing packages...")
             
             # Clear cache and refresh the entire page
-            clear_package_cache()
+            clear_package_cache(repos_changed=True)
             self._check_packages_async()
         else:
             button.set_sensitive(True)
@@ -1472,8 +1481,8 @@ class TaskDetailPage(Adw.NavigationPage):
     
     def _on_batch_install_complete(self, successful_packages: list, failed_packages: list):
         """Handle completion of batch alternative source installation."""
-        # Clear cache and refresh
-        clear_package_cache()
+        # Clear cache and refresh (alternative sources may have added repos)
+        clear_package_cache(repos_changed=True)
         
         # Update buttons for successful packages
         for pkg in successful_packages:
@@ -1545,8 +1554,8 @@ class TaskDetailPage(Adw.NavigationPage):
     def _on_alt_install_complete(self, success: bool, button: Gtk.Button, package: str):
         """Handle completion of alternative source installation."""
         if success:
-            # Clear package cache and re-check
-            clear_package_cache()
+            # Clear package cache and re-check (the source may have added a repo)
+            clear_package_cache(repos_changed=True)
             
             # Update button to show success
             button.set_label("✓ Installed")
@@ -22,7 +22,10 @@ from typing import Optional
 from enum import Enum
 
 from ..core import get_distro, get_package_manager, DistroFamily
-from .registry import register_module, ModuleCategory, create_icon_simple
+from ..core.installed import get_installed_snapshot, NATIVE, FLATPAK
+from .registry import (
+    register_module, ModuleCategory, ModuleRegistry, SearchEntry, create_icon_simple
+)
 
 
 # =============================================================================
@@ -1690,6 +1693,11 @@ class SearchResultsPage(Adw.NavigationPage):
                 if hasattr(self, "window") and self.window is not None:
                     GLib.idle_add(self.window.show_toast, f"Flathub search failed: {e}")
         
+        # Installed state for every result: one package-list query per
+        # backend, answered from the snapshot (not a subprocess per row)
+        GLib.idle_add(self._update_loading, "Checking installed packages...")
+        self._mark_installed(all_results)
+        
         # Sort results: Native first, then AUR/third-party, then Flatpak
         source_order = {self.SOURCE_NATIVE: 0, self.SOURCE_AUR: 1, self.SOURCE_FLATPAK: 2}
         all_results.sort(key=lambda x: (source_order.get(x.get('source', self.SOURCE_NATIVE), 99), x['name'].lower()))
@@ -1771,15 +1779,12 @@ class SearchResultsPage(Adw.NavigationPage):
                     app_id = parts[2].strip() if len(parts) > 2 else ""
                     version = parts[3].strip() if len(parts) > 3 else ""
                     
-                    # Check if already installed
-                    installed = self._check_flatpak_installed(app_id)
-                    
                     results.append({
                         'name': name,
                         'description': desc,
                         'version': version,
                         'app_id': app_id,
-                        'installed': installed,
+                        'installed': False,  # Filled in by _mark_installed
                         'source': self.SOURCE_FLATPAK,
                         'source_display': 'Flathub'
                     })
@@ -1793,16 +1798,25 @@ class SearchResultsPage(Adw.NavigationPage):
         
         return results[:30]  # Limit flatpak results
     
+    def _mark_installed(self, results: list[dict]):
+        """Set 'installed' on search results from the installed snapshot."""
+        snapshot = get_installed_snapshot()
+        has_native = any(r.get('source') != self.SOURCE_FLATPAK for r in results)
+        has_flatpak = any(r.get('source') == self.SOURCE_FLATPAK for r in results)
+        native = snapshot.get(NATIVE) if has_native else frozenset()
+        flatpaks = snapshot.get(FLATPAK) if has_flatpak else frozenset()
+        
+        for r in results:
+            if r.get('installed'):
+                continue  # Search output already said so
+            if r.get('source') == self.SOURCE_FLATPAK:
+                r['installed'] = r.get('app_id', '') in flatpaks
+            else:
+                r['installed'] = r['name'] in native
+    
     def _check_flatpak_installed(self, app_id: str) -> bool:
         """Check if a Flatpak app is installed."""
-        try:
-            result = subprocess.run(
-                ['flatpak', 'info', app_id],
-                capture_output=True, timeout=5
-            )
-            return result.returncode == 0
-        except Exception:
-            return False
+        return get_installed_snapshot().is_flatpak_installed(app_id)
     
     def _get_native_source_name(self) -> str:
         """Get display name for the native package source."""
@@ -2090,10 +2104,8 @@ class SearchResultsPage(Adw.NavigationPage):
             else:
                 source_badge.add_css_class("dim-label")  # Grey for native
             
-            # Check if installed
+            # Installed state was looked up with the search (_mark_installed)
             is_installed = pkg.get('installed', False)
-            if not is_installed and source == self.SOURCE_NATIVE:
-                is_installed = self._check_if_installed(pkg['name'])
             
             # Create unique key for this package
             pkg_key = f"{pkg['name']}:{source}"
@@ -2165,41 +2177,7 @@ class SearchResultsPage(Adw.NavigationPage):
     
     def _check_if_installed(self, package_name: str) -> bool:
         """Check if a package is installed using the package manager."""
-        import subprocess
-        family = self.distro.family.value
-        
-        try:
-            if family == 'arch':
-                result = subprocess.run(
-                    ['pacman', '-Q', package_name],
-                    capture_output=True, timeout=5
-                )
-                return result.returncode == 0
-            
-            elif family in ('fedora', 'rhel'):
-                result = subprocess.run(
-                    ['rpm', '-q', package_name],
-                    capture_output=True, timeout=5
-                )
-                return result.returncode == 0
-            
-            elif family == 'debian':
-                result = subprocess.run(
-                    ['dpkg', '-s', package_name],
-                    capture_output=True, timeout=5
-                )
-                return result.returncode == 0
-            
-            elif family == 'opensuse':
-                result = subprocess.run(
-                    ['rpm', '-q', package_name],
-                    capture_output=True, timeout=5
-                )
-                return result.returncode == 0
-        except Exception:
-            pass
-        
-        return False
+        return get_installed_snapshot().is_installed(package_name)
     
     def on_package_toggled(self, checkbox: Gtk.CheckButton, pkg_key: str, source: str, pkg: dict):
         """Handle package checkbox toggle."""
@@ -2406,6 +2384,7 @@ class SearchResultsPage(Adw.NavigationPage):
                 except Exception as e:
                     failed.append(pkg['name'])
             
+            get_installed_snapshot().invalidate(FLATPAK)
             GLib.idle_add(finish_install, success, failed)
         
         def finish_install(success, failed):
@@ -3132,6 +3111,7 @@ class AppInstallDialog(Adw.Dialog):
     
     def _installation_complete(self):
         """Handle installation complete."""
+        get_installed_snapshot().invalidate()
         self.progress_bar.set_fraction(1.0)
         
         if self.cancelled:
@@ -3158,3 +3138,32 @@ class AppInstallDialog(Adw.Dialog):
         # Trigger refresh callback
         if self.on_complete_callback:
             GLib.timeout_add(300, self.on_complete_callback)
+
+
+# =============================================================================
+# Search Integration
+# =============================================================================
+
+def _open_catalog_app(window, category: Category, app: App):
+    """Open an app's category page and its detail page."""
+    page = CategoryPage(window, category, get_distro())
+    window.navigation_view.push(page)
+    page._on_app_row_clicked(None, app)
+
+
+def get_search_entries() -> list[SearchEntry]:
+    """Catalog apps for the main search bar."""
+    entries = []
+    for category in build_catalog():
+        for app in category.apps:
+            entries.append(SearchEntry(
+                title=app.name,
+                description=app.description,
+                keywords=f"{category.name} {app.id} {app.flatpak or ''}",
+                icon=app.icon,
+                open_func=lambda w, c=category, a=app: _open_catalog_app(w, c, a),
+            ))
+    return entries
+
+
+ModuleRegistry.register_search_provider("software_center", get_search_entries)
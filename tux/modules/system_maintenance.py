@@ -14,10 +14,11 @@ import os
 import subprocess
 import threading
 from gi.repository import Gtk, Adw, GLib, Gio
-from typing import Optional, List, Tuple
+from typing import Callable, Optional, List, Tuple
 from dataclasses import dataclass
 
 from ..core import get_distro, DistroFamily
+from ..core.diskusage import get_disk_usage
 
 from .registry import register_module, ModuleCategory
 
@@ -48,71 +49,66 @@ def get_human_size(size_bytes: int) -> str:
         return f"{size_bytes / (1024 * 1024 * 1024):.2f} GB"
 
 
+PACKAGE_CACHE_PATHS = {
+    DistroFamily.ARCH: "/var/cache/pacman/pkg",
+    DistroFamily.DEBIAN: "/var/cache/apt/archives",
+    DistroFamily.FEDORA: "/var/cache/dnf",
+    DistroFamily.OPENSUSE: "/var/cache/zypp/packages",
+}
+JOURNAL_PATH = "/var/log/journal"
+TRASH_PATH = "~/.local/share/Trash"
+THUMBNAIL_PATH = "~/.cache/thumbnails"
+USER_CACHE_PATH = "~/.cache"
+
+
 def get_dir_size(path: str) -> int:
-    """Get total size of a directory in bytes."""
-    total = 0
-    try:
-        if os.path.isfile(path):
-            return os.path.getsize(path)
-        for dirpath, dirnames, filenames in os.walk(path):
-            for filename in filenames:
-                filepath = os.path.join(dirpath, filename)
-                try:
-                    total += os.path.getsize(filepath)
-                except (OSError, FileNotFoundError):
-                    pass
-    except (OSError, PermissionError):
-        pass
-    return total
+    """Get the disk space a directory (or file) takes, in bytes."""
+    return get_disk_usage().size(path)
+
+
+def get_cleanup_sizes(family: DistroFamily,
+                      on_progress: Optional[Callable[[dict], None]] = None) -> dict:
+    """
+    Sizes of every cleanup category in one parallel pass.
+    
+    The user cache excludes thumbnails, which are counted separately.
+    `on_progress` receives running totals while the walk is going.
+    """
+    categories = {
+        'pkg_cache': [PACKAGE_CACHE_PATHS[family]] if family in PACKAGE_CACHE_PATHS else [],
+        'user_cache': USER_CACHE_PATH,
+        'thumbnails': THUMBNAIL_PATH,
+        'journal': JOURNAL_PATH,
+        'trash': TRASH_PATH,
+    }
+    return get_disk_usage().measure(categories, on_progress=on_progress)
 
 
 def get_package_cache_size(family: DistroFamily) -> int:
     """Get size of package manager cache."""
-    cache_paths = {
-        DistroFamily.ARCH: "/var/cache/pacman/pkg",
-        DistroFamily.DEBIAN: "/var/cache/apt/archives",
-        DistroFamily.FEDORA: "/var/cache/dnf",
-        DistroFamily.OPENSUSE: "/var/cache/zypp/packages",
-    }
-    path = cache_paths.get(family)
-    if path and os.path.exists(path):
-        return get_dir_size(path)
-    return 0
+    path = PACKAGE_CACHE_PATHS.get(family)
+    return get_dir_size(path) if path else 0
 
 
 def get_journal_size() -> int:
     """Get size of systemd journal logs."""
-    journal_path = "/var/log/journal"
-    if os.path.exists(journal_path):
-        return get_dir_size(journal_path)
-    return 0
+    return get_dir_size(JOURNAL_PATH)
 
 
 def get_trash_size() -> int:
     """Get size of user's trash."""
-    trash_path = os.path.expanduser("~/.local/share/Trash")
-    if os.path.exists(trash_path):
-        return get_dir_size(trash_path)
-    return 0
+    return get_dir_size(TRASH_PATH)
 
 
 def get_thumbnail_cache_size() -> int:
     """Get size of thumbnail cache."""
-    thumb_path = os.path.expanduser("~/.cache/thumbnails")
-    if os.path.exists(thumb_path):
-        return get_dir_size(thumb_path)
-    return 0
+    return get_dir_size(THUMBNAIL_PATH)
 
 
 def get_user_cache_size() -> int:
     """Get size of user cache directory (excluding thumbnails)."""
-    cache_path = os.path.expanduser("~/.cache")
-    thumb_path = os.path.expanduser("~/.cache/thumbnails")
-    
-    total = get_dir_size(cache_path)
-    # Subtract thumbnails since we count those separately
-    total -= get_dir_size(thumb_path)
-    return max(0, total)
+    sizes = get_disk_usage().measure({'user_cache': USER_CACHE_PATH, 'thumbnails': THUMBNAIL_PATH})
+    return sizes['user_cache']
 
 
 def get_orphaned_packages(family: DistroFamily) -> Tuple[int, List[str]]:
@@ -379,6 +375,7 @@ class SystemMaintenancePage(Adw.NavigationPage):
         
         # Cache for sizes
         self.cleanup_sizes = {}
+        self._cleanup_generation = 0  # Discards outdated background refreshes
         self.updates_info = (False, 0, "")
         self.startup_apps = []
         
@@ -600,30 +597,35 @@ class SystemMaintenancePage(Adw.NavigationPage):
     
     def _refresh_cleanup_sizes(self):
         """Refresh cleanup section sizes in background."""
+        self._cleanup_generation += 1
+        generation = self._cleanup_generation
+        
         def calculate():
-            sizes = {
-                'pkg_cache': get_package_cache_size(self.distro.family),
-                'user_cache': get_user_cache_size(),
-                'thumbnails': get_thumbnail_cache_size(),
-                'journal': get_journal_size(),
-                'trash': get_trash_size(),
-            }
-            GLib.idle_add(self._update_cleanup_sizes, sizes)
+            sizes = get_cleanup_sizes(
+                self.distro.family,
+                on_progress=lambda partial: GLib.idle_add(
+                    self._update_cleanup_sizes, partial, generation, False))
+            GLib.idle_add(self._update_cleanup_sizes, sizes, generation, True)
         
         threading.Thread(target=calculate, daemon=True).start()
     
-    def _update_cleanup_sizes(self, sizes: dict):
-        """Update cleanup size labels."""
-        self.cleanup_sizes = sizes
-        
-        self.pkg_cache_size.set_label(get_human_size(sizes['pkg_cache']))
-        self.user_cache_size.set_label(get_human_size(sizes['user_cache']))
-        self.thumb_size.set_label(get_human_size(sizes['thumbnails']))
-        self.journal_size.set_label(get_human_size(sizes['journal']))
-        self.trash_size.set_label(get_human_size(sizes['trash']))
+    def _update_cleanup_sizes(self, sizes: dict, generation: int = None, final: bool = True):
+        """Update cleanup size labels (running totals while still counting)."""
+        if generation is not None and generation != self._cleanup_generation:
+            return False  # A newer refresh is on its way
+        if final:
+            self.cleanup_sizes = sizes
+        suffix = "" if final else "…"
+        
+        self.pkg_cache_size.set_label(get_human_size(sizes['pkg_cache']) + suffix)
+        self.user_cache_size.set_label(get_human_size(sizes['user_cache']) + suffix)
+        self.thumb_size.set_label(get_human_size(sizes['thumbnails']) + suffix)
+        self.journal_size.set_label(get_human_size(sizes['journal']) + suffix)
+        self.trash_size.set_label(get_human_size(sizes['trash']) + suffix)
         
         total = sum(sizes.values())
-        self.clean_all_btn.set_label(f"Clean All ({get_human_size(total)})")
+        self.clean_all_btn.set_label(f"Clean All ({get_human_size(total)}{suffix})")
+        return False
     
     def _refresh_updates(self):
         """Check for updates in background."""
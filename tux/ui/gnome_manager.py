@@ -19,12 +19,15 @@ gi.require_version('Adw', '1')
 
 from gi.repository import Gtk, Adw, GLib, Gio, Pango
 
+from ..core.httpclient import get_http_client
+
 
 # =============================================================================
 # Constants
 # =============================================================================
 
 EXTENSIONS_API_URL = "https://extensions.gnome.org/extension-query/"
+EXTENSIONS_SEARCH_MAX_AGE = 60 * 60
 EXTENSION_INFO_URL = "https://extensions.gnome.org/extension-info/"
 
 # Popular/recommended extensions with their UUIDs
@@ -309,14 +312,10 @@ def search_extensions(query: str, shell_version: str = None) -> list:
         if shell_version:
             params['shell_version'] = shell_version
         
-        url = EXTENSIONS_API_URL + "?" + urllib.parse.urlencode(params)
-        
-        req = urllib.request.Request(url)
-        req.add_header('User-Agent', 'LinuxToolkit/4.5')
-        
-        with urllib.request.urlopen(req, timeout=10) as response:
-            data = json.loads(response.read().decode())
-            return data.get('extensions', [])
+        # Repeated searches within the hour come from the HTTP cache
+        data = get_http_client().get_json(EXTENSIONS_API_URL, params=params, timeout=10,
+                                          cached=True, max_age=EXTENSIONS_SEARCH_MAX_AGE)
+        return data.get('extensions', [])
     except Exception as e:
         print(f"Search error: {e}")
         return []
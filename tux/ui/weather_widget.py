@@ -16,23 +16,41 @@ gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, GLib, Gio
 import subprocess
 import threading
-import urllib.request
 import urllib.parse
 import json
-import re
 import os
+import time
 from dataclasses import dataclass
 from typing import Optional, List
 from datetime import datetime
 
+from ..core.feeds import FeedCache, fetch_feeds, cached_feeds, merge_by_date
+from ..core.httpclient import get_http_client
+
 
 # Config file for widget settings
 WIDGET_CONFIG_DIR = os.path.expanduser("~/.config/tux-assistant")
 WIDGET_CONFIG_FILE = os.path.join(WIDGET_CONFIG_DIR, "widget.conf")
 
+# (mtime, config) of the last read, so callers that load the config on
+# every refresh don't re-read and re-parse the file each time
+_config_memo: Optional[tuple] = None
+
+
+def _config_mtime() -> Optional[float]:
+    try:
+        return os.stat(WIDGET_CONFIG_FILE).st_mtime
+    except OSError:
+        return None
+
 
 def load_widget_config() -> dict:
     """Load widget configuration from file."""
+    global _config_memo
+    mtime = _config_mtime()
+    if _config_memo and _config_memo[0] == mtime:
+        return json.loads(json.dumps(_config_memo[1]))
+
     defaults = {
         "temp_unit": "fahrenheit",  # or "celsius"
         "location": "",  # Empty = auto-detect
@@ -52,15 +70,18 @@ def load_widget_config() -> dict:
     except Exception as e:
         print(f"[Widget] Config load error: {e}")
     
+    _config_memo = (mtime, json.loads(json.dumps(defaults)))
     return defaults
 
 
 def save_widget_config(config: dict):
     """Save widget configuration to file."""
+    global _config_memo
     try:
         os.makedirs(WIDGET_CONFIG_DIR, exist_ok=True)
         with open(WIDGET_CONFIG_FILE, 'w') as f:
             json.dump(config, f, indent=2)
+        _config_memo = (_config_mtime(), json.loads(json.dumps(config)))
     except Exception as e:
         print(f"[Widget] Config save error: {e}")
 
@@ -98,10 +119,13 @@ class NewsItem:
 class WeatherService:
     """Fetch weather data from Open-Meteo with ip-api.com geolocation."""
     
+    # Where we are rarely changes between refreshes; only the forecast
+    # is requested every cache_duration
+    LOCATION_MAX_AGE = 24 * 60 * 60
+    
     def __init__(self):
-        self.cache = None
-        self.cache_time = None
         self.cache_duration = 1800  # 30 minutes
+        self.http = get_http_client()
     
     def get_weather(self, location: str = "") -> Optional[Weather]:
         """Get current weather using Open-Meteo."""
@@ -111,26 +135,14 @@ class WeatherService:
             temp_unit = config.get("temp_unit", "fahrenheit")
             config_location = config.get("location", "")
             
-            # Check cache
-            if self.cache and self.cache_time:
-                elapsed = (datetime.now() - self.cache_time).total_seconds()
-                if elapsed < self.cache_duration:
-                    return self.cache
-            
-            import shutil
-            curl_path = shutil.which('curl')
-            if not curl_path:
-                print("[Weather] curl not found!")
-                return None
-            
             # Step 1: Get location (lat/lon) - config location takes priority
             use_location = config_location or location
             if use_location:
                 # User specified location - use geocoding
-                lat, lon, city, region = self._geocode_location(curl_path, use_location)
+                lat, lon, city, region = self._geocode_location(use_location)
             else:
                 # Auto-detect from IP using ip-api.com (more accurate than wttr.in)
-                lat, lon, city, region = self._get_ip_location(curl_path)
+                lat, lon, city, region = self._get_ip_location()
             
             if lat is None or lon is None:
                 print("[Weather] Could not determine location")
@@ -140,29 +152,22 @@ class WeatherService:
             print(f"[Weather] Location: {location_str} ({lat}, {lon})")
             
             # Step 2: Get weather from Open-Meteo (respect temp unit setting)
-            url = (
-                f"https://api.open-meteo.com/v1/forecast?"
-                f"latitude={lat}&longitude={lon}"
-                f"&current=temperature_2m,relative_humidity_2m,weather_code"
-                f"&daily=weather_code,temperature_2m_max,temperature_2m_min"
-                f"&temperature_unit={temp_unit}"
-                f"&timezone=auto"
-                f"&forecast_days=3"
-            )
-            
-            result = subprocess.run(
-                [curl_path, '-s', '-m', '10', url],
-                capture_output=True, text=True, timeout=15
-            )
-            
-            if result.returncode != 0 or not result.stdout.strip():
-                print(f"[Weather] Open-Meteo request failed")
-                return None
+            params = {
+                'latitude': lat,
+                'longitude': lon,
+                'current': 'temperature_2m,relative_humidity_2m,weather_code',
+                'daily': 'weather_code,temperature_2m_max,temperature_2m_min',
+                'temperature_unit': temp_unit,
+                'timezone': 'auto',
+                'forecast_days': 3,
+            }
             
             try:
-                data = json.loads(result.stdout)
-            except json.JSONDecodeError as e:
-                print(f"[Weather] JSON parse error: {e}")
+                # Served from the HTTP cache within cache_duration
+                data = self.http.get_json("https://api.open-meteo.com/v1/forecast", params=params,
+                                          cached=True, max_age=self.cache_duration)
+            except (OSError, ValueError) as e:
+                print(f"[Weather] Open-Meteo request failed: {e}")
                 return None
             
             current = data.get('current', {})
@@ -207,10 +212,6 @@ class WeatherService:
                 forecast=forecast
             )
             
-            # Cache it
-            self.cache = weather
-            self.cache_time = datetime.now()
-            
             print(f"[Weather] Success: {weather.temperature} {weather.condition}")
             return weather
             
@@ -218,50 +219,39 @@ class WeatherService:
             print(f"Weather fetch error: {e}")
             return None
     
-    def _get_ip_location(self, curl_path: str) -> tuple:
+    def _get_ip_location(self) -> tuple:
         """Get lat/lon from IP address using ip-api.com (accurate geolocation)."""
         try:
-            result = subprocess.run(
-                [curl_path, '-s', '-m', '5', 'http://ip-api.com/json/?fields=lat,lon,city,regionName'],
-                capture_output=True, text=True, timeout=10
+            data = self.http.get_json('http://ip-api.com/json/',
+                                      params={'fields': 'lat,lon,city,regionName'}, timeout=5,
+                                      cached=True, max_age=self.LOCATION_MAX_AGE)
+            print(f"[Weather] IP location: {data}")
+            return (
+                data.get('lat'),
+                data.get('lon'),
+                data.get('city', ''),
+                data.get('regionName', '')
             )
-            
-            if result.returncode == 0 and result.stdout.strip():
-                data = json.loads(result.stdout)
-                print(f"[Weather] IP location: {data}")
-                return (
-                    data.get('lat'),
-                    data.get('lon'),
-                    data.get('city', ''),
-                    data.get('regionName', '')
-                )
         except Exception as e:
             print(f"[Weather] IP geolocation failed: {e}")
         
         return (None, None, '', '')
     
-    def _geocode_location(self, curl_path: str, location: str) -> tuple:
+    def _geocode_location(self, location: str) -> tuple:
         """Convert location name to lat/lon using Open-Meteo geocoding."""
         try:
-            encoded = urllib.parse.quote(location)
-            url = f"https://geocoding-api.open-meteo.com/v1/search?name={encoded}&count=1"
-            
-            result = subprocess.run(
-                [curl_path, '-s', '-m', '5', url],
-                capture_output=True, text=True, timeout=10
-            )
-            
-            if result.returncode == 0 and result.stdout.strip():
-                data = json.loads(result.stdout)
-                results = data.get('results', [])
-                if results:
-                    r = results[0]
-                    return (
-                        r.get('latitude'),
-                        r.get('longitude'),
-                        r.get('name', ''),
-                        r.get('admin1', '')  # State/region
-                    )
+            data = self.http.get_json('https://geocoding-api.open-meteo.com/v1/search',
+                                      params={'name': location.strip(), 'count': 1}, timeout=5,
+                                      cached=True, max_age=self.LOCATION_MAX_AGE)
+            results = data.get('results', [])
+            if results:
+                r = results[0]
+                return (
+                    r.get('latitude'),
+                    r.get('longitude'),
+                    r.get('name', ''),
+                    r.get('admin1', '')  # State/region
+                )
         except Exception as e:
             print(f"[Weather] Geocoding failed: {e}")
         
@@ -344,28 +334,17 @@ class NewsService:
         ("Brutalist Report", "https://brutalist.report/feed/tech.rss"),
     ]
     
+    # Feeds fetched at most this many at once (each one is a thread)
+    MAX_FEEDS = 12
+    
     def __init__(self):
-        self.cache = {}
-        self.cache_time = {}
         self.cache_duration = 900  # 15 minutes
+        self.feed_cache = FeedCache()
     
-    def get_linux_news(self, max_items: int = 5) -> List[NewsItem]:
-        """Fetch Linux news from RSS feeds."""
-        # Load config for enabled sources
-        config = load_widget_config()
+    def _active_feeds(self, config: dict) -> List[tuple]:
+        """(name, url) of the enabled built-in and custom sources."""
         enabled_sources = config.get("enabled_sources", [s[0] for s in self.LINUX_FEEDS])
         custom_sources = config.get("custom_sources", [])
-        headlines_count = config.get("headlines_count", max_items)
-        
-        cache_key = "linux"
-        
-        # Check cache
-        if cache_key in self.cache and cache_key in self.cache_time:
-            elapsed = (datetime.now() - self.cache_time[cache_key]).total_seconds()
-            if elapsed < self.cache_duration:
-                return self.cache[cache_key][:headlines_count]
-        
-        items = []
         
         # Filter to only enabled built-in sources
         active_feeds = [(name, url) for name, url in self.LINUX_FEEDS if name in enabled_sources]
@@ -375,74 +354,61 @@ class NewsService:
             if isinstance(custom, dict) and "name" in custom and "url" in custom:
                 active_feeds.append((custom["name"], custom["url"]))
         
-        # Fetch from each enabled source (limit to 6 sources for performance)
-        for source_name, feed_url in active_feeds[:6]:
-            try:
-                items.extend(self._fetch_rss(feed_url, source_name, max_per_feed=2))
-            except Exception as e:
-                print(f"RSS error ({source_name}): {e}")
-                continue
-        
-        # Sort by recency (if we had timestamps) and limit
-        items = items[:headlines_count]
+        return active_feeds[:self.MAX_FEEDS]
+    
+    def get_linux_news(self, max_items: int = 5) -> List[NewsItem]:
+        """Fetch Linux news from RSS feeds (all feeds at once)."""
+        config = load_widget_config()
+        headlines_count = config.get("headlines_count", max_items)
+        active_feeds = self._active_feeds(config)
         
-        # Cache
-        self.cache[cache_key] = items
-        self.cache_time[cache_key] = datetime.now()
+        def on_error(url, error):
+            print(f"RSS error ({url}): {error}")
         
-        return items
+        # Feeds fetched within cache_duration aren't requested again;
+        # older ones are revalidated with ETag/Last-Modified
+        feeds = fetch_feeds([url for _name, url in active_feeds], self.feed_cache,
+                            max_age=self.cache_duration, on_error=on_error)
+        return self._to_news_items(active_feeds, feeds, headlines_count)
     
-    def _fetch_rss(self, url: str, source: str, max_per_feed: int = 3) -> List[NewsItem]:
-        """Fetch and parse RSS feed."""
-        items = []
-        
-        try:
-            req = urllib.request.Request(url, headers={
-                'User-Agent': 'TuxAssistant/1.0'
-            })
-            
-            with urllib.request.urlopen(req, timeout=5) as response:
-                content = response.read().decode('utf-8', errors='ignore')
-            
-            # Simple regex RSS parsing (avoid XML dependency)
-            # Find all <item> blocks
-            item_pattern = re.compile(r'<item>(.*?)</item>', re.DOTALL)
-            title_pattern = re.compile(r'<title>(?:<!\[CDATA\[)?(.*?)(?:\]\]>)?</title>')
-            link_pattern = re.compile(r'<link>(?:<!\[CDATA\[)?(.*?)(?:\]\]>)?</link>')
-            
-            for match in item_pattern.finditer(content):
-                item_content = match.group(1)
-                
-                title_match = title_pattern.search(item_content)
-                link_match = link_pattern.search(item_content)
-                
-                if title_match and link_match:
-                    title = title_match.group(1).strip()
-                    url = self._strip_tracking(link_match.group(1).strip())
-                    
-                    # Clean up HTML entities
-                    title = title.replace('&amp;', '&')
-                    title = title.replace('&lt;', '<')
-                    title = title.replace('&gt;', '>')
-                    title = title.replace('&#8217;', "'")
-                    title = title.replace('&#8211;', "–")
-                    title = title.replace('&#8230;', "...")
-                    
-                    items.append(NewsItem(
-                        title=title[:80] + "..." if len(title) > 80 else title,
-                        source=source,
-                        url=url,
-                        time_ago=""  # Could parse pubDate if needed
-                    ))
-                    
-                    if len(items) >= max_per_feed:
-                        break
-                        
-        except Exception as e:
-            print(f"RSS parse error: {e}")
+    def get_cached_news(self, max_items: int = 5) -> List[NewsItem]:
+        """Last known headlines from disk, however old (no network)."""
+        config = load_widget_config()
+        headlines_count = config.get("headlines_count", max_items)
+        active_feeds = self._active_feeds(config)
+        feeds = cached_feeds([url for _name, url in active_feeds], self.feed_cache)
+        return self._to_news_items(active_feeds, feeds, headlines_count)
+    
+    def _to_news_items(self, active_feeds: List[tuple], feeds: dict,
+                       headlines_count: int, max_per_feed: int = 2) -> List[NewsItem]:
+        """Newest headlines across feeds, at most max_per_feed from each."""
+        merged = merge_by_date(
+            ((name, feeds[url]) for name, url in active_feeds if url in feeds),
+            per_feed=max_per_feed,
+        )
         
+        items = []
+        for source, entry in merged[:headlines_count]:
+            title = entry.title
+            items.append(NewsItem(
+                title=title[:80] + "..." if len(title) > 80 else title,
+                source=source,
+                url=self._strip_tracking(entry.url),
+                time_ago=self._time_ago(entry.published)
+            ))
         return items
     
+    def _time_ago(self, published: Optional[float]) -> str:
+        """Short age like "5m ago" for a Unix time."""
+        if not published:
+            return ""
+        seconds = max(0, time.time() - published)
+        if seconds < 3600:
+            return f"{max(1, int(seconds // 60))}m ago"
+        if seconds < 86400:
+            return f"{int(seconds // 3600)}h ago"
+        return f"{int(seconds // 86400)}d ago"
+    
     def _strip_tracking(self, url: str) -> str:
         """Remove UTM and other tracking parameters from URLs."""
         try:
@@ -720,8 +686,9 @@ class NewsCard(Gtk.Box):
         title_btn.connect("clicked", self._on_headline_clicked, item.url)
         row.append(title_btn)
         
-        # Source
-        source_label = Gtk.Label(label=f"{item.source}")
+        # Source and age
+        source_text = f"{item.source} · {item.time_ago}" if item.time_ago else item.source
+        source_label = Gtk.Label(label=source_text)
         source_label.add_css_class("dim-label")
         source_label.add_css_class("caption")
         source_label.set_xalign(0)
@@ -819,9 +786,21 @@ class WeatherWidget(Gtk.MenuButton):
         scroll.set_child(panel)
         self.popover.set_child(scroll)
         
-        # Start data refresh after a short delay (don't block startup)
+        # Show the last known headlines right away, then refresh after a
+        # short delay (don't block startup)
+        threading.Thread(target=self._load_cached_news, daemon=True).start()
         GLib.timeout_add_seconds(2, self._do_refresh)
     
+    def _load_cached_news(self):
+        """Display headlines from the disk cache while fresh ones load."""
+        try:
+            config = load_widget_config()
+            news = self.news_service.get_cached_news(max_items=config.get("headlines_count", 4))
+            if news:
+                GLib.idle_add(self.linux_news_card.set_headlines, news)
+        except Exception as e:
+            print(f"Cached news error: {e}")
+    
     def _open_url_in_browser(self, url: str):
         """Open URL in Tux Browser (new tab)."""
         try:
@@ -1060,17 +1039,11 @@ class WidgetSettingsDialog(Adw.Dialog):
         """Handle temperature unit change."""
         self.config["temp_unit"] = "fahrenheit" if row.get_selected() == 0 else "celsius"
         save_widget_config(self.config)
-        # Update weather service
-        if hasattr(self.widget, 'weather_service'):
-            self.widget.weather_service.cache = None  # Clear cache to refresh
     
     def _on_location_changed(self, row):
         """Handle location change."""
         self.config["location"] = row.get_text().strip()
         save_widget_config(self.config)
-        # Clear weather cache to use new location
-        if hasattr(self.widget, 'weather_service'):
-            self.widget.weather_service.cache = None
     
     def _on_headlines_count_changed(self, row, param):
         """Handle headlines count change."""
@@ -1088,9 +1061,6 @@ class WidgetSettingsDialog(Adw.Dialog):
                 enabled.remove(source_name)
         self.config["enabled_sources"] = enabled
         save_widget_config(self.config)
-        # Clear news cache
-        if hasattr(self.widget, 'news_service'):
-            self.widget.news_service.cache = {}
     
     def _on_refresh_changed(self, row, param):
         """Handle refresh interval change."""
@@ -1191,10 +1161,6 @@ class WidgetSettingsDialog(Adw.Dialog):
             # Add row to UI
             self._add_custom_source_row(self.custom_group, {"name": name, "url": url}, len(custom_sources) - 1)
             
-            # Clear news cache
-            if hasattr(self.widget, 'news_service'):
-                self.widget.news_service.cache = {}
-            
             dialog.close()
         
         add_btn.connect("clicked", do_add)
@@ -1209,10 +1175,6 @@ class WidgetSettingsDialog(Adw.Dialog):
             self.config["custom_sources"] = custom_sources
             save_widget_config(self.config)
             
-            # Clear news cache
-            if hasattr(self.widget, 'news_service'):
-                self.widget.news_service.cache = {}
-            
             # Rebuild the dialog (simplest way to update indices)
             # Just close and reopen
             if hasattr(self.parent_window, 'show_toast'):